@@ -127,27 +127,33 @@ export const computeResolvers = {
       const vehicles = order.vehicle_snapshot as any[]
 
       // 3. 從 info_between_two_point 建立 N x N 距離/時間矩陣
+      //    data.matrix_source === 'geo' 時略過，交由 OR-Tools 依 lat/lng 估算（只傳 O(N) 資料）
       const destIds = destinations.map((d: any) => d.id as number)
       const n = destIds.length
+      const useGeoMatrix = (args.data as any)?.matrix_source === 'geo'
+
+      let matrices: { distance_matrix: number[][]; time_matrix: number[][] } | null = null
+      if (!useGeoMatrix) {
+        const pairs = await db.select()
+          .from(infoBetweenTable)
+          .where(and(
+            inArray(infoBetweenTable.a_point, destIds),
+            inArray(infoBetweenTable.b_point, destIds)
+          ))
+
+        if (pairs.length < n * (n - 1)) {
+          await markFailed(`距離矩陣資料不完整，需要 ${n * (n - 1)} 筆，實際只有 ${pairs.length} 筆`)
+          return compute
+        }
 
-      const pairs = await db.select()
-        .from(infoBetweenTable)
-        .where(and(
-          inArray(infoBetweenTable.a_point, destIds),
-          inArray(infoBetweenTable.b_point, destIds)
-        ))
-
-      if (pairs.length < n * (n - 1)) {
-        await markFailed(`距離矩陣資料不完整，需要 ${n * (n - 1)} 筆，實際只有 ${pairs.length} 筆`)
-        return compute
-      }
-
-      const idxMap: Record<number, number> = Object.fromEntries(destIds.map((id, i) => [id, i]))
-      const distMatrix = Array.from({ length: n }, () => Array<number>(n).fill(0))
-      const timeMatrix = Array.from({ length: n }, () => Array<number>(n).fill(0))
-      for (const p of pairs) {
-        distMatrix[idxMap[p.a_point]][idxMap[p.b_point]] = p.distance_from_a_to_b
-        timeMatrix[idxMap[p.a_point]][idxMap[p.b_point]] = p.time_from_a_to_b
+        const idxMap: Record<number, number> = Object.fromEntries(destIds.map((id, i) => [id, i]))
+        const distMatrix = Array.from({ length: n }, () => Array<number>(n).fill(0))
+        const timeMatrix = Array.from({ length: n }, () => Array<number>(n).fill(0))
+        for (const p of pairs) {
+          distMatrix[idxMap[p.a_point]][idxMap[p.b_point]] = p.distance_from_a_to_b
+          timeMatrix[idxMap[p.a_point]][idxMap[p.b_point]] = p.time_from_a_to_b
+        }
+        matrices = { distance_matrix: distMatrix, time_matrix: timeMatrix }
       }
 
       // 4. 組裝 VRPRequest
@@ -169,16 +175,19 @@ export const computeResolvers = {
           delivery: d.delivery ?? 0,
           service_time: d.service_time ?? 0,
           time_window_start: d.time_window_start ?? 0,
-          time_window_end: d.time_window_end ?? 1440,
+          // 省略時由 OR-Tools 套用預設；depot 未設定代表收車不設限，不能補 1440
+          time_window_end: d.time_window_end ?? undefined,
         })),
         vehicles: vehicles.map((v: any) => ({
           id: v.id,
           capacity: v.capacity ?? 0,
           fixed_cost: v.fixed_cost ?? 0,
         })),
-        distance_matrix: distMatrix,
-        time_matrix: timeMatrix,
+        ...(matrices ?? { matrix_model: (args.data as any)?.matrix_model }),
         time_limit_seconds: (args.data as any)?.time_limit_seconds ?? 30,
+        // 排程用：同帳號公平分配 worker；priority 省略時由 OR-Tools 依規模判斷
+        account_id: user!.account_id,
+        priority: (args.data as any)?.priority,
       }
 
       // 5. 呼叫 OR-Tools（await 取得 202 確認即可，實際計算透過 webhook 回呼）
@@ -198,7 +207,7 @@ export const computeResolvers = {
 
       return compute
     },
-    cancelCompute: async (_: any, args: { id: string }, { db, user }: Context) => {
+    cancelCompute: async (_: any, args: { id: string }, { db, user, env }: Context) => {
       requireAuth(user, 'normal')
       const [updated] = await db
         .update(computeTable)
@@ -209,6 +218,13 @@ export const computeResolvers = {
         ))
         .returning()
       if (!updated) throw new Error('Compute not found')
+
+      // 通知 OR-Tools 停止搜尋，釋放 worker；已結束或不存在（404 / 409）都不影響取消結果
+      try {
+        await fetch(`${env.ORTOOLS_URL}/vrp/jobs/${updated.id}`, { method: 'DELETE' })
+      } catch (e: any) {
+        console.error(`無法通知演算法服務取消 compute ${updated.id}: ${e.message}`)
+      }
       return updated
     }
   },
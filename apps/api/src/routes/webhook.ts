@@ -1,5 +1,5 @@
 import { Hono } from 'hono'
-import { eq } from 'drizzle-orm'
+import { and, eq, notInArray } from 'drizzle-orm'
 import { createDb } from '../db/connect'
 import { compute as computeTable, route as routeTable, route_stop as routeStopTable } from '../db/schema'
 
@@ -30,42 +30,64 @@ webhookRoutes.post('/internal/vrp-callback', async (c) => {
   const db = createDb(c.env.DATABASE_URL)
   const now = Math.floor(Date.now() / 1000)
 
+  // ortools 會以相同 Idempotency-Key 重送，兩次投遞也可能同時抵達：
+  // 以單一條件式 UPDATE 認領，只有把計算從未結束改成結束的那一次會往下寫入路線
+  const finalStatuses = ['completed', 'failed', 'cancelled'] as const
+  const claim = (values: Partial<typeof computeTable.$inferInsert>) => db.update(computeTable)
+    .set({ ...values, end_time: now, updated_at: now })
+    .where(and(eq(computeTable.id, compute_id), notInArray(computeTable.compute_status, [...finalStatuses])))
+    .returning({ id: computeTable.id })
+
+  // 由 OR-Tools 端直接取消（DELETE /vrp/jobs/{id}）；不寫入取消前的暫時路線
+  if (status === 'cancelled') {
+    const [claimed] = await claim({ compute_status: 'cancelled' })
+    return c.json(claimed ? { ok: true } : { ok: true, duplicate: true })
+  }
+
   if (status === 'error') {
-    await db.update(computeTable)
-      .set({ compute_status: 'failed', fail_reason: message ?? 'Unknown error', end_time: now, updated_at: now })
-      .where(eq(computeTable.id, compute_id))
-    return c.json({ ok: true })
+    const [claimed] = await claim({ compute_status: 'failed', fail_reason: message ?? 'Unknown error' })
+    return c.json(claimed ? { ok: true } : { ok: true, duplicate: true })
   }
 
-  // 寫入 route 與 route_stop
-  for (const r of (routes ?? []) as any[]) {
-    const stops: any[] = r.stops ?? []
-    const lastStop = stops[stops.length - 1]
+  const [claimed] = await claim({ compute_status: 'completed' })
+  if (!claimed) {
+    return c.json({ ok: true, duplicate: true })
+  }
+
+  // 寫入 route 與 route_stop；neon-http 不支援互動式 transaction，
+  // 失敗時刪掉已寫入的路線並退回 computing，回 500 讓 ortools 重送
+  try {
+    for (const r of (routes ?? []) as any[]) {
+      const stops: any[] = r.stops ?? []
+      const lastStop = stops[stops.length - 1]
 
-    const [insertedRoute] = await db.insert(routeTable).values({
-      compute_id,
-      vehicle_id: r.vehicle_id,
-      total_distance: r.total_distance ?? 0,
-      total_time: lastStop?.arrival_time ?? 0,  // 最後一站抵達時間即為總用時
-      total_load: r.total_delivery ?? 0,
-    }).returning()
+      const [insertedRoute] = await db.insert(routeTable).values({
+        compute_id,
+        vehicle_id: r.vehicle_id,
+        total_distance: r.total_distance ?? 0,
+        total_time: lastStop?.arrival_time ?? 0,  // 最後一站抵達時間即為總用時
+        total_load: r.total_delivery ?? 0,
+      }).returning()
 
-    if (stops.length > 0) {
-      await db.insert(routeStopTable).values(
-        stops.map((s: any, idx: number) => ({
-          route_id: insertedRoute.id,
-          destination_id: s.location_id,
-          sequence: idx,
-          arrival_time: s.arrival_time ?? 0,
-          demand: s.delivery ?? 0,
-        }))
-      )
+      if (stops.length > 0) {
+        await db.insert(routeStopTable).values(
+          stops.map((s: any, idx: number) => ({
+            route_id: insertedRoute.id,
+            destination_id: s.location_id,
+            sequence: idx,
+            arrival_time: s.arrival_time ?? 0,
+            demand: s.delivery ?? 0,
+          }))
+        )
+      }
     }
+  } catch (err) {
+    await db.delete(routeTable).where(eq(routeTable.compute_id, compute_id))
+    await db.update(computeTable)
+      .set({ compute_status: 'computing', end_time: null, updated_at: now })
+      .where(eq(computeTable.id, compute_id))
+    throw err
   }
 
-  await db.update(computeTable)
-    .set({ compute_status: 'completed', end_time: now, updated_at: now })
-    .where(eq(computeTable.id, compute_id))
-
   return c.json({ ok: true })
 })
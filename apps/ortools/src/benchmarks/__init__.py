@@ -0,0 +1 @@
+# 離線效能量測腳本，不隨 Modal image 部署（image 只嵌入 vrp 套件）
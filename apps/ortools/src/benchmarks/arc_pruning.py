@@ -0,0 +1,78 @@
+"""
+比較建模前 arc 剪枝（時間窗、k 近鄰）對大型實例收斂速度的影響。
+
+用法（於 apps/ortools/src 執行）：
+    python -m benchmarks.arc_pruning --sizes 1000 2000 --time-limit 30 --neighbors 100
+"""
+import argparse
+import json
+import time
+
+from benchmarks.instances import random_request
+from vrp.preprocess import compile_problem
+from vrp.solvers.ortools_v2.engine import build_model, make_search_params
+
+
+def run_once(data, prune_arcs: bool, neighbors: int | None) -> dict:
+    data = data.model_copy(update={"prune_arcs": prune_arcs, "prune_neighbors": neighbors})
+    build_start = time.perf_counter()
+    problem = compile_problem(data)
+    manager, routing, _ = build_model(problem)
+    build_seconds = time.perf_counter() - build_start
+
+    trace = []
+    solve_start = time.perf_counter()
+
+    def on_solution():
+        trace.append((time.perf_counter() - solve_start, routing.CostVar().Value()))
+
+    routing.AddAtSolutionCallback(on_solution)
+    solution = routing.SolveWithParameters(make_search_params(data.time_limit_seconds))
+
+    return {
+        "pruned_arcs": problem.pruned_arcs,
+        "build_seconds": round(build_seconds, 3),
+        "first_solution_seconds": round(trace[0][0], 3) if trace else None,
+        "solutions": len(trace),
+        "branches": routing.solver().Branches(),
+        "objective": solution.ObjectiveValue() if solution else None,
+        "trace": trace,
+    }
+
+
+def time_to_target(trace, target: int) -> float | None:
+    for elapsed, objective in trace:
+        if objective <= target:
+            return round(elapsed, 3)
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 2000])
+    parser.add_argument("--vehicles", type=int, default=0, help="0 = 每 25 站 1 輛車")
+    parser.add_argument("--time-limit", type=int, default=30)
+    parser.add_argument("--neighbors", type=int, default=100)
+    parser.add_argument("--gap", type=float, default=0.02, help="目標：與三者最佳解相差在此比例內")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    modes = {
+        "none": (False, None),
+        "time_window": (True, None),
+        "time_window+knn": (True, args.neighbors),
+    }
+    for n in args.sizes:
+        n_vehicles = args.vehicles or max(1, n // 25)
+        data = random_request(n, n_vehicles, args.seed, args.time_limit)
+        runs = {name: run_once(data, *mode) for name, mode in modes.items()}
+
+        best = min(run["objective"] for run in runs.values() if run["objective"] is not None)
+        target = int(best * (1 + args.gap))
+        for run in runs.values():
+            run["time_to_target_seconds"] = time_to_target(run.pop("trace"), target)
+        print(json.dumps({"n": n, "vehicles": n_vehicles, "target": target, **runs}, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
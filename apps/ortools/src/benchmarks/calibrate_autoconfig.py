@@ -0,0 +1,164 @@
+"""
+離線校準 auto_configure 的查表（vrp/solvers/ortools_v2/autoconfig_table.py）。
+
+對每個（規模區間, 時間窗緊/鬆, 容量緊/鬆）產生數個不同 seed 的隨機實例，以每組候選
+搜尋設定各跑參考時間，記錄目標值隨時間的變化。每個實例的目標 = 該實例所有設定最佳解的
+(1 + gap) 倍，沒達標的以參考時間計。選達標時間中位數最小的設定，time limit 取該設定
+達標時間 p90 的 1.5 倍（至少 1 秒）；單一實例的雜訊不會決定整個區間。最後同一組
+（時間窗, 容量）內 time limit 隨規模取累積最大值，大區間不會比小區間短。
+
+用法（於 apps/ortools/src 執行，1 核心每個實例約 20 分鐘）：
+    python -m benchmarks.calibrate_autoconfig
+    python -m benchmarks.calibrate_autoconfig --instances 3 --dry-run   # 只印結果，不寫檔
+"""
+import argparse
+import json
+import math
+import time
+from pathlib import Path
+
+from ortools.constraint_solver import routing_enums_pb2
+
+from benchmarks.instances import random_request
+from vrp.preprocess import compile_problem
+from vrp.solvers.ortools_v2.engine import build_model, make_search_params
+
+_FSS = routing_enums_pb2.FirstSolutionStrategy
+_LSM = routing_enums_pb2.LocalSearchMetaheuristic
+
+# 規模區間（客戶數）與各區間的參考搜尋秒數
+REFERENCE_SECONDS = {25: 4, 100: 10, 300: 20, 1000: 40}
+CANDIDATES = [
+    ("PATH_CHEAPEST_ARC", "GUIDED_LOCAL_SEARCH"),
+    ("SAVINGS", "GUIDED_LOCAL_SEARCH"),
+    ("PARALLEL_CHEAPEST_INSERTION", "GUIDED_LOCAL_SEARCH"),
+    ("PATH_CHEAPEST_ARC", "SIMULATED_ANNEALING"),
+]
+TIGHT_WINDOWS = [60, 120]
+CAPACITY_SLACK = {True: 1.05, False: 1.5}
+
+TABLE_PATH = Path(__file__).resolve().parent.parent / "vrp" / "solvers" / "ortools_v2" / "autoconfig_table.py"
+
+
+def make_instance(customers: int, tight_windows: bool, tight_capacity: bool, seed: int):
+    return random_request(
+        customers + 1,
+        # 窄時間窗時每輛車能串的站少，車要多給才有可行解
+        max(3, customers // (5 if tight_windows else 15)),
+        seed,
+        window_widths=TIGHT_WINDOWS if tight_windows else None,
+        capacity_slack=CAPACITY_SLACK[tight_capacity],
+    )
+
+
+def trace_search(problem, fss: str, lsm: str, seconds: float) -> list[tuple[float, int]]:
+    """(elapsed, best objective so far) at each improving solution."""
+    _, routing, _ = build_model(problem)
+    trace = []
+    start = time.perf_counter()
+
+    def on_solution():
+        objective = routing.CostVar().Value()
+        if not trace or objective < trace[-1][1]:
+            trace.append((time.perf_counter() - start, objective))
+
+    routing.AddAtSolutionCallback(on_solution)
+    routing.SolveWithParameters(make_search_params(seconds, getattr(_FSS, fss), getattr(_LSM, lsm)))
+    return trace
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, math.ceil(q * len(ordered)) - 1)]
+
+
+def calibrate_bucket(
+    customers: int, tight_windows: bool, tight_capacity: bool, gap: float, seeds: list[int]
+) -> dict:
+    from vrp.solvers.ortools_v2.autoconfig import problem_features
+
+    seconds = REFERENCE_SECONDS[customers]
+    # config → 每個實例的達標秒數（沒達標 = 參考時間）
+    times = {config: [] for config in CANDIDATES}
+    features = []
+    for seed in seeds:
+        problem = compile_problem(make_instance(customers, tight_windows, tight_capacity, seed))
+        features.append(problem_features(problem))
+        traces = {config: trace_search(problem, *config, seconds) for config in CANDIDATES}
+        finals = [trace[-1][1] for trace in traces.values() if trace]
+        if not finals:
+            continue
+        target = min(finals) * (1 + gap)
+        for config, trace in traces.items():
+            times[config].append(next((t for t, objective in trace if objective <= target), seconds))
+
+    entry = {
+        "time_limit_seconds": seconds,
+        "first_solution_strategy": CANDIDATES[0][0],
+        "metaheuristic": CANDIDATES[0][1],
+        "time_to_target_seconds": None,
+    }
+    if times[CANDIDATES[0]]:
+        config = min(CANDIDATES, key=lambda c: (percentile(times[c], 0.5), percentile(times[c], 0.9)))
+        p90 = percentile(times[config], 0.9)
+        entry["first_solution_strategy"], entry["metaheuristic"] = config
+        entry["time_to_target_seconds"] = round(percentile(times[config], 0.5), 2)
+        entry["time_to_target_p90_seconds"] = round(p90, 2)
+        entry["time_limit_seconds"] = max(1, math.ceil(p90 * 1.5))
+    entry["instances"] = len(times[CANDIDATES[0]])
+    entry["window_ratio"] = round(sum(f.window_ratio for f in features) / len(features), 3)
+    entry["capacity_ratio"] = round(sum(f.capacity_ratio for f in features) / len(features), 3)
+    return entry
+
+
+def enforce_monotone(table: dict) -> dict:
+    """Within each (tight windows, tight capacity) pair, a larger band never gets a shorter time limit."""
+    for tight_windows in (False, True):
+        for tight_capacity in (False, True):
+            floor = 0
+            for customers in sorted(REFERENCE_SECONDS):
+                entry = table[customers, tight_windows, tight_capacity]
+                floor = max(floor, entry["time_limit_seconds"])
+                entry["time_limit_seconds"] = floor
+    return table
+
+
+def write_table(table: dict):
+    header = (
+        '"""\n'
+        "auto_configure 查表；由 benchmarks/calibrate_autoconfig.py 產生，請勿手動修改。\n\n"
+        "key = (規模區間上限（客戶數）, 時間窗緊, 容量緊)\n"
+        "time_to_target_seconds（中位數）/ time_to_target_p90_seconds / window_ratio / capacity_ratio\n"
+        "為校準實例的量測值，僅供參考；time_limit_seconds 隨規模不遞減。\n"
+        '"""\n\n'
+    )
+    rows = "".join(f"    {key!r}: {entry!r},\n" for key, entry in table.items())
+    body = f"SIZE_BANDS = {sorted(REFERENCE_SECONDS)!r}\n\nTABLE = {{\n{rows}}}\n"
+    TABLE_PATH.write_text(header + body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--gap", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=0, help="第一個實例的 seed，其餘依序 +1")
+    parser.add_argument("--instances", type=int, default=5, help="每個區間的實例數")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    seeds = list(range(args.seed, args.seed + args.instances))
+    table = {}
+    for customers in sorted(REFERENCE_SECONDS):
+        for tight_windows in (False, True):
+            for tight_capacity in (False, True):
+                key = (customers, tight_windows, tight_capacity)
+                table[key] = calibrate_bucket(customers, tight_windows, tight_capacity, args.gap, seeds)
+                print(json.dumps({"bucket": key, **table[key]}, ensure_ascii=False), flush=True)
+
+    enforce_monotone(table)
+    if not args.dry_run:
+        write_table(table)
+        print(f"wrote {TABLE_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+量測編譯各階段與每個 add_* 建模函式隨地點數 N、車輛數 V 的成長。
+
+只建模不搜尋。為了讓每個 v2 建模函式都有事做，實例中 --optional 比例的地點設為
+可選（unserved_penalty）、--restricted 比例的地點只允許前半車隊、每輛車都有
+max_duration；每個 (N, V) 重複 --repeat 次取中位數。
+
+用法（於 apps/ortools/src 執行）：
+    python -m benchmarks.model_build --sizes 100 300 1000 3000 --vehicles 10 50 200
+"""
+import argparse
+import json
+import random
+import statistics
+
+from benchmarks.instances import random_request
+from vrp.preprocess import compile_problem
+from vrp.solvers.ortools_v2.engine import build_model
+from vrp.timing import PhaseTimer
+
+
+def make_request(n: int, n_vehicles: int, seed: int, optional: float, restricted: float):
+    data = random_request(n, n_vehicles, seed)
+    rnd = random.Random(seed)
+    half = [v.id for v in data.vehicles[: max(1, n_vehicles // 2)]]
+    for vehicle in data.vehicles:
+        vehicle.max_duration_minutes = 600
+    for loc in data.locations[1:]:
+        if rnd.random() < optional:
+            loc.unserved_penalty = 100_000
+        if rnd.random() < restricted:
+            loc.allowed_vehicle_ids = half
+    return data
+
+
+def measure(data, break_symmetry: bool) -> dict:
+    timer = PhaseTimer()
+    problem = compile_problem(data, timer)
+    build_model(problem, break_symmetry, timer)
+    return timer.as_dict()
+
+
+def median_timings(runs: list[dict]) -> dict:
+    def median(key, group=None):
+        return round(statistics.median((run[group] if group else run)[key] for run in runs), 4)
+
+    phases = {key: median(key) for key in runs[0] if key != "builders"}
+    builders = {key: median(key, "builders") for key in runs[0]["builders"]}
+    return {**phases, "builders": builders}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 300, 1000, 3000])
+    parser.add_argument("--vehicles", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--optional", type=float, default=0.2)
+    parser.add_argument("--restricted", type=float, default=0.3)
+    parser.add_argument("--break-symmetry", action="store_true")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for n in args.sizes:
+        for n_vehicles in args.vehicles:
+            data = make_request(n, n_vehicles, args.seed, args.optional, args.restricted)
+            runs = [measure(data, args.break_symmetry) for _ in range(args.repeat)]
+            print(json.dumps({"n": n, "vehicles": n_vehicles, **median_timings(runs)}), flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+量測 v2 引擎在不同 N 下建模（compile_problem + 所有 add_*）後的峰值 RSS，
+用來確認 solve_vrp 的 memory=2048 還能撐到多大的 N。
+
+用法（於 apps/ortools/src 執行）：
+    python -m benchmarks.problem_memory --sizes 1000 2000 3000 4000
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+
+
+def _measure(n: int) -> dict:
+    import numpy as np
+    from ortools.constraint_solver import pywrapcp
+
+    from vrp.models.matrix import encode_matrix
+    from vrp.models.schema_v2 import VRPRequestV2
+    from vrp.preprocess import compile_problem
+    from vrp.solvers.ortools_v2.constraints import (
+        add_capacity_dimension,
+        add_distance_cost,
+        add_time_dimension_v2,
+    )
+
+    # 直接用 numpy 產生矩陣並走 int32-le-base64 路徑，避免 benchmark 本身的 list 佔用記憶體
+    rng = np.random.default_rng(0)
+    xy = rng.random((n, 2)) * 20_000
+    distance = np.hypot(
+        xy[:, None, 0] - xy[None, :, 0], xy[:, None, 1] - xy[None, :, 1]
+    ).astype(np.int32)
+    data = VRPRequestV2(
+        compute_id=n,
+        webhook_url="",
+        locations=[
+            {"id": i, "lat": 0, "lng": 0, "delivery": 0 if i == 0 else 1} for i in range(n)
+        ],
+        vehicles=[{"id": k, "capacity": n} for k in range(max(1, n // 25))],
+        distance_matrix=encode_matrix(distance),
+        time_matrix=encode_matrix(distance // 500),
+    )
+    del distance
+
+    start = time.perf_counter()
+    problem = compile_problem(data)
+    del data
+    manager = pywrapcp.RoutingIndexManager(
+        problem.num_locations, problem.num_vehicles, problem.depot_index
+    )
+    routing = pywrapcp.RoutingModel(manager)
+    add_distance_cost(routing, manager, problem)
+    add_capacity_dimension(routing, manager, problem)
+    add_time_dimension_v2(routing, manager, problem)
+    build_seconds = time.perf_counter() - start
+
+    return {
+        "n": n,
+        "build_seconds": round(build_seconds, 2),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 2000, 3000, 4000])
+    parser.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(_measure(args.child)))
+        return
+
+    # 每個 N 各開一個子行程，ru_maxrss 才不會被前一輪的峰值污染
+    for n in args.sizes:
+        out = subprocess.run(
+            [sys.executable, "-m", "benchmarks.problem_memory", "--child", str(n)],
+            capture_output=True, text=True, check=True,
+        )
+        print(out.stdout.strip())
+
+
+if __name__ == "__main__":
+    main()
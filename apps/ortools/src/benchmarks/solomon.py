@@ -0,0 +1,85 @@
+"""
+讀取 Solomon / Gehring–Homberger CVRPTW 實例檔（兩者格式相同）。
+
+    C101
+
+    VEHICLE
+    NUMBER     CAPACITY
+      25         200
+
+    CUSTOMER
+    CUST NO.  XCOORD.   YCOORD.    DEMAND   READY TIME  DUE DATE   SERVICE   TIME
+        0      40         50          0          0       1236          0
+        1      45         68         10        912        967         90
+    ...
+
+距離為歐氏距離、車速 1，引擎只吃整數，所以座標與時間都乘上 scale 後四捨五入；
+比較 best-known 時把 total_distance 除回 scale。
+"""
+from pathlib import Path
+
+import numpy as np
+
+from vrp.models.schema import VRPRequest
+from vrp.models.schema_v2 import VRPRequestV2
+
+DEFAULT_SCALE = 100
+
+
+def parse_solomon(text: str) -> tuple[str, int, int, np.ndarray]:
+    """Return (name, vehicle_count, capacity, rows) with rows = [id, x, y, demand, ready, due, service]."""
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    name = lines[0]
+    header = next(i for i, line in enumerate(lines) if line.upper().startswith("NUMBER"))
+    vehicle_count, capacity = (int(v) for v in lines[header + 1].split()[:2])
+
+    rows = []
+    for line in lines[header + 2:]:
+        fields = line.split()
+        if len(fields) == 7 and all(f.replace(".", "", 1).isdigit() for f in fields):
+            rows.append([float(f) for f in fields])
+    return name, vehicle_count, capacity, np.array(rows)
+
+
+def load_solomon(
+    path: str | Path,
+    engine: str = "v2",
+    time_limit_seconds: int = 30,
+    scale: int = DEFAULT_SCALE,
+    **v2_options,
+) -> VRPRequest:
+    """
+    Build a VRPRequest (engine="v1") or VRPRequestV2 from an instance file.
+    The webhook is disabled (empty webhook_url); v2_options are extra
+    VRPRequestV2 fields, e.g. early_stop=False.
+    """
+    name, vehicle_count, capacity, rows = parse_solomon(Path(path).read_text())
+    xy = rows[:, 1:3]
+    distance = np.rint(np.hypot(*(xy[:, None, :] - xy[None, :, :]).transpose(2, 0, 1)) * scale)
+    distance = distance.astype(np.int32)
+
+    locations = [
+        {
+            "id": int(row[0]),
+            "name": name if i == 0 else None,
+            # 座標只用於估算矩陣與分群；矩陣已完整提供，換成小範圍的經緯度即可
+            "lat": row[2] / 1000,
+            "lng": row[1] / 1000,
+            "delivery": int(row[3]),
+            "service_time": int(round(row[6] * scale)),
+            "time_window_start": int(round(row[4] * scale)),
+            "time_window_end": int(round(row[5] * scale)),
+        }
+        for i, row in enumerate(rows)
+    ]
+    request_cls = VRPRequestV2 if engine == "v2" else VRPRequest
+    return request_cls(
+        compute_id=0,
+        webhook_url="",
+        locations=locations,
+        vehicles=[{"id": k, "capacity": capacity} for k in range(vehicle_count)],
+        distance_matrix=distance,
+        time_matrix=distance,
+        time_limit_seconds=time_limit_seconds,
+        **(v2_options if engine == "v2" else {}),
+    )
@@ -0,0 +1,163 @@
+"""
+以 Solomon / Gehring–Homberger 標準實例量測 v1 / v2 引擎的品質與時間。
+
+每個（實例, 引擎）在獨立子行程內跑 solve_vrp_logic / solve_vrp_v2_logic（webhook 關閉），
+記錄：建模時間（解碼 + 編譯 + add_*）、達到 best-known 各 gap 的時間、
+最終距離與 gap、峰值 RSS。結果寫成 JSON，可用 --baseline 與先前的結果比較。
+
+best-known 檔為 JSON：{"C101": 828.94, "R101": 1637.7, ...}（只比距離）。
+
+用法（於 apps/ortools/src 執行）：
+    python -m benchmarks.standard ~/solomon/*.txt --bks ~/solomon/bks.json \\
+        --engines v1 v2 --time-limit 30 --output results.json
+    python -m benchmarks.standard ~/solomon/*.txt --bks ~/solomon/bks.json \\
+        --output new.json --baseline results.json
+"""
+import argparse
+import json
+import platform
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+GAPS = [0.10, 0.05, 0.02, 0.01, 0.0]
+
+
+def _run(path: str, engine: str, time_limit: int, scale: int, early_stop: bool) -> dict:
+    from ortools.constraint_solver import pywrapcp
+
+    from benchmarks.solomon import load_solomon
+    from vrp.solvers.ortools import solve_vrp_logic
+    from vrp.solvers.ortools_v2 import solve_vrp_v2_logic
+
+    # 攔截 RoutingModel 的 Solve*：記下搜尋開始時間，並掛上記錄目標值的 callback
+    trace = []
+    marks = {}
+
+    def traced(solve):
+        def wrapper(routing, *args):
+            marks.setdefault("search_start", time.perf_counter())
+
+            def on_solution():
+                objective = routing.CostVar().Value()
+                if not trace or objective < trace[-1][1]:
+                    trace.append((time.perf_counter() - start, objective))
+
+            routing.AddAtSolutionCallback(on_solution)
+            return solve(routing, *args)
+        return wrapper
+
+    for name in ("SolveWithParameters", "SolveFromAssignmentWithParameters"):
+        setattr(pywrapcp.RoutingModel, name, traced(getattr(pywrapcp.RoutingModel, name)))
+
+    start = time.perf_counter()
+    options = {} if early_stop else {"early_stop": False}
+    request = load_solomon(path, engine, time_limit, scale, **options)
+    logic = solve_vrp_v2_logic if engine == "v2" else solve_vrp_logic
+    payload = logic(0, request)
+
+    search_start = marks.get("search_start", start)
+    return {
+        "status": payload["status"],
+        "message": payload.get("message"),
+        "elapsed_seconds": payload["elapsed_seconds"],
+        "build_seconds": round(search_start - start, 3),
+        "distance": payload["total_distance"] / scale if payload["status"] == "success" else None,
+        "vehicles_used": len(payload.get("routes", [])),
+        "stop_reason": payload.get("stop_reason"),
+        # (秒數, 距離)：從讀檔開始計時，只記錄改善的解
+        "trace": [(round(t, 3), objective / scale) for t, objective in trace],
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def time_to_gaps(trace, best_known: float) -> dict:
+    return {
+        f"{gap:.0%}": next((t for t, distance in trace if distance <= best_known * (1 + gap)), None)
+        for gap in GAPS
+    }
+
+
+def compare(results: list[dict], baseline_path: str):
+    baseline = {
+        (r["instance"], r["engine"]): r for r in json.loads(Path(baseline_path).read_text())["results"]
+    }
+    for result in results:
+        old = baseline.get((result["instance"], result["engine"]))
+        if old is None or old["distance"] is None or result["distance"] is None:
+            continue
+        print(json.dumps({
+            "instance": result["instance"],
+            "engine": result["engine"],
+            "distance_change": round(result["distance"] / old["distance"] - 1, 4),
+            "build_seconds": [old["build_seconds"], result["build_seconds"]],
+            "peak_rss_mb": [old["peak_rss_mb"], result["peak_rss_mb"]],
+            "time_to_1%": [old["time_to_gap"].get("1%"), result["time_to_gap"].get("1%")],
+        }, ensure_ascii=False))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("instances", nargs="*")
+    parser.add_argument("--bks", help="best-known 距離 JSON 檔")
+    parser.add_argument("--engines", nargs="+", choices=["v1", "v2"], default=["v1", "v2"])
+    parser.add_argument("--time-limit", type=int, default=30)
+    parser.add_argument("--scale", type=int, default=100)
+    parser.add_argument("--no-early-stop", action="store_true", help="v2 一律跑滿 time limit")
+    parser.add_argument("--output", default="benchmark-results.json")
+    parser.add_argument("--baseline", help="先前的結果檔，印出差異")
+    parser.add_argument("--child", nargs=2, metavar=("PATH", "ENGINE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        path, engine = args.child
+        print(json.dumps(_run(path, engine, args.time_limit, args.scale, not args.no_early_stop)))
+        return
+
+    best_known = json.loads(Path(args.bks).read_text()) if args.bks else {}
+    results = []
+    for path in args.instances:
+        instance = Path(path).stem.upper()
+        for engine in args.engines:
+            # 每次各開一個子行程，ru_maxrss 與 monkeypatch 才不會互相污染
+            cmd = [
+                sys.executable, "-m", "benchmarks.standard", "--child", path, engine,
+                "--time-limit", str(args.time_limit), "--scale", str(args.scale),
+            ]
+            if args.no_early_stop:
+                cmd.append("--no-early-stop")
+            out = subprocess.run(cmd, capture_output=True, text=True, check=True)
+            result = {"instance": instance, "engine": engine, **json.loads(out.stdout.splitlines()[-1])}
+
+            bks = best_known.get(instance)
+            result["best_known"] = bks
+            result["gap"] = round(result["distance"] / bks - 1, 4) if bks and result["distance"] else None
+            result["time_to_gap"] = time_to_gaps(result["trace"], bks) if bks else {}
+            results.append(result)
+            print(json.dumps({k: v for k, v in result.items() if k != "trace"}, ensure_ascii=False))
+
+    meta = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "ortools": __import__("ortools").__version__,
+        "time_limit": args.time_limit,
+        "scale": args.scale,
+        "early_stop": not args.no_early_stop,
+    }
+    try:
+        meta["git"] = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        pass
+    Path(args.output).write_text(json.dumps({"meta": meta, "results": results}, ensure_ascii=False, indent=1))
+    print(f"wrote {args.output}")
+
+    if args.baseline:
+        compare(results, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
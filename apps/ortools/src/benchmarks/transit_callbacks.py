@@ -0,0 +1,136 @@
+"""
+比較 Python 回呼 (RegisterTransitCallback) 與預先展開矩陣 (RegisterTransitMatrix)
+在固定 time limit 下的搜尋量。
+
+用法（於 apps/ortools/src 執行）：
+    python -m benchmarks.transit_callbacks --sizes 100 500 1000 --time-limit 10
+"""
+import argparse
+import json
+import time
+
+from ortools.constraint_solver import pywrapcp, routing_enums_pb2
+
+from benchmarks.instances import random_request
+from vrp.preprocess import compile_problem
+from vrp.solvers.ortools_v2.constraints import (
+    add_capacity_dimension,
+    add_distance_cost,
+    add_time_dimension_v2,
+)
+
+
+def _add_callbacks_legacy(routing, manager, data):
+    """舊版寫法：每個 arc 評估都回呼一次 Python。"""
+    def distance_callback(from_index, to_index):
+        from_node = manager.IndexToNode(from_index)
+        to_node = manager.IndexToNode(to_index)
+        return int(data.distance_matrix[from_node, to_node])
+
+    routing.SetArcCostEvaluatorOfAllVehicles(
+        routing.RegisterTransitCallback(distance_callback)
+    )
+
+    def demand_callback(from_index):
+        loc = data.locations[manager.IndexToNode(from_index)]
+        return loc.pickup - loc.delivery
+
+    routing.AddDimensionWithVehicleCapacity(
+        routing.RegisterUnaryTransitCallback(demand_callback),
+        0,
+        [v.capacity for v in data.vehicles],
+        False,
+        "Capacity",
+    )
+
+    def time_callback(from_index, to_index):
+        from_node = manager.IndexToNode(from_index)
+        to_node = manager.IndexToNode(to_index)
+        return int(data.time_matrix[from_node, to_node]) + data.locations[from_node].service_time
+
+    max_time = max(loc.time_window_end for loc in data.locations)
+    routing.AddDimension(
+        routing.RegisterTransitCallback(time_callback), max_time, max_time, False, "Time"
+    )
+    time_dimension = routing.GetDimensionOrDie("Time")
+    for location_idx, loc in enumerate(data.locations):
+        time_dimension.CumulVar(manager.NodeToIndex(location_idx)).SetRange(
+            loc.time_window_start, loc.time_window_end
+        )
+
+
+def _add_callbacks_matrix(routing, manager, data):
+    problem = compile_problem(data)
+    add_distance_cost(routing, manager, problem)
+    add_capacity_dimension(routing, manager, problem)
+    add_time_dimension_v2(routing, manager, problem)
+
+
+def run_once(data, mode: str) -> dict:
+    build_start = time.perf_counter()
+    manager = pywrapcp.RoutingIndexManager(
+        len(data.locations), len(data.vehicles), data.depot_index
+    )
+    routing = pywrapcp.RoutingModel(manager)
+    if mode == "callback":
+        _add_callbacks_legacy(routing, manager, data)
+    else:
+        _add_callbacks_matrix(routing, manager, data)
+    build_seconds = time.perf_counter() - build_start
+
+    solutions = 0
+
+    def on_solution():
+        nonlocal solutions
+        solutions += 1
+
+    routing.AddAtSolutionCallback(on_solution)
+
+    search_params = pywrapcp.DefaultRoutingSearchParameters()
+    search_params.first_solution_strategy = (
+        routing_enums_pb2.FirstSolutionStrategy.PATH_CHEAPEST_ARC
+    )
+    search_params.local_search_metaheuristic = (
+        routing_enums_pb2.LocalSearchMetaheuristic.GUIDED_LOCAL_SEARCH
+    )
+    search_params.time_limit.seconds = data.time_limit_seconds
+
+    solve_start = time.perf_counter()
+    solution = routing.SolveWithParameters(search_params)
+    solve_seconds = time.perf_counter() - solve_start
+
+    return {
+        "mode": mode,
+        "build_seconds": round(build_seconds, 4),
+        "solve_seconds": round(solve_seconds, 3),
+        "solutions": solutions,
+        "branches": routing.solver().Branches(),
+        "objective": solution.ObjectiveValue() if solution else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 500, 1000])
+    parser.add_argument("--vehicles", type=int, default=0, help="0 = 每 25 站 1 輛車")
+    parser.add_argument("--time-limit", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rows = []
+    for n in args.sizes:
+        n_vehicles = args.vehicles or max(1, n // 25)
+        data = random_request(n, n_vehicles, args.seed, args.time_limit)
+        runs = {mode: run_once(data, mode) for mode in ("callback", "matrix")}
+        base = runs["callback"]["branches"] or 1
+        rows.append({
+            "n": n,
+            "vehicles": n_vehicles,
+            **runs,
+            "branch_speedup": round(runs["matrix"]["branches"] / base, 2),
+        })
+        print(json.dumps(rows[-1], ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
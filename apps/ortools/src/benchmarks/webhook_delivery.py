@@ -0,0 +1,140 @@
+"""
+以本機假 webhook server 驗證與量測結果 webhook 的發送。
+
+假 server 依 --fail-rate 隨機回 503，記錄每個 Idempotency-Key 與 client 連線數。
+比較：
+  legacy  每筆新建 httpx.Client、同步 post 一次（舊寫法，失敗即遺失）
+  pooled  vrp.webhook.deliver_webhook + outbox，之後反覆 drain 直到 outbox 清空
+回報每種寫法的發送耗時、開啟的連線數、送達的不同結果數與重複次數。
+
+用法（於 apps/ortools/src 執行）：
+    python -m benchmarks.webhook_delivery --messages 200 --fail-rate 0.3
+"""
+import argparse
+import json
+import random
+import tempfile
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+from vrp.webhook import Outbox, deliver_webhook, drain
+from vrp.webhook import outbox as outbox_module
+
+
+class StandInServer:
+    """Local receiver that fails a fraction of posts with 503."""
+
+    def __init__(self, fail_rate: float, seed: int):
+        self.received = Counter()
+        self.connections = set()
+        rnd = random.Random(seed)
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                server.connections.add(self.client_address)
+                if rnd.random() < fail_rate:
+                    status = 503
+                else:
+                    status = 200
+                    key = self.headers.get("Idempotency-Key") or json.loads(body)["compute_id"]
+                    server.received[key] += 1
+                self.send_response(status)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self._httpd.server_port}/internal/vrp-callback"
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+
+    def reset(self):
+        self.received.clear()
+        self.connections.clear()
+
+    def close(self):
+        self._httpd.shutdown()
+
+
+def make_payload(compute_id: int, stops: int) -> dict:
+    return {
+        "compute_id": compute_id,
+        "status": "success",
+        "routes": [{"vehicle_id": 1, "stops": [{"location_id": i, "arrival_time": i} for i in range(stops)]}],
+    }
+
+
+def run_legacy(server: StandInServer, payloads: list[dict]) -> dict:
+    start = time.perf_counter()
+    for payload in payloads:
+        try:
+            with httpx.Client() as client:
+                client.post(server.url, json=payload, timeout=10)
+        except Exception:
+            pass
+    return {"send_seconds": round(time.perf_counter() - start, 3)}
+
+
+def run_pooled(server: StandInServer, payloads: list[dict], max_drain_seconds: float) -> dict:
+    outbox = Outbox(tempfile.mkdtemp(prefix="webhook-outbox-"))
+    start = time.perf_counter()
+    first_try = sum(deliver_webhook(server.url, payload, outbox) for payload in payloads)
+    send_seconds = time.perf_counter() - start
+
+    drains = 0
+    while len(outbox) and time.perf_counter() - start < max_drain_seconds:
+        time.sleep(0.05)
+        # now=inf：不等 backoff 排定的時間，直接重送（只在量測時）
+        drain(outbox, now=float("inf"))
+        drains += 1
+    return {
+        "send_seconds": round(send_seconds, 3),
+        "delivered_first_try": first_try,
+        "drain_rounds": drains,
+        "all_delivered_seconds": round(time.perf_counter() - start, 3),
+        "left_in_outbox": len(outbox),
+        "dead": len(Outbox(outbox.dead_directory)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--stops", type=int, default=100, help="每筆 payload 的站數")
+    parser.add_argument("--fail-rate", type=float, default=0.3)
+    parser.add_argument("--max-drain-seconds", type=float, default=30)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    # 量測時不要等 jitter 之外的真實退避；MAX_ATTEMPTS 不變
+    outbox_module.BASE_DELAY_SECONDS = 0
+    server = StandInServer(args.fail_rate, args.seed)
+    payloads = [make_payload(i, args.stops) for i in range(args.messages)]
+    for mode in ("legacy", "pooled"):
+        server.reset()
+        if mode == "legacy":
+            result = run_legacy(server, payloads)
+        else:
+            result = run_pooled(server, payloads, args.max_drain_seconds)
+        print(json.dumps({
+            "mode": mode,
+            "messages": args.messages,
+            **result,
+            "connections": len(server.connections),
+            "delivered": len(server.received),
+            "duplicates": sum(server.received.values()) - len(server.received),
+        }))
+    server.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+比較 JSON 巢狀陣列與 int32-le-base64 區塊兩種矩陣傳輸格式的
+請求受理成本（解析 + 驗證）、解碼後峰值記憶體與送往 solve_vrp 的 pickle 大小。
+
+用法（於 apps/ortools/src 執行）：
+    python -m benchmarks.wire_format --sizes 500 1000 2000
+"""
+import argparse
+import json
+import pickle
+import time
+import tracemalloc
+
+from benchmarks.instances import random_request
+from vrp.models.matrix import encode_matrix
+from vrp.models.schema_v2 import VRPRequestV2
+
+
+def _accept(body: bytes) -> VRPRequestV2:
+    # 與 FastAPI 相同的路徑：先 json.loads，再交給 pydantic 驗證
+    return VRPRequestV2.model_validate(json.loads(body))
+
+
+def measure(body: bytes) -> dict:
+    tracemalloc.start()
+    start = time.perf_counter()
+    request = _accept(body)
+    accept_seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "body_mb": round(len(body) / 2**20, 2),
+        "accept_seconds": round(accept_seconds, 4),
+        "peak_mb": round(peak / 2**20, 2),
+        "pickled_mb": round(len(pickle.dumps(request)) / 2**20, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, 1000, 2000])
+    args = parser.parse_args()
+
+    for n in args.sizes:
+        request = random_request(n, max(1, n // 25))
+        as_json = request.model_dump(mode="json")
+        as_block = {
+            **as_json,
+            "distance_matrix": encode_matrix(request.distance_matrix),
+            "time_matrix": encode_matrix(request.time_matrix),
+        }
+        row = {
+            "n": n,
+            "json": measure(json.dumps(as_json).encode()),
+            "int32_base64": measure(json.dumps(as_block).encode()),
+        }
+        print(json.dumps(row, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,36 +1,161 @@
+import functools
+import os
+import tempfile
+import threading
+import time
 import uvicorn
 import asyncio
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from vrp.api.jobs import jobs_router
 from vrp.api.router import router as vrp_router
 from vrp.api.router_v2 import router_v2
+from vrp.models.problem import Problem
+from vrp.models.schema_v2 import ReoptimizeRequest
 from vrp.solvers.ortools import solve_vrp_logic
 from vrp.solvers.ortools_v2 import solve_vrp_v2_logic
+from vrp.solvers.ortools_v2.batch import solve_batch_logic
+from vrp.solvers.ortools_v2.reoptimize import reoptimize_vrp_v2_logic
+from vrp.store import DiskBackend, MatrixStore, MemoryBackend, default_job_store
+from vrp.store.job_store import JOB_STORE_DIR_ENV
+from vrp.webhook import OutboxWorker, default_outbox
+from vrp.workers import BATCH, INTERACTIVE, QueueFull, WorkerPool, job_lane, preload
 
 # ── 1. 建立一個模擬 Modal 行為的代理類別 ──
 # 因為 router.py 呼叫了 solve_vrp.spawn.aio(compute_id, request)
-# 我們在本地用 asyncio 模擬這種非同步啟動的行為
+# 我們在本地把求解丟進固定大小的 worker 行程池（vrp.workers.WorkerPool），依 _schedule 的
+# lane / 帳號排隊；佇列已滿時 submit 丟 QueueFull，由下方的 exception handler 轉成 503
+def _schedule(data) -> dict:
+    if isinstance(data, ReoptimizeRequest):
+        # 增量重排本來就是互動式，time_limit_ms 最多 30 秒
+        return {"lane": INTERACTIVE, "tenant": data.base.account_id}
+    # v1 傳 VRPRequest，v2 傳編譯好的 Problem
+    size = data.num_locations if isinstance(data, Problem) else len(data.locations)
+    return {"lane": job_lane(size, data.time_limit_seconds, data.priority), "tenant": data.account_id}
+
+
 class LocalSolverProxy:
-    def __init__(self, logic_fn):
-        self.spawn = self._SpawnProxy(logic_fn)
+    def __init__(self, logic_fn, pool: WorkerPool):
+        self.spawn = self._SpawnProxy(logic_fn, pool)
+        self.remote = self._RemoteProxy(logic_fn, pool)
 
     class _SpawnProxy:
-        def __init__(self, logic_fn):
+        def __init__(self, logic_fn, pool: WorkerPool):
+            self._logic_fn = logic_fn
+            self._pool = pool
+
+        async def aio(self, compute_id, data, *args):
+            future = self._pool.submit(self._logic_fn, compute_id, data, *args, **_schedule(data))
+            future.add_done_callback(functools.partial(_report_crash, compute_id))
+            print(f"[Local] 排入 VRP 求解任務: compute_id={compute_id}")
+
+    # 模擬 solve_fn.remote.aio(...)：等待結果並回傳
+    class _RemoteProxy:
+        def __init__(self, logic_fn, pool: WorkerPool):
             self._logic_fn = logic_fn
+            self._pool = pool
+
+        async def aio(self, compute_id, data, *args):
+            future = self._pool.submit(self._logic_fn, compute_id, data, *args, **_schedule(data))
+            return await asyncio.wrap_future(future)
+
+
+# 模擬 solve_vrp_v2_batch.spawn.aio(...)：彙整在 API 行程的執行緒裡做，各 item 排進同一個行程池
+class LocalBatchProxy:
+    def __init__(self, pool: WorkerPool):
+        self.spawn = self._SpawnProxy(pool)
+
+    class _SpawnProxy:
+        def __init__(self, pool: WorkerPool):
+            self._pool = pool
+
+        async def aio(self, batch_id, items, webhook_url=None, timings=None):
+            # 整批視為一個 job 判斷是否排得下；item 之後在 batch lane 排隊，不佔佇列上限
+            problems = [item for item in items if isinstance(item, Problem)]
+            tenant = problems[0].account_id if problems else None
+            self._pool.check_capacity(1, BATCH, tenant)
+            map_fn = functools.partial(self._pool.map, solve_vrp_v2_logic, lane=BATCH, tenant=tenant)
+            threading.Thread(
+                target=solve_batch_logic,
+                args=(batch_id, items, webhook_url, timings, map_fn),
+                daemon=True,
+            ).start()
+            print(f"[Local] 排入 VRP 批次: batch_id={batch_id}")
+
 
-        async def aio(self, compute_id, data):
-            print(f"[Local] 啟動 VRP 求解任務: compute_id={compute_id}")
-            asyncio.create_task(self._run_logic(compute_id, data))
+def _report_crash(compute_id, future):
+    # solver 函式自己會把錯誤寫成 error payload；這裡只會遇到 worker 行程死掉（例如 OOM）
+    if future.cancelled() or future.exception() is None:
+        return
+    message = f"worker 行程異常結束: {future.exception()}"
+    print(f"[Local] compute_id={compute_id} {message}")
+    app.state.job_store.finish(compute_id, {"compute_id": compute_id, "status": "error", "message": message})
+
+
+# job 狀態與結果存在磁碟（預設系統暫存目錄），solver 子行程（批次、portfolio）也能回報；
+# 必須在 worker 行程啟動前設定，子行程才會繼承
+os.environ.setdefault(JOB_STORE_DIR_ENV, os.path.join(tempfile.gettempdir(), "vrp-jobs"))
+
+# 固定大小的 solver 行程池：預設 CPU 數個 worker（另加 1 個只跑互動式 job 的行程）、
+# 每個 worker 最多排 8 個 job，可用 VRP_WORKERS / VRP_MAX_QUEUE 覆寫。行程在第一個 job 進來時才啟動
+worker_pool = WorkerPool(
+    int(os.environ.get("VRP_WORKERS", 0)) or None,
+    int(os.environ["VRP_MAX_QUEUE"]) if "VRP_MAX_QUEUE" in os.environ else None,
+    initializer=preload,
+    initargs=("vrp.solvers.ortools", "vrp.solvers.ortools_v2"),
+)
+
+
+def _evict_expired_jobs():
+    while True:
+        time.sleep(3600)
+        app.state.job_store.evict_expired()
+
+
+# 背景執行緒只在 server 啟動時開；spawn 出來的 worker 行程也會 import 本檔，不能在 import 時就開
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    threading.Thread(target=_evict_expired_jobs, daemon=True).start()
+    # 設定 VRP_WEBHOOK_OUTBOX_DIR 時，送不出去的結果 webhook 留在該目錄，由背景執行緒重送
+    outbox_worker = OutboxWorker(default_outbox()).start() if default_outbox() is not None else None
+    yield
+    if outbox_worker is not None:
+        outbox_worker.stop()
+    worker_pool.shutdown(wait=False)
 
-        async def _run_logic(self, compute_id, data):
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(None, self._logic_fn, compute_id, data)
 
 # ── 2. 初始化 FastAPI ──
-app = FastAPI(title="VRP Solver Local Dev")
-app.state.solve_vrp = LocalSolverProxy(solve_vrp_logic)
-app.state.solve_vrp_v2 = LocalSolverProxy(solve_vrp_v2_logic)
+app = FastAPI(title="VRP Solver Local Dev", lifespan=lifespan)
+app.state.solve_vrp = LocalSolverProxy(solve_vrp_logic, worker_pool)
+app.state.solve_vrp_v2 = LocalSolverProxy(solve_vrp_v2_logic, worker_pool)
+app.state.solve_vrp_v2_portfolio = app.state.solve_vrp_v2
+app.state.solve_vrp_v2_batch = LocalBatchProxy(worker_pool)
+app.state.reoptimize_vrp_v2 = LocalSolverProxy(reoptimize_vrp_v2_logic, worker_pool)
+# 設定 VRP_MATRIX_STORE_DIR 時矩陣快取寫入磁碟，否則只存在記憶體（重啟即清空）
+matrix_store_dir = os.environ.get("VRP_MATRIX_STORE_DIR")
+app.state.matrix_store = MatrixStore(
+    DiskBackend(matrix_store_dir) if matrix_store_dir else MemoryBackend()
+)
+app.state.job_store = default_job_store()
 app.include_router(vrp_router)
 app.include_router(router_v2)
+app.include_router(jobs_router)
+
+
+@app.exception_handler(QueueFull)
+async def queue_full_handler(request: Request, exc: QueueFull):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+# 佇列深度、等待時間 p50 / p95 等行程池指標（只有 local_dev 有，Modal 由平台排程）
+@app.get("/vrp/workers")
+async def worker_stats():
+    return worker_pool.stats()
 
 if __name__ == "__main__":
     print("🚀 正在本地啟動 VRP API (純本地模式，不使用 Modal)...")
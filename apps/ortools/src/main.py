@@ -6,37 +6,101 @@ from fastapi import FastAPI
 image = (
     modal.Image.debian_slim(python_version="3.14")
     .pip_install("uv")
-    .run_commands("uv pip install --system ortools 'fastapi[standard]' httpx")
+    .run_commands("uv pip install --system ortools 'fastapi[standard]' httpx numpy")
+    # job 狀態與結果放在 Modal Dict，api 與 solver container 共用（見 vrp.store.job_store）
+    .env({"VRP_WEBHOOK_OUTBOX_DIR": "/outbox", "VRP_JOB_STORE_DICT": "vrp-jobs"})
     .add_local_python_source("vrp")
 )
 
 app = modal.App("ortools-vrp-solver", image=image)
 
+# 矩陣快取（matrix_id）放在 Volume 上，api container 重啟或擴展後仍可命中
+matrix_volume = modal.Volume.from_name("vrp-matrix-store", create_if_missing=True)
+# 送不出去的結果 webhook 留在這個 Volume，由 drain_webhook_outbox 定期重送
+outbox_volume = modal.Volume.from_name("vrp-webhook-outbox", create_if_missing=True)
+
 # ── 2. 核心求解函式 (Modal Function) ──
 # 注意：OR-Tools 的 RoutingModel 搜尋演算法（如 Local Search）主要是單執行緒運作。
 # 因此，將 cpu 設為 1.0 或 2.0 即可，增加更多 CPU 核心並不會加速單一任務的求解速度。
 # 資源分配的重點應在於 'memory'，因為當地點數量 (N) 增加時，
 # 距離與時間矩陣的大小是按 N^2 增長，記憶體不足會導致 OOM (Out of Memory) 崩潰。
-@app.function(cpu=1.0, memory=2048)
-def solve_vrp(compute_id: int, data):
+# 矩陣在 request 解碼時即為 int32 ndarray，引擎再編譯成唯讀的 Problem
+# （vrp.models.problem），N=3000 時每個矩陣約 36 MB，主要峰值落在
+# RegisterTransitMatrix 交給 C++ 前的 tolist() 暫存。
+@app.function(cpu=1.0, memory=2048, volumes={"/outbox": outbox_volume})
+def solve_vrp(compute_id: int, data, timings: dict | None = None):
     from vrp.solvers.ortools import solve_vrp_logic
-    return solve_vrp_logic(compute_id, data)
+    return solve_vrp_logic(compute_id, data, timings)
 
 
-@app.function(cpu=1.0, memory=2048)
-def solve_vrp_v2(compute_id: int, data):
+@app.function(cpu=1.0, memory=2048, volumes={"/outbox": outbox_volume})
+def solve_vrp_v2(compute_id: int, data, timings: dict | None = None):
     from vrp.solvers.ortools_v2 import solve_vrp_v2_logic
-    return solve_vrp_v2_logic(compute_id, data)
+    return solve_vrp_v2_logic(compute_id, data, timings)
+
+
+# portfolio_size > 1 時，同一個 container 內以多個行程平行跑不同搜尋設定，
+# 每個行程各佔一顆核心；vrp.solvers.ortools_v2.portfolio 會依 cgroup 配額把行程數限制在 cpu 數以內。
+@app.function(cpu=4.0, memory=4096, volumes={"/outbox": outbox_volume})
+def solve_vrp_v2_portfolio(compute_id: int, data, timings: dict | None = None):
+    from vrp.solvers.ortools_v2 import solve_vrp_v2_logic
+    return solve_vrp_v2_logic(compute_id, data, timings)
+
+
+# /vrp/v2/solve-batch：此 function 只負責分派與彙整，各 item 以 starmap 分散到 solve_vrp_v2 的 container
+@app.function(cpu=0.25, memory=1024, timeout=3600, volumes={"/outbox": outbox_volume})
+def solve_vrp_v2_batch(batch_id: int, items: list, webhook_url: str | None = None, timings: dict | None = None):
+    from vrp.solvers.ortools_v2.batch import solve_batch_logic
+    return solve_batch_logic(
+        batch_id,
+        items,
+        webhook_url,
+        timings,
+        map_fn=lambda calls: solve_vrp_v2.starmap(calls, return_exceptions=True),
+    )
+
+
+# /vrp/v2/reoptimize 為同步呼叫（.remote），小幅異動只做插入 + 短暫 local search
+@app.function(cpu=1.0, memory=2048)
+def reoptimize_vrp_v2(compute_id: int, data, timings: dict | None = None):
+    from vrp.solvers.ortools_v2.reoptimize import reoptimize_vrp_v2_logic
+    return reoptimize_vrp_v2_logic(compute_id, data, timings)
+
+# 結果 webhook 在 solver 內只送一次，失敗的留在 outbox；這裡以指數退避重送，solver container 不必等
+@app.function(schedule=modal.Period(minutes=1), volumes={"/outbox": outbox_volume})
+def drain_webhook_outbox():
+    from vrp.webhook import default_outbox, drain
+    outbox_volume.reload()
+    counts = drain(default_outbox())
+    outbox_volume.commit()
+    return counts
+
+# GET /vrp/jobs 讀取時也會略過過期的紀錄；這裡定期清掉沒人再讀的
+@app.function(schedule=modal.Period(hours=1))
+def evict_expired_jobs():
+    from vrp.store import default_job_store
+    return default_job_store().evict_expired()
 
 # ── 3. FastAPI 應用程式 ──
-@app.function()
+@app.function(volumes={"/data": matrix_volume})
 @modal.asgi_app()
 def api():
+    from vrp.api.jobs import jobs_router
     from vrp.api.router import router as vrp_router
     from vrp.api.router_v2 import router_v2
+    from vrp.store import DiskBackend, MatrixStore, default_job_store
     web_app = FastAPI()
     web_app.state.solve_vrp = solve_vrp
     web_app.state.solve_vrp_v2 = solve_vrp_v2
+    web_app.state.solve_vrp_v2_portfolio = solve_vrp_v2_portfolio
+    web_app.state.solve_vrp_v2_batch = solve_vrp_v2_batch
+    web_app.state.reoptimize_vrp_v2 = reoptimize_vrp_v2
+    # 其他 api container 寫入的矩陣要 reload 才看得到；沒找到時先 reload 再回 404
+    web_app.state.matrix_store = MatrixStore(
+        DiskBackend("/data/matrix-store", reload=matrix_volume.reload)
+    )
+    web_app.state.job_store = default_job_store()
     web_app.include_router(vrp_router)
     web_app.include_router(router_v2)
+    web_app.include_router(jobs_router)
     return web_app
@@ -0,0 +1,83 @@
+import asyncio
+import time
+from dataclasses import asdict
+
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+
+from vrp.store import CANCELLED, DONE
+
+jobs_router = APIRouter(prefix="/vrp/jobs", tags=["VRP jobs"])
+
+# DELETE ?wait=true 最多等幾秒讓 worker 停下並存好結果
+CANCEL_WAIT_SECONDS = 5.0
+CANCEL_WAIT_POLL_SECONDS = 0.1
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+
+@jobs_router.get("/{compute_id}")
+async def get_job(compute_id: int, req: Request, include_result: bool = True):
+    """
+    State, timings and last objective of a solve, plus its payload once done
+    or cancelled.
+
+    The ETag changes on every state / objective update, so a poller sending
+    If-None-Match gets an empty 304 until something actually changed.
+    """
+    store = req.app.state.job_store
+    record = await run_in_threadpool(store.get, compute_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"compute_id {compute_id} 不存在或已過期")
+
+    etag = f'"{compute_id}-{record.version}-{int(include_result)}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(req.headers.get("If-None-Match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    body = asdict(record)
+    if include_result and record.state in (DONE, CANCELLED):
+        body["result"] = await run_in_threadpool(store.result, compute_id)
+    return JSONResponse(body, headers=headers)
+
+
+@jobs_router.delete("/{compute_id}")
+async def cancel_job(compute_id: int, req: Request, wait: bool = False):
+    """
+    Cancel a queued or running solve.
+
+    A queued job is cancelled at once (200). A running search is stopped by
+    its worker within about 0.1 s and keeps the best solution found so far
+    as a status "cancelled" payload, stored for GET and sent to the webhook;
+    the response is 202 while the worker is still stopping. With wait=true
+    it waits up to CANCEL_WAIT_SECONDS for that and returns 200 with the
+    payload as "result" (a search finishing on its own in the meantime is
+    returned as done). A job that already finished is left as is (409).
+    """
+    store = req.app.state.job_store
+    record = await run_in_threadpool(store.cancel, compute_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"compute_id {compute_id} 不存在或已過期")
+    if record.state == DONE:
+        raise HTTPException(status_code=409, detail=f"compute_id {compute_id} 已完成，無法取消")
+
+    deadline = time.monotonic() + CANCEL_WAIT_SECONDS
+    while wait and record.state not in (DONE, CANCELLED) and time.monotonic() < deadline:
+        await asyncio.sleep(CANCEL_WAIT_POLL_SECONDS)
+        record = await run_in_threadpool(store.get, compute_id)
+        if record is None:
+            raise HTTPException(status_code=404, detail=f"compute_id {compute_id} 不存在或已過期")
+
+    if record.state not in (DONE, CANCELLED):
+        return JSONResponse(asdict(record), status_code=202)
+    body = asdict(record)
+    result = await run_in_threadpool(store.result, compute_id)
+    if result is not None:
+        body["result"] = result
+    return JSONResponse(body)
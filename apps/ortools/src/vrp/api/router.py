@@ -1,26 +1,39 @@
 from fastapi import APIRouter, HTTPException, Request
+from starlette.concurrency import run_in_threadpool
 
+from vrp.api.timing import TimedRoute, request_timer
 from vrp.models.schema import VRPRequest
 
-router = APIRouter(prefix="/vrp", tags=["VRP"])
+router = APIRouter(prefix="/vrp", tags=["VRP"], route_class=TimedRoute)
 
 
 @router.post("/solve", status_code=202)
 async def start_computation(request: VRPRequest, req: Request):
+    timer = request_timer(req)
     n = len(request.locations)
-    if len(request.distance_matrix) != n:
+    if request.distance_matrix is not None and request.distance_matrix.shape != (n, n):
+        rows, cols = request.distance_matrix.shape
         raise HTTPException(
             status_code=422,
-            detail=f"distance_matrix 應為 {n}x{n}，但收到 {len(request.distance_matrix)} 列",
+            detail=f"distance_matrix 應為 {n}x{n}，但收到 {rows}x{cols}",
         )
-    if len(request.time_matrix) != n:
+    if request.time_matrix is not None and request.time_matrix.shape != (n, n):
+        rows, cols = request.time_matrix.shape
         raise HTTPException(
             status_code=422,
-            detail=f"time_matrix 應為 {n}x{n}，但收到 {len(request.time_matrix)} 列",
+            detail=f"time_matrix 應為 {n}x{n}，但收到 {rows}x{cols}",
         )
 
+    # 先登記為 queued 再 spawn，worker 的 running 才不會被覆蓋回 queued
+    job_store = req.app.state.job_store
+    await run_in_threadpool(job_store.create, request.compute_id)
     solve_vrp = req.app.state.solve_vrp
-    await solve_vrp.spawn.aio(request.compute_id, request)
+    try:
+        await solve_vrp.spawn.aio(request.compute_id, request, timer.as_dict())
+    except Exception:
+        # 沒有送出（例如 local_dev 佇列已滿）就不留 queued 紀錄
+        await run_in_threadpool(job_store.delete, request.compute_id)
+        raise
 
     return {
         "message": "VRP 計算已啟動 (Modal Serverless)",
@@ -1,28 +1,179 @@
 from fastapi import APIRouter, HTTPException, Request
+from starlette.concurrency import run_in_threadpool
 
-from vrp.models.schema_v2 import VRPRequestV2
+from vrp.api.timing import TimedRoute, request_timer
+from vrp.models.schema_v2 import MatrixUpload, ReoptimizeRequest, VRPBatchRequest, VRPRequestV2
+from vrp.preprocess import compile_problem
+from vrp.timing import PhaseTimer
 
-router_v2 = APIRouter(prefix="/vrp/v2", tags=["VRP v2"])
+router_v2 = APIRouter(prefix="/vrp/v2", tags=["VRP v2"], route_class=TimedRoute)
 
 
-@router_v2.post("/solve", status_code=202)
-async def start_computation_v2(request: VRPRequestV2, req: Request):
+@router_v2.post("/matrices", status_code=201)
+async def upload_matrices(upload: MatrixUpload, req: Request):
+    n = len(upload.location_ids)
+    if upload.distance_matrix.shape != (n, n) or upload.time_matrix.shape != (n, n):
+        raise HTTPException(
+            status_code=422,
+            detail=f"distance_matrix / time_matrix 應為 {n}x{n}",
+        )
+
+    store = req.app.state.matrix_store
+    matrix_id = await run_in_threadpool(
+        store.put, upload.location_ids, upload.distance_matrix, upload.time_matrix
+    )
+    return {"matrix_id": matrix_id}
+
+
+async def _resolve_matrix_id(request: VRPRequestV2, store):
+    stored = await run_in_threadpool(store.get, request.matrix_id)
+    if stored is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"matrix_id {request.matrix_id} 不存在或已被淘汰，請重新上傳矩陣",
+        )
+    if stored.location_ids.tolist() != [loc.id for loc in request.locations]:
+        raise HTTPException(
+            status_code=409,
+            detail="matrix_id 對應的 location id 順序與 locations 不一致",
+        )
+    request.distance_matrix = stored.distance
+    request.time_matrix = stored.time
+
+
+async def _prepare(request: VRPRequestV2, req: Request, timer: PhaseTimer):
+    """Resolve / cache matrices and compile; returns (problem, matrix_id) or raises HTTPException."""
+    store = req.app.state.matrix_store
+    matrix_id = request.matrix_id
+    if matrix_id is not None:
+        with timer.phase("matrix"):
+            await _resolve_matrix_id(request, store)
+
     n = len(request.locations)
-    if len(request.distance_matrix) != n:
+    if request.distance_matrix is not None and request.distance_matrix.shape != (n, n):
+        rows, cols = request.distance_matrix.shape
         raise HTTPException(
             status_code=422,
-            detail=f"distance_matrix 應為 {n}x{n}，但收到 {len(request.distance_matrix)} 列",
+            detail=f"distance_matrix 應為 {n}x{n}，但收到 {rows}x{cols}",
         )
-    if len(request.time_matrix) != n:
+    if request.time_matrix is not None and request.time_matrix.shape != (n, n):
+        rows, cols = request.time_matrix.shape
         raise HTTPException(
             status_code=422,
-            detail=f"time_matrix 應為 {n}x{n}，但收到 {len(request.time_matrix)} 列",
+            detail=f"time_matrix 應為 {n}x{n}，但收到 {rows}x{cols}",
         )
 
-    solve_vrp_v2 = req.app.state.solve_vrp_v2
-    await solve_vrp_v2.spawn.aio(request.compute_id, request)
+    # 完整矩陣隨 request 傳入時順手存起來，之後同一組地點可只傳 matrix_id
+    if matrix_id is None and request.distance_matrix is not None and request.time_matrix is not None:
+        with timer.phase("matrix"):
+            matrix_id = await run_in_threadpool(
+                store.put,
+                [loc.id for loc in request.locations],
+                request.distance_matrix,
+                request.time_matrix,
+            )
+
+    # 在這裡先編譯：趕不上時間窗的必訪地點等問題直接回 422，不必等 worker 搜尋完才失敗
+    try:
+        problem = await run_in_threadpool(compile_problem, request, timer)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return problem, matrix_id
+
+
+@router_v2.post("/solve", status_code=202)
+async def start_computation_v2(request: VRPRequestV2, req: Request):
+    timer = request_timer(req)
+    problem, matrix_id = await _prepare(request, req, timer)
+
+    # 先登記為 queued 再 spawn，worker 的 running 才不會被覆蓋回 queued
+    job_store = req.app.state.job_store
+    await run_in_threadpool(job_store.create, request.compute_id)
+
+    # portfolio 需要多核心，交給另一個 CPU 配額較大的 function
+    if request.portfolio_size > 1:
+        solve_vrp_v2 = req.app.state.solve_vrp_v2_portfolio
+    else:
+        solve_vrp_v2 = req.app.state.solve_vrp_v2
+    try:
+        await solve_vrp_v2.spawn.aio(request.compute_id, problem, timer.as_dict())
+    except Exception:
+        # 沒有送出（例如 local_dev 佇列已滿）就不留 queued 紀錄
+        await run_in_threadpool(job_store.delete, request.compute_id)
+        raise
 
     return {
         "message": "VRP v2 計算已啟動 (Modal Serverless)",
         "compute_id": request.compute_id,
+        "matrix_id": matrix_id,
+    }
+
+
+@router_v2.post("/solve-batch", status_code=202)
+async def start_batch_v2(batch: VRPBatchRequest, req: Request):
+    """
+    Validate and compile every item here, then fan the solves out in one
+    call. An item that fails validation does not reject the batch: it is
+    reported with status "error" here and in its webhook / the aggregate.
+    """
+    decode = request_timer(req).as_dict()
+    job_store = req.app.state.job_store
+    items = []
+    accepted = []
+    for request in batch.items:
+        timer = PhaseTimer(decode)
+        try:
+            problem, matrix_id = await _prepare(request, req, timer)
+        except HTTPException as e:
+            payload = {"compute_id": request.compute_id, "status": "error", "message": e.detail}
+            await run_in_threadpool(job_store.create, request.compute_id)
+            await run_in_threadpool(job_store.finish, request.compute_id, payload)
+            items.append({"webhook_url": request.webhook_url, "payload": payload})
+            accepted.append({"compute_id": request.compute_id, "status": "error", "message": e.detail})
+            continue
+        await run_in_threadpool(job_store.create, request.compute_id)
+        items.append(problem)
+        accepted.append({"compute_id": request.compute_id, "status": "queued", "matrix_id": matrix_id})
+
+    # 批次內的 item 以單核心 worker 平行求解；portfolio_size 在此不會多開核心
+    solve_vrp_v2_batch = req.app.state.solve_vrp_v2_batch
+    try:
+        await solve_vrp_v2_batch.spawn.aio(batch.batch_id, items, batch.webhook_url, decode)
+    except Exception:
+        for request in batch.items:
+            await run_in_threadpool(job_store.delete, request.compute_id)
+        raise
+
+    return {
+        "message": "VRP v2 批次計算已啟動 (Modal Serverless)",
+        "batch_id": batch.batch_id,
+        "items": accepted,
     }
+
+
+@router_v2.post("/reoptimize")
+async def reoptimize_v2(request: ReoptimizeRequest, req: Request):
+    """
+    Synchronous: insert / remove stops against a previous plan and return the
+    updated routes in the response body (no webhook).
+    """
+    timer = request_timer(req)
+    base = request.base
+    if base.matrix_id is not None:
+        with timer.phase("matrix"):
+            await _resolve_matrix_id(base, req.app.state.matrix_store)
+
+    n = len(base.locations)
+    for name, matrix in (("distance_matrix", base.distance_matrix), ("time_matrix", base.time_matrix)):
+        if matrix is not None and matrix.shape != (n, n):
+            rows, cols = matrix.shape
+            raise HTTPException(
+                status_code=422,
+                detail=f"base.{name} 應為 {n}x{n}，但收到 {rows}x{cols}",
+            )
+
+    reoptimize_vrp_v2 = req.app.state.reoptimize_vrp_v2
+    payload = await reoptimize_vrp_v2.remote.aio(base.compute_id, request, timer.as_dict())
+    if payload["status"] == "error":
+        raise HTTPException(status_code=422, detail=payload["message"])
+    return payload
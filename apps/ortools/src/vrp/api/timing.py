@@ -0,0 +1,28 @@
+import time
+
+from fastapi import Request
+from fastapi.routing import APIRoute
+
+from vrp.timing import PhaseTimer
+
+
+class TimedRoute(APIRoute):
+    """Stamps the request before FastAPI reads, parses and validates the body."""
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def timed_handler(request: Request):
+            request.state.received_at = time.perf_counter()
+            return await handler(request)
+
+        return timed_handler
+
+
+def request_timer(req: Request) -> PhaseTimer:
+    """A PhaseTimer starting with "decode": body read + JSON parse + pydantic validation."""
+    timer = PhaseTimer()
+    received_at = getattr(req.state, "received_at", None)
+    if received_at is not None:
+        timer.add("decode", time.perf_counter() - received_at)
+    return timer
@@ -0,0 +1,97 @@
+import base64
+from typing import Annotated
+
+import numpy as np
+from pydantic import BeforeValidator, PlainSerializer, WithJsonSchema
+
+MATRIX_DTYPE = np.dtype("<i4")
+MATRIX_ENCODING = "int32-le-base64"
+
+
+def encode_matrix(matrix) -> dict:
+    """Encode an N x N matrix as the compact base64 block accepted by Matrix."""
+    arr = np.ascontiguousarray(matrix, dtype=MATRIX_DTYPE)
+    return {
+        "encoding": MATRIX_ENCODING,
+        "shape": list(arr.shape),
+        "data": base64.b64encode(arr.tobytes()).decode("ascii"),
+    }
+
+
+def _decode_block(block: dict) -> np.ndarray:
+    if block.get("encoding") != MATRIX_ENCODING:
+        raise ValueError(f"不支援的矩陣編碼：{block.get('encoding')!r}，僅支援 {MATRIX_ENCODING}")
+    shape = block.get("shape")
+    # bool 是 int 的子類別，要另外排除；型別不對時丟 TypeError 會變成 500
+    if (
+        not isinstance(shape, list)
+        or len(shape) != 2
+        or not all(isinstance(dim, int) and not isinstance(dim, bool) and dim >= 0 for dim in shape)
+    ):
+        raise ValueError("矩陣 shape 必須是 [N, N]（兩個非負整數）")
+    shape = tuple(shape)
+    try:
+        raw = base64.b64decode(block["data"], validate=True)
+    except (KeyError, TypeError, ValueError):
+        raise ValueError("矩陣 data 不是合法的 base64 字串")
+    if len(raw) != shape[0] * shape[1] * MATRIX_DTYPE.itemsize:
+        raise ValueError(f"矩陣 data 長度 {len(raw)} bytes 與 shape {list(shape)} 不符")
+    # frombuffer 不複製資料；轉成原生 byte order 後即為連續的 int32 陣列
+    return np.frombuffer(raw, dtype=MATRIX_DTYPE).reshape(shape).astype(np.int32, copy=False)
+
+
+def _decode_nested(rows) -> np.ndarray:
+    try:
+        arr = np.array(rows)
+    except ValueError:
+        raise ValueError("矩陣必須是 N x N 的正方形")
+    if arr.size and arr.dtype.kind == "f":
+        if not np.all(np.mod(arr, 1) == 0):
+            raise ValueError("矩陣元素必須是整數")
+    elif arr.size and arr.dtype.kind not in "iu":
+        raise ValueError("矩陣元素必須是整數")
+    info = np.iinfo(np.int32)
+    if arr.size and (arr.min() < info.min or arr.max() > info.max):
+        raise ValueError("矩陣元素超出 int32 範圍")
+    return arr.astype(np.int32)
+
+
+def decode_matrix(value) -> np.ndarray:
+    """
+    Accept either a JSON list of lists or an int32 little-endian base64 block:
+        {"encoding": "int32-le-base64", "shape": [N, N], "data": "<base64>"}
+    and return a contiguous int32 ndarray. Only the shape is checked here;
+    the N x N check against len(locations) happens in the router.
+    """
+    if isinstance(value, np.ndarray):
+        arr = value.astype(np.int32, copy=False)
+    elif isinstance(value, dict):
+        arr = _decode_block(value)
+    elif isinstance(value, list):
+        arr = _decode_nested(value)
+    else:
+        raise ValueError("矩陣必須是二維整數陣列或 base64 編碼區塊")
+    if arr.ndim != 2 or arr.shape[0] != arr.shape[1]:
+        raise ValueError("矩陣必須是 N x N 的正方形")
+    return np.ascontiguousarray(arr)
+
+
+Matrix = Annotated[
+    np.ndarray,
+    BeforeValidator(decode_matrix),
+    PlainSerializer(lambda arr: arr.tolist(), when_used="json"),
+    WithJsonSchema({
+        "anyOf": [
+            {"type": "array", "items": {"type": "array", "items": {"type": "integer"}}},
+            {
+                "type": "object",
+                "properties": {
+                    "encoding": {"const": MATRIX_ENCODING},
+                    "shape": {"type": "array", "items": {"type": "integer"}},
+                    "data": {"type": "string", "contentEncoding": "base64"},
+                },
+                "required": ["encoding", "shape", "data"],
+            },
+        ]
+    }),
+]
@@ -0,0 +1,81 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+UNSET = -1  # 可選欄位未設定（None）時在整數陣列中的值
+
+
+@dataclass(frozen=True, slots=True)
+class Problem:
+    """
+    Compiled, immutable form of VRPRequest / VRPRequestV2 used by the solvers.
+
+    Everything is stored as flat numpy arrays so the solve does not keep a
+    pydantic object (and a Python int per matrix cell) alive. Optional v2
+    fields use UNSET where the request had None. All arrays are read-only.
+    """
+    compute_id: int
+    webhook_url: str
+    depot_index: int
+    time_limit_seconds: int
+
+    # ── 地點（長度 N）──
+    location_ids: np.ndarray        # int64
+    location_names: tuple[str | None, ...]
+    lat: np.ndarray                 # float64
+    lng: np.ndarray                 # float64
+    pickup: np.ndarray              # int32
+    delivery: np.ndarray            # int32
+    service_time: np.ndarray        # int32
+    time_window_start: np.ndarray   # int32
+    time_window_end: np.ndarray     # int32
+    unserved_penalty: np.ndarray    # int64，UNSET = 必訪
+    late_penalty: np.ndarray        # int64，UNSET = 硬性時間窗
+    allowed_vehicles: tuple[tuple[int, ...] | None, ...]  # 允許的車輛 index，None = 不限
+    # time_window_start / 硬性 time_window_end 已依 vrp.preprocess.windows 收緊（v2）
+
+    # ── 車輛（長度 V）──
+    vehicle_ids: np.ndarray         # int64
+    capacity: np.ndarray            # int64
+    fixed_cost: np.ndarray          # int64
+    max_duration: np.ndarray        # int64，UNSET = 無上限
+
+    # ── 矩陣（N x N int32）──
+    distance: np.ndarray
+    transit_time: np.ndarray        # 行駛時間 + 出發點服務時間
+    forbidden_arcs: np.ndarray | None = None   # bool N x N，True = 不可由 i 直接到 j
+    pruned_arcs: int = 0            # forbidden_arcs 中由 vrp.preprocess.pruning 剪掉的 arc 數
+    unreachable: frozenset[int] = frozenset()  # 趕不上時間窗的可選地點 node，直接列為未服務
+
+    # ── 求解設定 ──
+    portfolio_size: int = 1         # 平行搜尋的設定數，1 = 單一搜尋
+    initial_routes: tuple[tuple[int, ...], ...] | None = None  # 每輛車（依 index）的初始路線 node，不含 depot
+    cluster_size: int | None = None # 設定時先分群再各自求解（見 ortools_v2.decompose）
+    break_symmetry: bool = False    # 同類車輛依 index 順序使用（見 ortools_v2.constraints.add_symmetry_breaking）
+    auto_configure: bool = False    # 依問題特徵查表決定 time limit 與搜尋設定（見 ortools_v2.autoconfig）
+    early_stop: bool = False                   # 目標值停滯時提前結束（見 ortools_v2.monitor）
+    plateau_seconds: float | None = None       # 這麼多秒沒有明顯改善就提前結束，None = 依規模自動決定
+    plateau_solutions: int | None = None       # 連續這麼多個解沒有明顯改善就提前結束，None = 不檢查
+    plateau_min_improvement: float = 0.001     # 相對改善幅度至少這麼多才算改善
+    progress_webhook_url: str | None = None    # 搜尋中改善的解送到這裡（見 ortools_v2.progress）
+    progress_interval_seconds: float = 1.0     # 進度 webhook 最短間隔
+
+    # ── 排程（見 vrp.workers.scheduler）──
+    account_id: int | None = None
+    priority: str | None = None     # interactive / batch，None = 依規模自動判斷
+
+    @property
+    def num_locations(self) -> int:
+        return len(self.location_ids)
+
+    @property
+    def num_vehicles(self) -> int:
+        return len(self.vehicle_ids)
+
+    @property
+    def demand(self) -> np.ndarray:
+        return self.pickup - self.delivery
+
+    @property
+    def horizon(self) -> int:
+        return int(self.time_window_end.max())
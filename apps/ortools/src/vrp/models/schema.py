@@ -1,5 +1,7 @@
-from pydantic import BaseModel, field_validator
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+from typing import Literal, Optional
+
+from vrp.models.matrix import Matrix
 
 
 class Location(BaseModel):
@@ -20,7 +22,16 @@ class Vehicle(BaseModel):
     fixed_cost: int = 0
 
 
+class MatrixModel(BaseModel):
+    # distance_matrix / time_matrix 省略時，solver 依 lat/lng 自行估算的參數
+    metric: Literal["haversine", "equirectangular"] = "haversine"
+    detour_factor: float = Field(1.3, ge=1.0)   # 道路距離 ≈ 直線距離 x detour_factor
+    speed_kmh: float = Field(30.0, gt=0)        # 由距離換算行駛時間的平均車速
+
+
 class VRPRequest(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
     compute_id: int
     webhook_url: str
 
@@ -29,11 +40,19 @@ class VRPRequest(BaseModel):
     locations: list[Location]
     vehicles: list[Vehicle]
 
-    distance_matrix: list[list[int]]    # 以公尺為單位的距離矩陣
-    time_matrix: list[list[int]]        # 以分鐘為單位的時間矩陣
+    # 接受 list[list[int]] 或 int32-le-base64 區塊（見 vrp.models.matrix），一律解碼成 int32 ndarray
+    # 省略（None）時由 solver 依 lat/lng 與 matrix_model 估算，呼叫端只需傳 O(N) 的資料
+    distance_matrix: Matrix | None = None   # 以公尺為單位的距離矩陣
+    time_matrix: Matrix | None = None       # 以分鐘為單位的時間矩陣
+    matrix_model: MatrixModel = MatrixModel()
 
     time_limit_seconds: int = 30
 
+    # 排程：只影響 local_dev / 自架部署的 worker 行程池（見 vrp.workers.scheduler）
+    account_id: int | None = None   # 同一帳號的 job 與其他帳號公平分配 worker
+    priority: Literal["interactive", "batch"] | None = None
+    # None = 依 地點數 × time_limit_seconds 自動判斷；interactive 排在所有 batch 前面
+
     @field_validator("locations")
     @classmethod
     def check_locations(cls, v):
@@ -47,11 +66,3 @@ class VRPRequest(BaseModel):
         if len(v) < 1:
             raise ValueError("至少需要 1 輛車")
         return v
-
-    @field_validator("distance_matrix", "time_matrix")
-    @classmethod
-    def check_matrix(cls, v, info):
-        for row in v:
-            if len(row) != len(v):
-                raise ValueError("矩陣必須是 N x N 的正方形")
-        return v
@@ -1,4 +1,8 @@
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
+
+from vrp.models.matrix import Matrix
 from vrp.models.schema import Location, Vehicle, VRPRequest
+from vrp.store.matrix_store import MATRIX_ID_PATTERN
 
 
 class LocationV2(Location):
@@ -21,6 +25,177 @@ class VehicleV2(Vehicle):
     # set  = CumulVar(End(v)).SetMax(value)
 
 
+class Arc(BaseModel):
+    from_id: int    # Location.id
+    to_id: int      # Location.id
+    distance: int   # 公尺
+    time: int       # 分鐘
+
+
+class InitialRoute(BaseModel):
+    vehicle_id: int             # Vehicle.id
+    location_ids: list[int]     # 依拜訪順序的 Location.id，不含 depot
+
+
 class VRPRequestV2(VRPRequest):
     locations: list[LocationV2]
     vehicles: list[VehicleV2]
+
+    arcs: list[Arc] | None = None
+    # None = 使用 distance_matrix / time_matrix（或由 lat/lng 估算整張矩陣）
+    # set  = 只提供已知的 arc；其餘格子依 matrix_model 由 lat/lng 估算
+    #        必須與 distance_matrix / time_matrix 擇一
+
+    matrix_id: str | None = Field(None, pattern=MATRIX_ID_PATTERN)
+    # None = 矩陣隨 request 傳入
+    # set  = 引用先前上傳（POST /vrp/v2/matrices 或前次 solve 回傳）的矩陣，
+    #        locations 的 id 順序必須與上傳時相同
+
+    initial_routes: list[InitialRoute] | None = None
+    # None = 從 first_solution_strategy 建立初始解
+    # set  = 以前次結果的路線作為搜尋起點；未知/已移除的 vehicle 或 location id 直接略過，
+    #        未涵蓋的必訪地點（例如新增的訂單）以 LOCAL_CHEAPEST_INSERTION 插入既有路線
+
+    portfolio_size: int = Field(1, ge=1, le=16)
+    # 1   = 單一搜尋（PATH_CHEAPEST_ARC + GUIDED_LOCAL_SEARCH）
+    # > 1 = 在同一個 container 內以多個行程平行跑不同設定，回傳最佳解
+
+    cluster_size: int | None = Field(None, ge=20)
+    # None = 整個問題建成單一 RoutingModel
+    # set  = 客戶數超過此值時，依地理位置與時間窗分群、各群平行求解，再合併做全域改善
+
+    progress_webhook_url: str | None = None
+    # None = 只在搜尋結束時送 webhook_url
+    # set  = 搜尋中每找到更好的解，就把目前路線（status = "running"）POST 到這裡，
+    #        最多每 progress_interval_seconds 一次；最終結果仍送 webhook_url
+
+    progress_interval_seconds: float = Field(1.0, ge=0.1)
+
+    auto_configure: bool = False
+    # False = 使用 time_limit_seconds 與預設搜尋設定（PATH_CHEAPEST_ARC + GUIDED_LOCAL_SEARCH）
+    # True  = 依地點數、車輛數、時間窗寬度、容量比例、可選地點比例查校準表，
+    #         決定 time limit、初始解策略、metaheuristic 與 LNS；time_limit_seconds 為上限，
+    #         查表結果只會縮短不會延長
+
+    early_stop: bool = True
+    # True  = 目標值停滯（見 plateau_*）時提前結束，不必跑滿 time_limit_seconds
+    # False = 一律跑滿 time_limit_seconds
+
+    plateau_seconds: float | None = Field(None, gt=0)
+    # None = 依規模自動決定：每個地點 0.05 秒，介於 1 秒與 time_limit_seconds 的 1/3 之間
+    # set  = 目標值這麼多秒沒有明顯改善（見 plateau_min_improvement）就提前結束
+    #        GUIDED_LOCAL_SEARCH 常停滯數秒後才再突破，設太短會犧牲解的品質
+
+    plateau_solutions: int | None = Field(None, ge=1)
+    # None = 不依解的個數判斷
+    # set  = 連續這麼多個解沒有明顯改善就提前結束（與 plateau_seconds 任一達成即結束）
+
+    plateau_min_improvement: float = Field(0.001, ge=0, lt=1)
+    # 相對於上次改善時目標值的下降比例，至少這麼多才算改善（預設 0.1%）
+
+    break_symmetry: bool = False
+    # False = 同規格車輛可任意選用
+    # True  = 同規格（容量、固定成本、工時上限、可服務地點皆相同）的車輛依 index 順序啟用；
+    #         初始解改用 SAVINGS，PATH_CHEAPEST_ARC 在此限制下大型實例常找不到初始解
+
+    forbid_estimated_beyond_m: int | None = None
+    # None = 估算出來的 arc 一律可走
+    # set  = 估算距離超過此值且不在 arcs 內的 arc 直接禁止（depot 進出除外）
+
+    tighten_time_windows: bool = True
+    # True  = 建模前依 depot 營業時間與前後地點收緊每個地點的時間窗
+    #         （depot 未填 time_window_end 時收車不設限，以最晚的時間窗為準）；
+    #         必訪地點趕不上 → 直接回 422，可選地點趕不上 → 列為未服務
+    # False = 直接使用原始時間窗
+
+    prune_arcs: bool = True
+    # True  = 建模前剪掉不可能滿足硬性時間窗的 arc（不影響最佳解）
+    # False = 每一對地點都保留為候選 arc
+
+    prune_neighbors: int | None = Field(None, ge=5)
+    # None = 不依距離剪枝
+    # set  = 另外只保留其中一端在另一端前 k 近鄰內的 arc（depot 進出除外）；大型實例收斂較快，
+    #        但 k 太小會剪掉最佳解，甚至使初始解找不到（1000 站約需 k >= 80）
+
+    @model_validator(mode="after")
+    def check_matrix_id(self):
+        if self.matrix_id is None:
+            return self
+        if self.distance_matrix is not None or self.time_matrix is not None or self.arcs is not None:
+            raise ValueError("matrix_id 不可與 distance_matrix / time_matrix / arcs 同時提供")
+        return self
+
+    @model_validator(mode="after")
+    def check_arcs(self):
+        if self.arcs is None:
+            return self
+        if self.distance_matrix is not None or self.time_matrix is not None:
+            raise ValueError("arcs 不可與 distance_matrix / time_matrix 同時提供")
+        known_ids = {loc.id for loc in self.locations}
+        for arc in self.arcs:
+            if arc.from_id not in known_ids or arc.to_id not in known_ids:
+                raise ValueError(f"arc ({arc.from_id}, {arc.to_id}) 參照了不存在的 location id")
+        return self
+
+
+class VRPBatchRequest(BaseModel):
+    batch_id: int
+    items: list[VRPRequestV2] = Field(min_length=1, max_length=500)
+
+    webhook_url: str | None = None
+    # None = 每個 item 各自送到自己的 webhook_url（payload 與 /vrp/v2/solve 相同）
+    # set  = 全部完成後只送一個彙整 payload 到此 url：{batch_id, status, items: [各 item 的 payload]}，
+    #        此時忽略各 item 的 webhook_url
+
+    @field_validator("items")
+    @classmethod
+    def check_compute_ids(cls, v):
+        seen = set()
+        for item in v:
+            if item.compute_id in seen:
+                raise ValueError(f"compute_id {item.compute_id} 重複")
+            seen.add(item.compute_id)
+        return v
+
+
+class MatrixUpload(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    location_ids: list[int]     # 矩陣列/欄對應的 Location.id 順序
+    distance_matrix: Matrix
+    time_matrix: Matrix
+
+
+class AddedLocation(LocationV2):
+    # 與其他地點（以 Location.id 為 key）之間的已知距離/時間；缺漏的由 base.matrix_model 估算
+    distance_to: dict[int, int] = {}    # 本地點 → 其他地點（公尺）
+    distance_from: dict[int, int] = {}  # 其他地點 → 本地點（公尺）
+    time_to: dict[int, int] = {}        # 本地點 → 其他地點（分鐘）
+    time_from: dict[int, int] = {}      # 其他地點 → 本地點（分鐘）
+
+
+class ReoptimizeRequest(BaseModel):
+    base: VRPRequestV2                  # 前次求解的 request（可用 matrix_id 引用矩陣）
+    previous_routes: list[InitialRoute] # 前次結果的路線
+
+    added_locations: list[AddedLocation] = []
+    removed_location_ids: list[int] = []
+    added_vehicles: list[VehicleV2] = []
+    removed_vehicle_ids: list[int] = []
+
+    time_limit_ms: int = Field(500, ge=50, le=30_000)
+    # 插入後 local search 的時間上限；小幅異動通常在此之前就收斂
+
+    @model_validator(mode="after")
+    def check_delta(self):
+        if self.base.arcs is not None:
+            raise ValueError("reoptimize 的 base 不支援 arcs，請改用完整矩陣或 matrix_id")
+        depot_id = self.base.locations[self.base.depot_index].id
+        if depot_id in self.removed_location_ids:
+            raise ValueError("不可移除 depot")
+        existing_ids = {loc.id for loc in self.base.locations}
+        for loc in self.added_locations:
+            if loc.id in existing_ids:
+                raise ValueError(f"新增地點 id {loc.id} 已存在")
+            existing_ids.add(loc.id)
+        return self
@@ -0,0 +1,3 @@
+from vrp.preprocess.compile import compile_problem
+
+__all__ = ["compile_problem"]
@@ -0,0 +1,213 @@
+import numpy as np
+
+from vrp.models.problem import UNSET, Problem
+from vrp.models.schema import VRPRequest
+from vrp.preprocess.geo import estimate_distance_matrix, estimate_time_matrix
+from vrp.preprocess.matrix import build_transit_time_matrix
+from vrp.preprocess.pruning import prune_arcs
+from vrp.preprocess.sparse import apply_arcs
+from vrp.preprocess.windows import tighten_time_windows
+from vrp.timing import PhaseTimer
+
+
+def _frozen(values, dtype) -> np.ndarray:
+    arr = np.asarray(values, dtype=dtype)
+    arr.setflags(write=False)
+    return arr
+
+
+def _optional(values, field: str) -> np.ndarray:
+    for v in values:
+        if v is not None and v < 0:
+            raise ValueError(f"{field} 必須 >= 0")
+    return _frozen([UNSET if v is None else v for v in values], np.int64)
+
+
+def resolve_matrices(data: VRPRequest) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Return (distance, time) as int32 arrays, estimating whichever the
+    request omitted from lat/lng via data.matrix_model. An omitted time
+    matrix is derived from the distance matrix actually used.
+    """
+    distance = data.distance_matrix
+    if distance is None:
+        distance = estimate_distance_matrix(
+            [loc.lat for loc in data.locations],
+            [loc.lng for loc in data.locations],
+            data.matrix_model.metric,
+            data.matrix_model.detour_factor,
+        )
+    travel_time = data.time_matrix
+    if travel_time is None:
+        travel_time = estimate_time_matrix(distance, data.matrix_model.speed_kmh)
+    return np.asarray(distance, dtype=np.int32), np.asarray(travel_time, dtype=np.int32)
+
+
+def compile_initial_routes(data, id_to_idx: dict[int, int]) -> tuple[tuple[int, ...], ...] | None:
+    """
+    Map InitialRoute ids to node indices per vehicle index.
+
+    Unknown vehicle / location ids, the depot and repeated locations are
+    dropped so a plan from before an order edit can still seed the search.
+    """
+    initial_routes = getattr(data, "initial_routes", None)
+    if not initial_routes:
+        return None
+
+    node_of = {loc.id: idx for idx, loc in enumerate(data.locations)}
+    routes = [[] for _ in data.vehicles]
+    seen = {data.depot_index}
+    for route in initial_routes:
+        v_idx = id_to_idx.get(route.vehicle_id)
+        if v_idx is None:
+            continue
+        for loc_id in route.location_ids:
+            node = node_of.get(loc_id)
+            if node is None or node in seen:
+                continue
+            seen.add(node)
+            routes[v_idx].append(node)
+    if not any(routes):
+        return None
+    return tuple(tuple(route) for route in routes)
+
+
+def compile_problem(data: VRPRequest, timer: PhaseTimer | None = None) -> Problem:
+    """
+    Build the immutable Problem from a v1 or v2 request.
+
+    v1 requests have no v2 fields; getattr falls back to None so they compile
+    to "all required, hard windows, any vehicle, unlimited duration".
+
+    timer, if given, records the "matrix", "tighten_time_windows",
+    "prune_arcs" and remaining "compile" phases.
+    """
+    timer = timer if timer is not None else PhaseTimer()
+    with timer.phase("compile"):
+        locations = data.locations
+        vehicles = data.vehicles
+        id_to_idx = {v.id: idx for idx, v in enumerate(vehicles)}
+
+        allowed_vehicles = []
+        for loc in locations:
+            allowed_ids = getattr(loc, "allowed_vehicle_ids", None)
+            if allowed_ids is None:
+                allowed_vehicles.append(None)
+            else:
+                allowed_vehicles.append(
+                    tuple(sorted({id_to_idx[vid] for vid in allowed_ids if vid in id_to_idx}))
+                )
+
+        service_time = _frozen([loc.service_time for loc in locations], np.int32)
+        time_window_start = _frozen([loc.time_window_start for loc in locations], np.int32)
+        window_ends = [loc.time_window_end for loc in locations]
+        if "time_window_end" not in locations[data.depot_index].model_fields_set:
+            # 沒設定 depot 營業時間：收車不設限（到最晚的時間窗），隔日的地點才排得進去
+            window_ends[data.depot_index] = max(window_ends)
+        time_window_end = _frozen(window_ends, np.int32)
+        late_penalty = _optional(
+            [getattr(loc, "late_penalty", None) for loc in locations], "late_penalty"
+        )
+        unserved_penalty = _optional(
+            [getattr(loc, "unserved_penalty", None) for loc in locations], "unserved_penalty"
+        )
+    with timer.phase("matrix"):
+        distance, travel_time = resolve_matrices(data)
+        forbidden_arcs = None
+        arcs = getattr(data, "arcs", None)
+        if arcs:
+            forbidden_arcs = apply_arcs(
+                distance,
+                travel_time,
+                [loc.id for loc in locations],
+                arcs,
+                data.depot_index,
+                data.forbid_estimated_beyond_m,
+            )
+        transit_time = build_transit_time_matrix(travel_time, service_time)
+        transit_time.setflags(write=False)
+
+    unreachable = frozenset()
+    if getattr(data, "tighten_time_windows", False):
+        with timer.phase("tighten_time_windows"):
+            earliest, latest, unreachable_mask = tighten_time_windows(
+                transit_time,
+                time_window_start,
+                time_window_end,
+                late_penalty,
+                data.depot_index,
+                forbidden_arcs,
+            )
+        required = unreachable_mask & (unserved_penalty == UNSET)
+        if required.any():
+            ids = [locations[i].id for i in np.flatnonzero(required)]
+            raise ValueError(f"必訪地點 {ids} 無法在時間窗內抵達（已考慮 depot 營業時間與行駛、服務時間）")
+        unreachable = frozenset(np.flatnonzero(unreachable_mask).tolist())
+        time_window_start = _frozen(earliest, np.int32)
+        time_window_end = _frozen(np.where(late_penalty == UNSET, latest, time_window_end), np.int32)
+
+    # v1 沒有 prune_arcs，getattr 預設 False
+    pruned_arcs = 0
+    if getattr(data, "prune_arcs", False):
+        with timer.phase("prune_arcs"):
+            pruned = prune_arcs(
+                distance,
+                transit_time,
+                time_window_start,
+                time_window_end,
+                late_penalty,
+                data.depot_index,
+                data.prune_neighbors,
+            )
+        if forbidden_arcs is not None:
+            pruned &= ~forbidden_arcs
+        pruned_arcs = int(np.count_nonzero(pruned))
+        if pruned_arcs:
+            forbidden_arcs = pruned if forbidden_arcs is None else forbidden_arcs | pruned
+    if forbidden_arcs is not None:
+        forbidden_arcs.setflags(write=False)
+    distance.setflags(write=False)
+
+    with timer.phase("compile"):
+        return Problem(
+            compute_id=data.compute_id,
+            webhook_url=data.webhook_url,
+            depot_index=data.depot_index,
+            time_limit_seconds=data.time_limit_seconds,
+            location_ids=_frozen([loc.id for loc in locations], np.int64),
+            location_names=tuple(loc.name for loc in locations),
+            lat=_frozen([loc.lat for loc in locations], np.float64),
+            lng=_frozen([loc.lng for loc in locations], np.float64),
+            pickup=_frozen([loc.pickup for loc in locations], np.int32),
+            delivery=_frozen([loc.delivery for loc in locations], np.int32),
+            service_time=service_time,
+            time_window_start=time_window_start,
+            time_window_end=time_window_end,
+            unserved_penalty=unserved_penalty,
+            late_penalty=late_penalty,
+            allowed_vehicles=tuple(allowed_vehicles),
+            vehicle_ids=_frozen([v.id for v in vehicles], np.int64),
+            capacity=_frozen([v.capacity for v in vehicles], np.int64),
+            fixed_cost=_frozen([v.fixed_cost for v in vehicles], np.int64),
+            max_duration=_optional(
+                [getattr(v, "max_duration_minutes", None) for v in vehicles], "max_duration_minutes"
+            ),
+            distance=distance,
+            transit_time=transit_time,
+            forbidden_arcs=forbidden_arcs,
+            pruned_arcs=pruned_arcs,
+            unreachable=unreachable,
+            portfolio_size=getattr(data, "portfolio_size", 1),
+            initial_routes=compile_initial_routes(data, id_to_idx),
+            cluster_size=getattr(data, "cluster_size", None),
+            break_symmetry=getattr(data, "break_symmetry", False),
+            auto_configure=getattr(data, "auto_configure", False),
+            early_stop=getattr(data, "early_stop", False),
+            plateau_seconds=getattr(data, "plateau_seconds", None),
+            plateau_solutions=getattr(data, "plateau_solutions", None),
+            plateau_min_improvement=getattr(data, "plateau_min_improvement", 0.001),
+            progress_webhook_url=getattr(data, "progress_webhook_url", None),
+            progress_interval_seconds=getattr(data, "progress_interval_seconds", 1.0),
+            account_id=data.account_id,
+            priority=data.priority,
+        )
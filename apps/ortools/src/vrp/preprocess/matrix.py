@@ -0,0 +1,13 @@
+import numpy as np
+
+
+def build_transit_time_matrix(time_matrix, service_times) -> np.ndarray:
+    """
+    transit_time[i][j] = time_matrix[i][j] + service_time[i]
+
+    The time dimension only ever needs this sum, so it is built once per
+    request instead of being recomputed on every arc evaluation.
+    """
+    travel = np.asarray(time_matrix, dtype=np.int32)
+    service = np.asarray(service_times, dtype=np.int32)
+    return travel + service[:, np.newaxis]
@@ -0,0 +1,85 @@
+import numpy as np
+
+from vrp.models.problem import UNSET
+
+
+def time_window_infeasible_arcs(
+    transit_time: np.ndarray,
+    time_window_start: np.ndarray,
+    time_window_end: np.ndarray,
+    late_penalty: np.ndarray,
+) -> np.ndarray:
+    """
+    Bool N x N mask of arcs i -> j that can never meet j's hard window.
+
+    Leaving i no earlier than its window start, arrival at j is at least
+    time_window_start[i] + transit_time[i, j] (transit already includes the
+    service time at i). If that is past a hard time_window_end[j] the arc is
+    unusable in any solution. Soft windows (late_penalty set) are never
+    pruned since lateness is only penalized there.
+    """
+    earliest_arrival = time_window_start[:, None].astype(np.int64) + transit_time
+    infeasible = earliest_arrival > time_window_end[None, :]
+    infeasible[:, late_penalty != UNSET] = False
+    return infeasible
+
+
+def outside_neighbors(
+    distance: np.ndarray,
+    k: int,
+    depot_index: int,
+    excluded: np.ndarray | None = None,
+) -> np.ndarray:
+    """
+    Bool N x N mask of arcs i -> j where neither endpoint is among the other's
+    k nearest stops (by distance, depot excluded from the ranking).
+
+    Arcs already in excluded (e.g. time-window infeasible) are ranked last so
+    the k neighbours are ones a route can actually use. Keeping an arc when
+    either direction is a k-neighbour keeps the allowed graph symmetric
+    enough that stops on the edge of a dense area are still reachable.
+    """
+    n = distance.shape[0]
+    k = min(k, n - 2)
+    if k <= 0:
+        return np.zeros((n, n), dtype=bool)
+
+    ranked = distance.astype(np.int64)
+    big = np.iinfo(np.int64).max
+    if excluded is not None:
+        ranked[excluded] = big
+    np.fill_diagonal(ranked, big)
+    ranked[:, depot_index] = big
+    nearest = np.argpartition(ranked, k - 1, axis=1)[:, :k]
+
+    neighbor = np.zeros((n, n), dtype=bool)
+    neighbor[np.arange(n)[:, None], nearest] = True
+    return ~(neighbor | neighbor.T)
+
+
+def prune_arcs(
+    distance: np.ndarray,
+    transit_time: np.ndarray,
+    time_window_start: np.ndarray,
+    time_window_end: np.ndarray,
+    late_penalty: np.ndarray,
+    depot_index: int,
+    neighbors: int | None,
+) -> np.ndarray:
+    """
+    Combine the time-window and (when neighbors is set) k-nearest-neighbour
+    masks into one forbidden-arc mask.
+
+    Arcs into or out of the depot and the diagonal (NextVar(i) == i marks an
+    unserved optional stop) are never pruned, so every stop can still be
+    served on a route of its own.
+    """
+    forbidden = time_window_infeasible_arcs(
+        transit_time, time_window_start, time_window_end, late_penalty
+    )
+    if neighbors is not None:
+        forbidden |= outside_neighbors(distance, neighbors, depot_index, forbidden)
+    forbidden[depot_index, :] = False
+    forbidden[:, depot_index] = False
+    np.fill_diagonal(forbidden, False)
+    return forbidden
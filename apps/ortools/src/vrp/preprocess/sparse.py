@@ -0,0 +1,33 @@
+import numpy as np
+
+
+def apply_arcs(
+    distance: np.ndarray,
+    travel_time: np.ndarray,
+    location_ids,
+    arcs,
+    depot_index: int,
+    forbid_estimated_beyond_m: int | None,
+) -> np.ndarray | None:
+    """
+    Overwrite the estimated matrices in place with the known arcs.
+
+    Cells not covered by an arc keep their geometric estimate. When
+    forbid_estimated_beyond_m is set, estimated (not known) arcs longer than
+    that are returned as a bool N x N forbidden mask; arcs into or out of
+    the depot are never forbidden so every stop stays reachable.
+    """
+    id_to_idx = {loc_id: idx for idx, loc_id in enumerate(location_ids)}
+    rows = np.fromiter((id_to_idx[a.from_id] for a in arcs), dtype=np.intp, count=len(arcs))
+    cols = np.fromiter((id_to_idx[a.to_id] for a in arcs), dtype=np.intp, count=len(arcs))
+    distance[rows, cols] = np.fromiter((a.distance for a in arcs), dtype=np.int32, count=len(arcs))
+    travel_time[rows, cols] = np.fromiter((a.time for a in arcs), dtype=np.int32, count=len(arcs))
+
+    if forbid_estimated_beyond_m is None:
+        return None
+
+    forbidden = distance > forbid_estimated_beyond_m
+    forbidden[rows, cols] = False
+    forbidden[depot_index, :] = False
+    forbidden[:, depot_index] = False
+    return forbidden if forbidden.any() else None
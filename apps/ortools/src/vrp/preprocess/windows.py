@@ -0,0 +1,77 @@
+import numpy as np
+
+from vrp.models.problem import UNSET
+
+# 每一輪約 2 次 N x N 運算；邊界會沿著路線一步步收斂，之後幾輪改善很小
+MAX_TIGHTENING_ROUNDS = 8
+
+# int32 運算；加上行駛時間或相減都不會溢位
+_INF = 1 << 29
+
+
+def tighten_time_windows(
+    transit_time: np.ndarray,
+    time_window_start: np.ndarray,
+    time_window_end: np.ndarray,
+    late_penalty: np.ndarray,
+    depot_index: int,
+    forbidden_arcs: np.ndarray | None = None,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Return (earliest, latest, unreachable) service-start bounds per node.
+
+    earliest[i] is raised to the earliest arrival over every allowed
+    predecessor (the depot at its opening time, or another stop at its own
+    earliest time) plus transit (travel + service at the predecessor).
+    latest[i] is lowered to the latest time from which some allowed
+    successor (another stop by its latest time, or the depot by closing)
+    can still be reached. Both are repeated until nothing changes or
+    MAX_TIGHTENING_ROUNDS is hit; each round only uses bounds that hold in
+    every feasible plan, so no solution is cut off.
+
+    Soft windows (late_penalty set) only bound by the depot close, not by
+    their own end. unreachable marks stops with earliest > latest: no route
+    can serve them. Their bounds are left as given so the model stays valid.
+    """
+    n = len(time_window_start)
+    travel = transit_time.astype(np.int32)
+    hard = late_penalty == UNSET
+    horizon = int(time_window_end.max())
+
+    lower = time_window_start.astype(np.int32)
+    upper = np.where(hard, time_window_end, horizon).astype(np.int32)
+    depot_open = int(lower[depot_index])
+    depot_close = int(upper[depot_index])
+
+    # 不可走的 arc 行駛時間視為無限大；depot 當前驅只代表出發、當後繼只代表收車，另外處理
+    travel_allowed = travel.copy()
+    if forbidden_arcs is not None:
+        travel_allowed[forbidden_arcs] = _INF
+    np.fill_diagonal(travel_allowed, _INF)
+    travel_allowed[depot_index, :] = _INF
+    travel_allowed[:, depot_index] = _INF
+    from_depot = depot_open + travel[depot_index, :]
+    to_depot = depot_close - travel[:, depot_index]
+
+    earliest = lower.copy()
+    latest = upper.copy()
+    for _ in range(MAX_TIGHTENING_ROUNDS):
+        dead = earliest > latest
+        dead[depot_index] = True
+
+        # 已證明無法服務的地點不能當中繼站
+        arrive = np.where(dead, _INF, earliest)[:, None] + travel_allowed
+        new_earliest = np.maximum(lower, np.minimum(from_depot, arrive.min(axis=0)))
+        leave = np.where(dead, -_INF, latest)[None, :] - travel_allowed
+        new_latest = np.minimum(upper, np.maximum(to_depot, leave.max(axis=1)))
+
+        if np.array_equal(new_earliest, earliest) and np.array_equal(new_latest, latest):
+            break
+        earliest, latest = new_earliest, new_latest
+
+    earliest[depot_index] = depot_open
+    latest[depot_index] = depot_close
+    unreachable = earliest > latest
+    earliest[unreachable] = lower[unreachable]
+    latest[unreachable] = upper[unreachable]
+    return earliest, latest, unreachable
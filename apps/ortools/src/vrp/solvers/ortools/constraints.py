@@ -1,51 +1,35 @@
-from vrp.models.schema import VRPRequest
+from vrp.models.problem import Problem
 
 
-def add_distance_cost(routing, manager, data: VRPRequest) -> int:
-    def distance_callback(from_index, to_index):
-        from_node = manager.IndexToNode(from_index)
-        to_node = manager.IndexToNode(to_index)
-        return data.distance_matrix[from_node][to_node]
-
-    transit_callback_index = routing.RegisterTransitCallback(distance_callback)
+def add_distance_cost(routing, manager, problem: Problem) -> int:
+    # RegisterTransitMatrix 讓 C++ 端直接查表，搜尋時不再回呼 Python
+    transit_callback_index = routing.RegisterTransitMatrix(problem.distance.tolist())
     routing.SetArcCostEvaluatorOfAllVehicles(transit_callback_index)
     return transit_callback_index
 
 
-def add_fixed_costs(routing, data: VRPRequest):
-    for i, vehicle in enumerate(data.vehicles):
-        if vehicle.fixed_cost > 0:
-            routing.SetFixedCostOfVehicle(vehicle.fixed_cost, i)
-
+def add_fixed_costs(routing, problem: Problem):
+    for i, fixed_cost in enumerate(problem.fixed_cost.tolist()):
+        if fixed_cost > 0:
+            routing.SetFixedCostOfVehicle(fixed_cost, i)
 
-def add_capacity_dimension(routing, manager, data: VRPRequest):
-    def demand_callback(from_index):
-        from_node = manager.IndexToNode(from_index)
-        loc = data.locations[from_node]
-        return loc.pickup - loc.delivery
 
-    demand_callback_index = routing.RegisterUnaryTransitCallback(demand_callback)
-    vehicle_capacities = [v.capacity for v in data.vehicles]
+def add_capacity_dimension(routing, manager, problem: Problem):
+    demand_callback_index = routing.RegisterUnaryTransitVector(problem.demand.tolist())
 
     routing.AddDimensionWithVehicleCapacity(
         demand_callback_index,
         0,
-        vehicle_capacities,
+        problem.capacity.tolist(),
         False,
         "Capacity",
     )
 
 
-def add_time_dimension(routing, manager, data: VRPRequest):
-    def time_callback(from_index, to_index):
-        from_node = manager.IndexToNode(from_index)
-        to_node = manager.IndexToNode(to_index)
-        travel = data.time_matrix[from_node][to_node]
-        service = data.locations[from_node].service_time
-        return travel + service
-
-    time_callback_index = routing.RegisterTransitCallback(time_callback)
-    max_time = max(loc.time_window_end for loc in data.locations)
+def add_time_dimension(routing, manager, problem: Problem):
+    # transit_time 已含出發點服務時間（見 vrp.preprocess.matrix），C++ 端直接查表
+    time_callback_index = routing.RegisterTransitMatrix(problem.transit_time.tolist())
+    max_time = problem.horizon
 
     routing.AddDimension(
         time_callback_index,
@@ -57,14 +41,12 @@ def add_time_dimension(routing, manager, data: VRPRequest):
 
     time_dimension = routing.GetDimensionOrDie("Time")
 
-    for location_idx, loc in enumerate(data.locations):
+    windows = zip(problem.time_window_start.tolist(), problem.time_window_end.tolist())
+    for location_idx, (start, end) in enumerate(windows):
         index = manager.NodeToIndex(location_idx)
-        time_dimension.CumulVar(index).SetRange(
-            loc.time_window_start,
-            loc.time_window_end,
-        )
+        time_dimension.CumulVar(index).SetRange(start, end)
 
-    for vehicle_id in range(len(data.vehicles)):
+    for vehicle_id in range(problem.num_vehicles):
         routing.AddVariableMinimizedByFinalizer(
             time_dimension.CumulVar(routing.Start(vehicle_id))
         )
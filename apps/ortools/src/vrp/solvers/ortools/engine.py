@@ -1,9 +1,10 @@
 import time
-import httpx
 from ortools.constraint_solver import routing_enums_pb2
 from ortools.constraint_solver import pywrapcp
 
+from vrp.models.problem import Problem
 from vrp.models.schema import VRPRequest
+from vrp.preprocess import compile_problem
 from vrp.solvers.ortools.constraints import (
     add_distance_cost,
     add_fixed_costs,
@@ -11,20 +12,40 @@ from vrp.solvers.ortools.constraints import (
     add_time_dimension,
 )
 from vrp.solvers.ortools.result import parse_solution
+from vrp.solvers.tracking import CancelWatcher, JobTracker
+from vrp.timing import PhaseTimer
+from vrp.webhook import deliver_webhook
 
 
-def solve_vrp_logic(compute_id: int, data: VRPRequest):
+def solve_vrp_logic(compute_id: int, data: VRPRequest | Problem, timings: dict | None = None):
+    """timings: phases already spent before the worker (see PhaseTimer)."""
     start_time = time.perf_counter()
+    timer = PhaseTimer(timings)
+    tracker = JobTracker.start(compute_id)
+    webhook_url = data.webhook_url
+    preprocess_seconds = None
     try:
-        manager = pywrapcp.RoutingIndexManager(
-            len(data.locations), len(data.vehicles), data.depot_index
-        )
-        routing = pywrapcp.RoutingModel(manager)
+        if tracker.cancel_requested():
+            # 排隊中就被取消，不必編譯與搜尋
+            raise ValueError("已取消")
+        if isinstance(data, Problem):
+            problem = data
+        else:
+            problem = compile_problem(data, timer)
+        # 之後只使用 problem；放掉本 frame 對 pydantic request 的參照
+        data = None
+        preprocess_seconds = round(time.perf_counter() - start_time, 4)
+
+        with timer.phase("build"):
+            manager = pywrapcp.RoutingIndexManager(
+                problem.num_locations, problem.num_vehicles, problem.depot_index
+            )
+            routing = timer.run(pywrapcp.RoutingModel, manager)
 
-        add_distance_cost(routing, manager, data)
-        add_fixed_costs(routing, data)
-        add_capacity_dimension(routing, manager, data)
-        time_dimension = add_time_dimension(routing, manager, data)
+            timer.run(add_distance_cost, routing, manager, problem)
+            timer.run(add_fixed_costs, routing, problem)
+            timer.run(add_capacity_dimension, routing, manager, problem)
+            time_dimension = timer.run(add_time_dimension, routing, manager, problem)
 
         search_params = pywrapcp.DefaultRoutingSearchParameters()
         search_params.first_solution_strategy = (
@@ -33,31 +54,46 @@ def solve_vrp_logic(compute_id: int, data: VRPRequest):
         search_params.local_search_metaheuristic = (
             routing_enums_pb2.LocalSearchMetaheuristic.GUIDED_LOCAL_SEARCH
         )
-        search_params.time_limit.seconds = data.time_limit_seconds
+        search_params.time_limit.seconds = problem.time_limit_seconds
 
-        solution = routing.SolveWithParameters(search_params)
+        tracker.watch(routing)
+        cancel = CancelWatcher.watch(routing, compute_id)
+        try:
+            with timer.watch_search(routing).solving():
+                solution = routing.SolveWithParameters(search_params)
+        finally:
+            cancel.stop()
 
         if solution is None:
             raise ValueError("找不到可行解，請確認時間窗與容量限制是否過於嚴苛")
 
-        result = parse_solution(routing, manager, solution, time_dimension, data)
+        with timer.phase("parse"):
+            result = parse_solution(routing, manager, solution, time_dimension, problem)
         elapsed = round(time.perf_counter() - start_time, 3)
-        payload = {"compute_id": compute_id, "elapsed_seconds": elapsed, **result}
+        payload = {
+            "compute_id": compute_id,
+            "elapsed_seconds": elapsed,
+            "preprocess_seconds": preprocess_seconds,
+            **result,
+            "timings": timer.as_dict(),
+        }
 
     except Exception as e:
         elapsed = round(time.perf_counter() - start_time, 3)
         payload = {
             "compute_id": compute_id,
             "elapsed_seconds": elapsed,
+            "preprocess_seconds": preprocess_seconds,
             "status": "error",
             "message": str(e),
+            "timings": timer.as_dict(),
         }
 
-    if data.webhook_url:
-        try:
-            with httpx.Client() as client:
-                client.post(data.webhook_url, json=payload, timeout=10)
-        except Exception as webhook_err:
-            print(f"[compute_id={compute_id}] Webhook 發送失敗: {webhook_err}")
+    tracker.finish(payload)
+    if webhook_url:
+        # 送出的 payload 不可能含自己的發送時間；webhook 只記在回傳值
+        with timer.phase("webhook"):
+            deliver_webhook(webhook_url, payload)
+        payload["timings"] = timer.as_dict()
 
     return payload
@@ -1,11 +1,14 @@
-from vrp.models.schema import VRPRequest
+from vrp.models.problem import Problem
 
 
-def parse_solution(routing, manager, solution, time_dimension, data: VRPRequest) -> dict:
+def parse_solution(routing, manager, solution, time_dimension, problem: Problem) -> dict:
     routes = []
     total_distance = 0
+    location_ids = problem.location_ids.tolist()
+    pickup = problem.pickup.tolist()
+    delivery = problem.delivery.tolist()
 
-    for vehicle_id in range(len(data.vehicles)):
+    for vehicle_id in range(problem.num_vehicles):
         index = routing.Start(vehicle_id)
 
         if routing.IsEnd(solution.Value(routing.NextVar(index))):
@@ -18,30 +21,29 @@ def parse_solution(routing, manager, solution, time_dimension, data: VRPRequest)
 
         while not routing.IsEnd(index):
             node = manager.IndexToNode(index)
-            loc = data.locations[node]
             time_var = time_dimension.CumulVar(index)
 
             stops.append({
-                "location_id": loc.id,
-                "name": loc.name,
+                "location_id": location_ids[node],
+                "name": problem.location_names[node],
                 "arrival_time": solution.Min(time_var),
-                "pickup": loc.pickup,
-                "delivery": loc.delivery,
+                "pickup": pickup[node],
+                "delivery": delivery[node],
             })
 
-            route_pickup += loc.pickup
-            route_delivery += loc.delivery
+            route_pickup += pickup[node]
+            route_delivery += delivery[node]
             next_index = solution.Value(routing.NextVar(index))
             from_node = manager.IndexToNode(index)
             to_node = manager.IndexToNode(next_index)
-            route_distance += data.distance_matrix[from_node][to_node]
+            route_distance += int(problem.distance[from_node, to_node])
             index = next_index
 
         node = manager.IndexToNode(index)
         time_var = time_dimension.CumulVar(index)
         stops.append({
-            "location_id": data.locations[node].id,
-            "name": data.locations[node].name,
+            "location_id": location_ids[node],
+            "name": problem.location_names[node],
             "arrival_time": solution.Min(time_var),
             "pickup": 0,
             "delivery": 0,
@@ -49,7 +51,7 @@ def parse_solution(routing, manager, solution, time_dimension, data: VRPRequest)
 
         total_distance += route_distance
         routes.append({
-            "vehicle_id": data.vehicles[vehicle_id].id,
+            "vehicle_id": int(problem.vehicle_ids[vehicle_id]),
             "stops": stops,
             "total_distance": route_distance,
             "total_pickup": route_pickup,
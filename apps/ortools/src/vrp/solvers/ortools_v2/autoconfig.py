@@ -0,0 +1,91 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from vrp.models.problem import UNSET, Problem
+from vrp.solvers.ortools_v2.autoconfig_table import SIZE_BANDS, TABLE
+
+# 時間窗平均寬度 / horizon 低於此值視為緊
+TIGHT_WINDOW_RATIO = 0.35
+# 總需求 / 總容量 高於此值視為緊
+TIGHT_CAPACITY_RATIO = 0.8
+# 超過最大規模區間時，time limit 依 N 等比放大，但不超過此上限
+MAX_TIME_LIMIT_SECONDS = 300
+# 大型實例另外開啟的 LNS operator
+LARGE_INSTANCE_LOCATIONS = 300
+
+
+@dataclass(frozen=True)
+class ProblemFeatures:
+    customers: int
+    vehicles: int
+    window_ratio: float     # 硬性時間窗平均寬度 / horizon，1.0 = 沒有時間窗限制
+    capacity_ratio: float   # 總需求 / 總容量
+    optional_share: float   # 可選地點比例
+
+
+@dataclass(frozen=True)
+class AutoConfig:
+    time_limit_seconds: float
+    first_solution_strategy: str
+    metaheuristic: str
+    lns_operators: tuple[str, ...]   # search_params.local_search_operators 中要開啟的欄位
+    bucket: tuple[int, bool, bool]   # (規模區間, 時間窗緊, 容量緊)
+    features: ProblemFeatures
+
+
+def problem_features(problem: Problem) -> ProblemFeatures:
+    customers = np.arange(problem.num_locations) != problem.depot_index
+    hard = customers & (problem.late_penalty == UNSET)
+    horizon = max(problem.horizon, 1)
+    widths = (problem.time_window_end - problem.time_window_start)[hard]
+    load = np.maximum(problem.pickup, problem.delivery)[customers].sum()
+    return ProblemFeatures(
+        customers=int(customers.sum()),
+        vehicles=problem.num_vehicles,
+        window_ratio=round(float(widths.mean() / horizon) if widths.size else 1.0, 3),
+        capacity_ratio=round(float(load / max(problem.capacity.sum(), 1)), 3),
+        optional_share=round(float((problem.unserved_penalty[customers] != UNSET).mean()), 3)
+        if customers.any() else 0.0,
+    )
+
+
+def auto_config(problem: Problem) -> AutoConfig:
+    """
+    Pick time limit and search strategy from the calibrated TABLE.
+
+    The bucket is the smallest size band >= the customer count, plus whether
+    windows and capacity are tight. Beyond the largest band the time limit
+    grows with N. problem.time_limit_seconds is a ceiling: the table only
+    ever shortens the caller's limit. LNS operators are rule-based: inactive-node LNS when some
+    stops are optional (so they get re-inserted / dropped as a group), path
+    LNS on large instances.
+    """
+    features = problem_features(problem)
+    band = next((b for b in SIZE_BANDS if features.customers <= b), SIZE_BANDS[-1])
+    bucket = (
+        band,
+        features.window_ratio < TIGHT_WINDOW_RATIO,
+        features.capacity_ratio > TIGHT_CAPACITY_RATIO,
+    )
+    entry = TABLE[bucket]
+
+    time_limit = entry["time_limit_seconds"]
+    if features.customers > band:
+        time_limit = min(time_limit * features.customers / band, MAX_TIME_LIMIT_SECONDS)
+    time_limit = min(time_limit, problem.time_limit_seconds)
+
+    lns_operators = []
+    if features.optional_share > 0:
+        lns_operators.append("use_inactive_lns")
+    if features.customers > LARGE_INSTANCE_LOCATIONS:
+        lns_operators.append("use_path_lns")
+
+    return AutoConfig(
+        time_limit_seconds=round(time_limit, 1),
+        first_solution_strategy=entry["first_solution_strategy"],
+        metaheuristic=entry["metaheuristic"],
+        lns_operators=tuple(lns_operators),
+        bucket=bucket,
+        features=features,
+    )
@@ -0,0 +1,27 @@
+"""
+auto_configure 查表；由 benchmarks/calibrate_autoconfig.py 產生，請勿手動修改。
+
+key = (規模區間上限（客戶數）, 時間窗緊, 容量緊)
+time_to_target_seconds / window_ratio / capacity_ratio 為校準實例的量測值，僅供參考。
+"""
+
+SIZE_BANDS = [25, 100, 300, 1000]
+
+TABLE = {
+    (25, False, False): {'time_limit_seconds': 1, 'first_solution_strategy': 'PARALLEL_CHEAPEST_INSERTION', 'metaheuristic': 'GUIDED_LOCAL_SEARCH', 'time_to_target_seconds': 0.31, 'window_ratio': 0.431, 'capacity_ratio': 0.667},
+    (25, False, True): {'time_limit_seconds': 1, 'first_solution_strategy': 'PARALLEL_CHEAPEST_INSERTION', 'metaheuristic': 'GUIDED_LOCAL_SEARCH', 'time_to_target_seconds': 0.01, 'window_ratio': 0.431, 'capacity_ratio': 0.923},
+    (25, True, False): {'time_limit_seconds': 2, 'first_solution_strategy': 'SAVINGS', 'metaheuristic': 'GUIDED_LOCAL_SEARCH', 'time_to_target_seconds': 0.82, 'window_ratio': 0.06, 'capacity_ratio': 0.661},
+    (25, True, True): {'time_limit_seconds': 4, 'first_solution_strategy': 'PATH_CHEAPEST_ARC', 'metaheuristic': 'GUIDED_LOCAL_SEARCH', 'time_to_target_seconds': 2.07, 'window_ratio': 0.06, 'capacity_ratio': 0.95},
+    (100, False, False): {'time_limit_seconds': 4, 'first_solution_strategy': 'SAVINGS', 'metaheuristic': 'GUIDED_LOCAL_SEARCH', 'time_to_target_seconds': 2.63, 'window_ratio': 0.477, 'capacity_ratio': 0.662},
+    (100, False, True): {'time_limit_seconds': 1, 'first_solution_strategy': 'SAVINGS', 'metaheuristic': 'GUIDED_LOCAL_SEARCH', 'time_to_target_seconds': 0.51, 'window_ratio': 0.477, 'capacity_ratio': 0.94},
+    (100, True, False): {'time_limit_seconds': 1, 'first_solution_strategy': 'SAVINGS', 'metaheuristic': 'GUIDED_LOCAL_SEARCH', 'time_to_target_seconds': 0.52, 'window_ratio': 0.056, 'capacity_ratio': 0.659},
+    (100, True, True): {'time_limit_seconds': 5, 'first_solution_strategy': 'SAVINGS', 'metaheuristic': 'GUIDED_LOCAL_SEARCH', 'time_to_target_seconds': 3.2, 'window_ratio': 0.056, 'capacity_ratio': 0.906},
+    (300, False, False): {'time_limit_seconds': 6, 'first_solution_strategy': 'PATH_CHEAPEST_ARC', 'metaheuristic': 'GUIDED_LOCAL_SEARCH', 'time_to_target_seconds': 3.36, 'window_ratio': 0.47, 'capacity_ratio': 0.66},
+    (300, False, True): {'time_limit_seconds': 17, 'first_solution_strategy': 'PATH_CHEAPEST_ARC', 'metaheuristic': 'GUIDED_LOCAL_SEARCH', 'time_to_target_seconds': 11.26, 'window_ratio': 0.47, 'capacity_ratio': 0.941},
+    (300, True, False): {'time_limit_seconds': 2, 'first_solution_strategy': 'SAVINGS', 'metaheuristic': 'GUIDED_LOCAL_SEARCH', 'time_to_target_seconds': 0.72, 'window_ratio': 0.056, 'capacity_ratio': 0.664},
+    (300, True, True): {'time_limit_seconds': 1, 'first_solution_strategy': 'SAVINGS', 'metaheuristic': 'GUIDED_LOCAL_SEARCH', 'time_to_target_seconds': 0.24, 'window_ratio': 0.056, 'capacity_ratio': 0.899},
+    (1000, False, False): {'time_limit_seconds': 39, 'first_solution_strategy': 'SAVINGS', 'metaheuristic': 'GUIDED_LOCAL_SEARCH', 'time_to_target_seconds': 25.57, 'window_ratio': 0.464, 'capacity_ratio': 0.661},
+    (1000, False, True): {'time_limit_seconds': 42, 'first_solution_strategy': 'SAVINGS', 'metaheuristic': 'GUIDED_LOCAL_SEARCH', 'time_to_target_seconds': 27.45, 'window_ratio': 0.464, 'capacity_ratio': 0.942},
+    (1000, True, False): {'time_limit_seconds': 13, 'first_solution_strategy': 'SAVINGS', 'metaheuristic': 'GUIDED_LOCAL_SEARCH', 'time_to_target_seconds': 8.59, 'window_ratio': 0.056, 'capacity_ratio': 0.643},
+    (1000, True, True): {'time_limit_seconds': 11, 'first_solution_strategy': 'SAVINGS', 'metaheuristic': 'GUIDED_LOCAL_SEARCH', 'time_to_target_seconds': 7.28, 'window_ratio': 0.056, 'capacity_ratio': 0.925},
+}
@@ -0,0 +1,98 @@
+import dataclasses
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable
+
+from vrp.models.problem import Problem
+from vrp.solvers.ortools_v2.engine import solve_vrp_v2_logic
+from vrp.solvers.ortools_v2.portfolio import available_cpus
+from vrp.solvers.tracking import JobTracker
+from vrp.store.job_store import default_job_store
+from vrp.webhook import deliver_webhook
+
+# calls = [(compute_id, problem, timings), ...] → 依序回傳每個 solve_vrp_v2_logic 的 payload 或例外
+MapFn = Callable[[list[tuple]], Iterable]
+
+
+def process_pool_map(calls: list[tuple]) -> list:
+    """Run solve_vrp_v2_logic for each call in at most available_cpus() worker processes."""
+    workers = max(1, min(len(calls), available_cpus()))
+    # spawn：呼叫端（local_dev 的 thread pool）可能是多執行緒行程，fork 不安全
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+        futures = [pool.submit(solve_vrp_v2_logic, *call) for call in calls]
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append(e)
+        return results
+
+
+def solve_batch_logic(
+    batch_id: int,
+    items: list[Problem | dict],
+    webhook_url: str | None = None,
+    timings: dict | None = None,
+    map_fn: MapFn | None = None,
+) -> dict:
+    """
+    Solve a batch of compiled problems through map_fn and report per item.
+
+    items keeps the request order; a dict is an item the API already
+    rejected, {"webhook_url": ..., "payload": error payload}. Without
+    webhook_url each solve sends its own webhook, and rejected items and
+    items whose worker process died get their error payload delivered here;
+    with webhook_url the items' webhooks are suppressed and one aggregated
+    payload is sent once everything has finished.
+    """
+    start_time = time.perf_counter()
+    map_fn = map_fn or process_pool_map
+
+    calls = []
+    for item in items:
+        if isinstance(item, Problem):
+            problem = dataclasses.replace(item, webhook_url="") if webhook_url else item
+            calls.append((item.compute_id, problem, timings))
+        elif not webhook_url and item["webhook_url"]:
+            deliver_webhook(item["webhook_url"], item["payload"])
+
+    solved = iter(map_fn(calls) if calls else [])
+    results = []
+    for item in items:
+        if not isinstance(item, Problem):
+            results.append(item["payload"])
+            continue
+        result = next(solved)
+        if isinstance(result, BaseException):
+            # worker 本身失敗（例如 OOM），solve_vrp_v2_logic 沒機會回報：由這裡寫 job store、送 item 的 webhook
+            result = {
+                "compute_id": item.compute_id,
+                "status": "error",
+                "message": f"worker 行程異常結束: {result}",
+            }
+            JobTracker(item.compute_id, default_job_store()).finish(result)
+            if not webhook_url and item.webhook_url:
+                deliver_webhook(item.webhook_url, result)
+        results.append(result)
+
+    failed = sum(result["status"] == "error" for result in results)
+    if failed == 0:
+        status = "success"
+    elif failed < len(results):
+        status = "partial"
+    else:
+        status = "error"
+    payload = {
+        "batch_id": batch_id,
+        "status": status,
+        "succeeded": len(results) - failed,
+        "failed": failed,
+        "elapsed_seconds": round(time.perf_counter() - start_time, 3),
+        "items": results,
+    }
+    if webhook_url:
+        deliver_webhook(webhook_url, payload)
+    return payload
@@ -1,60 +1,46 @@
-from vrp.models.schema_v2 import VRPRequestV2
+import numpy as np
 
-# Reused from v1 (same logic, typed against VRPRequestV2 which is compatible)
+from vrp.models.problem import UNSET, Problem
 
-def add_distance_cost(routing, manager, data: VRPRequestV2) -> int:
-    def distance_callback(from_index, to_index):
-        from_node = manager.IndexToNode(from_index)
-        to_node = manager.IndexToNode(to_index)
-        return data.distance_matrix[from_node][to_node]
+# Reused from v1 (same logic, both consume the compiled Problem)
 
-    transit_callback_index = routing.RegisterTransitCallback(distance_callback)
+def add_distance_cost(routing, manager, problem: Problem) -> int:
+    # RegisterTransitMatrix 讓 C++ 端直接查表，搜尋時不再回呼 Python
+    transit_callback_index = routing.RegisterTransitMatrix(problem.distance.tolist())
     routing.SetArcCostEvaluatorOfAllVehicles(transit_callback_index)
     return transit_callback_index
 
 
-def add_fixed_costs(routing, data: VRPRequestV2):
-    for i, vehicle in enumerate(data.vehicles):
-        if vehicle.fixed_cost > 0:
-            routing.SetFixedCostOfVehicle(vehicle.fixed_cost, i)
+def add_fixed_costs(routing, problem: Problem):
+    for i, fixed_cost in enumerate(problem.fixed_cost.tolist()):
+        if fixed_cost > 0:
+            routing.SetFixedCostOfVehicle(fixed_cost, i)
 
 
-def add_capacity_dimension(routing, manager, data: VRPRequestV2):
-    def demand_callback(from_index):
-        from_node = manager.IndexToNode(from_index)
-        loc = data.locations[from_node]
-        return loc.pickup - loc.delivery
-
-    demand_callback_index = routing.RegisterUnaryTransitCallback(demand_callback)
-    vehicle_capacities = [v.capacity for v in data.vehicles]
+def add_capacity_dimension(routing, manager, problem: Problem):
+    demand_callback_index = routing.RegisterUnaryTransitVector(problem.demand.tolist())
 
     routing.AddDimensionWithVehicleCapacity(
         demand_callback_index,
         0,
-        vehicle_capacities,
+        problem.capacity.tolist(),
         False,
         "Capacity",
     )
 
 
-def add_time_dimension_v2(routing, manager, data: VRPRequestV2):
+def add_time_dimension_v2(routing, manager, problem: Problem):
     """
     Time dimension with soft time window support.
 
     Per location:
-    - late_penalty is None → hard range [start, end] (v1 behavior)
-    - late_penalty is not None → hard lower bound [start, max_time] +
+    - late_penalty is UNSET → hard range [start, end] (v1 behavior)
+    - late_penalty is set → hard lower bound [start, max_time] +
       SetCumulVarSoftUpperBound(index, end, penalty) for soft upper bound
     """
-    def time_callback(from_index, to_index):
-        from_node = manager.IndexToNode(from_index)
-        to_node = manager.IndexToNode(to_index)
-        travel = data.time_matrix[from_node][to_node]
-        service = data.locations[from_node].service_time
-        return travel + service
-
-    time_callback_index = routing.RegisterTransitCallback(time_callback)
-    max_time = max(loc.time_window_end for loc in data.locations)
+    # transit_time 已含出發點服務時間（見 vrp.preprocess.matrix），C++ 端直接查表
+    time_callback_index = routing.RegisterTransitMatrix(problem.transit_time.tolist())
+    max_time = problem.horizon
 
     routing.AddDimension(
         time_callback_index,
@@ -66,27 +52,28 @@ def add_time_dimension_v2(routing, manager, data: VRPRequestV2):
 
     time_dimension = routing.GetDimensionOrDie("Time")
 
-    for location_idx, loc in enumerate(data.locations):
+    windows = zip(
+        problem.time_window_start.tolist(),
+        problem.time_window_end.tolist(),
+        problem.late_penalty.tolist(),
+    )
+    for location_idx, (start, end, late_penalty) in enumerate(windows):
         index = manager.NodeToIndex(location_idx)
-        if loc.late_penalty is None:
+        if late_penalty == UNSET:
             # Hard time window (v1 behavior)
-            time_dimension.CumulVar(index).SetRange(
-                loc.time_window_start,
-                loc.time_window_end,
-            )
+            time_dimension.CumulVar(index).SetRange(start, end)
         else:
             # Soft upper bound: hard lower, open upper + penalty for lateness
-            time_dimension.CumulVar(index).SetRange(
-                loc.time_window_start,
-                max_time,
-            )
-            time_dimension.SetCumulVarSoftUpperBound(
-                index,
-                loc.time_window_end,
-                loc.late_penalty,
-            )
-
-    for vehicle_id in range(len(data.vehicles)):
+            time_dimension.CumulVar(index).SetRange(start, max_time)
+            time_dimension.SetCumulVarSoftUpperBound(index, end, late_penalty)
+
+    # NodeToIndex(depot) 只是第 0 輛車的起點；depot 營業時間套用到每輛車的出發與收車
+    depot = problem.depot_index
+    depot_start = int(problem.time_window_start[depot])
+    depot_end = int(problem.time_window_end[depot]) if problem.late_penalty[depot] == UNSET else max_time
+    for vehicle_id in range(problem.num_vehicles):
+        time_dimension.CumulVar(routing.Start(vehicle_id)).SetRange(depot_start, depot_end)
+        time_dimension.CumulVar(routing.End(vehicle_id)).SetRange(depot_start, depot_end)
         routing.AddVariableMinimizedByFinalizer(
             time_dimension.CumulVar(routing.Start(vehicle_id))
         )
@@ -97,51 +84,111 @@ def add_time_dimension_v2(routing, manager, data: VRPRequestV2):
     return time_dimension
 
 
-def add_optional_stops(routing, manager, data: VRPRequestV2):
+def add_optional_stops(routing, manager, problem: Problem):
     """
     Mark non-depot locations with unserved_penalty as optional via AddDisjunction.
-    Locations with unserved_penalty = None are required (must visit).
+    Locations with unserved_penalty = UNSET are required (must visit).
+    Optional stops in problem.unreachable are fixed inactive up front.
     """
-    for location_idx, loc in enumerate(data.locations):
-        if location_idx == data.depot_index:
+    for location_idx, penalty in enumerate(problem.unserved_penalty.tolist()):
+        if location_idx == problem.depot_index:
             continue
-        if loc.unserved_penalty is not None:
+        if penalty != UNSET:
             index = manager.NodeToIndex(location_idx)
-            routing.AddDisjunction([index], loc.unserved_penalty)
+            routing.AddDisjunction([index], penalty)
+            if location_idx in problem.unreachable:
+                # 前處理已證明任何路線都趕不上時間窗，直接設為不拜訪
+                routing.ActiveVar(index).SetValue(0)
 
 
-def add_vehicle_constraints(routing, manager, data: VRPRequestV2):
+def add_vehicle_constraints(routing, manager, problem: Problem):
     """
     Restrict which vehicles may visit a location.
 
-    Uses routing.solver().Add(VehicleVar != v_idx) rather than RemoveValue(),
-    because RemoveValue() can be silently bypassed when combined with
-    AddDisjunction / soft time windows / max_duration in the same model.
-    solver().Add() goes through the CP propagation engine and is always enforced.
+    One MemberCt(VehicleVar, allowed + [-1]) per restricted location instead
+    of one VehicleVar != v per forbidden vehicle, so the model grows with N
+    rather than N·V. It still goes through solver().Add() rather than
+    RemoveValue(), because RemoveValue() can be silently bypassed when
+    combined with AddDisjunction / soft time windows / max_duration in the
+    same model. -1 is the VehicleVar of an unperformed optional stop.
     """
-    id_to_idx = {v.id: idx for idx, v in enumerate(data.vehicles)}
-    all_vehicle_indices = set(range(len(data.vehicles)))
     solver = routing.solver()
 
-    for location_idx, loc in enumerate(data.locations):
-        if loc.allowed_vehicle_ids is None:
-            continue
-        allowed_indices = {id_to_idx[vid] for vid in loc.allowed_vehicle_ids if vid in id_to_idx}
-        forbidden_indices = all_vehicle_indices - allowed_indices
-        if not forbidden_indices:
+    for location_idx, allowed_indices in enumerate(problem.allowed_vehicles):
+        if allowed_indices is None or len(allowed_indices) == problem.num_vehicles:
             continue
         node_index = manager.NodeToIndex(location_idx)
-        for v_idx in forbidden_indices:
-            solver.Add(routing.VehicleVar(node_index) != v_idx)
+        solver.Add(solver.MemberCt(routing.VehicleVar(node_index), [-1, *allowed_indices]))
+
+
+def vehicle_classes(problem: Problem) -> list[list[int]]:
+    """
+    Group vehicle indices that are interchangeable: same capacity, fixed
+    cost and max duration, and allowed at exactly the same locations.
+    Groups and the indices inside them are in index order.
+    """
+    allowed_at = [[] for _ in range(problem.num_vehicles)]
+    for location_idx, allowed_indices in enumerate(problem.allowed_vehicles):
+        if allowed_indices is None:
+            continue
+        for v_idx in allowed_indices:
+            allowed_at[v_idx].append(location_idx)
+
+    classes: dict[tuple, list[int]] = {}
+    specs = zip(problem.capacity.tolist(), problem.fixed_cost.tolist(), problem.max_duration.tolist())
+    for v_idx, spec in enumerate(specs):
+        classes.setdefault((*spec, tuple(allowed_at[v_idx])), []).append(v_idx)
+    return list(classes.values())
 
 
-def add_max_duration(routing, data: VRPRequestV2, time_dimension):
+def add_symmetry_breaking(routing, problem: Problem):
+    """
+    Within each vehicle class, vehicle k+1 may only be used if vehicle k is.
+
+    Identical vehicles otherwise give V! equivalent copies of every plan.
+    Only valid when no route is pinned to a specific vehicle (initial routes
+    / locks must first be reordered so used vehicles come first in a class).
+    Opt-in via problem.break_symmetry: PATH_CHEAPEST_ARC often finds no
+    first solution under it, and local search gains little from it.
+    """
+    solver = routing.solver()
+    for vehicles in vehicle_classes(problem):
+        for a, b in zip(vehicles, vehicles[1:]):
+            solver.Add(routing.ActiveVehicleVar(a) >= routing.ActiveVehicleVar(b))
+
+
+def add_max_duration(routing, problem: Problem, time_dimension):
     """
     Cap each vehicle's route duration via CumulVar(End(v)).SetMax().
     Only applied when max_duration_minutes is set on the vehicle.
     """
-    for v_idx, vehicle in enumerate(data.vehicles):
-        if vehicle.max_duration_minutes is not None:
-            time_dimension.CumulVar(routing.End(v_idx)).SetMax(
-                vehicle.max_duration_minutes
+    for v_idx, max_duration in enumerate(problem.max_duration.tolist()):
+        if max_duration != UNSET:
+            time_dimension.CumulVar(routing.End(v_idx)).SetMax(max_duration)
+
+
+def add_forbidden_arcs(routing, manager, problem: Problem):
+    """
+    Remove forbidden successors from each NextVar domain before search.
+
+    The depot maps to one start/end index per vehicle, so arcs touching it
+    are never in forbidden_arcs (see vrp.preprocess.sparse / pruning). When
+    most of a row is forbidden (k-nearest-neighbour pruning), the domain is
+    set to the allowed successors plus every vehicle end instead.
+    """
+    if problem.forbidden_arcs is None:
+        return
+    ends = [routing.End(v) for v in range(problem.num_vehicles)]
+    for from_node, row in enumerate(problem.forbidden_arcs):
+        to_nodes = np.flatnonzero(row)
+        if to_nodes.size == 0:
+            continue
+        next_var = routing.NextVar(manager.NodeToIndex(from_node))
+        if 2 * to_nodes.size > row.size:
+            allowed = np.flatnonzero(~row)
+            next_var.SetValues(
+                [manager.NodeToIndex(int(to_node)) for to_node in allowed
+                 if to_node != problem.depot_index] + ends
             )
+        else:
+            next_var.RemoveValues([manager.NodeToIndex(int(to_node)) for to_node in to_nodes])
@@ -0,0 +1,260 @@
+import dataclasses
+import math
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from ortools.constraint_solver import routing_enums_pb2
+
+from vrp.models.problem import Problem
+from vrp.solvers.ortools_v2.constraints import vehicle_classes
+from vrp.solvers.ortools_v2.monitor import STOP_CANCELLED, PlateauMonitor
+from vrp.solvers.ortools_v2.portfolio import available_cpus
+from vrp.solvers.tracking import CancelWatcher
+
+# 子問題求解佔總時間的比例，其餘留給合併後的全域改善
+SUBPROBLEM_TIME_SHARE = 0.7
+KMEANS_ITERATIONS = 25
+# 時間窗特徵相對於空間特徵的權重（兩者先標準化成相同離散程度）
+TIME_WINDOW_WEIGHT = 0.5
+
+
+def partition_customers(problem: Problem, n_clusters: int) -> list[np.ndarray]:
+    """
+    k-means over (x, y, time-window midpoint) for every non-depot node.
+
+    Coordinates are kilometres around the depot. The window midpoint is
+    turned into kilometres with the fleet's typical speed, taken from the
+    depot row of the distance/time matrices, then rescaled so its spread is
+    TIME_WINDOW_WEIGHT times the spatial spread. A stop that is close but
+    due hours later then tends to land in a different cluster without time
+    dominating the partition.
+    """
+    depot = problem.depot_index
+    customers = np.flatnonzero(np.arange(problem.num_locations) != depot)
+
+    lat0 = math.radians(problem.lat[depot])
+    x = np.radians(problem.lng[customers] - problem.lng[depot]) * math.cos(lat0) * 6371
+    y = np.radians(problem.lat[customers] - problem.lat[depot]) * 6371
+
+    travel = problem.transit_time[depot, customers] - problem.service_time[depot]
+    moving = travel > 0
+    km_per_min = (
+        float(np.median(problem.distance[depot, customers][moving] / travel[moving])) / 1000
+        if moving.any() else 0.5
+    )
+    tw_mid = (problem.time_window_start[customers] + problem.time_window_end[customers]) / 2
+    t = (tw_mid - tw_mid.mean()) * km_per_min
+    spatial_spread = float(np.sqrt(x.var() + y.var()))
+    if t.std() > 0:
+        t *= TIME_WINDOW_WEIGHT * spatial_spread / t.std()
+
+    features = np.column_stack([x, y, t])
+    # 依繞 depot 的極角排序後等距取初始中心，結果可重現且各中心分散
+    order = np.argsort(np.arctan2(y, x))
+    centers = features[order[np.linspace(0, len(order) - 1, n_clusters).astype(int)]]
+    labels = np.zeros(len(customers), dtype=int)
+    for iteration in range(KMEANS_ITERATIONS):
+        dist = ((features[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2)
+        new_labels = dist.argmin(axis=1)
+        if iteration > 0 and np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+        for k in range(n_clusters):
+            members = features[labels == k]
+            if len(members):
+                centers[k] = members.mean(axis=0)
+
+    clusters = [customers[labels == k] for k in range(n_clusters)]
+    return [c for c in clusters if len(c)]
+
+
+def allocate_vehicles(problem: Problem, clusters: list[np.ndarray]) -> list[list[int]]:
+    """
+    Give each cluster at least one vehicle, then hand out the rest (largest
+    capacity first) to whichever cluster has the most load per capacity.
+    """
+    load = np.maximum(problem.pickup, problem.delivery).astype(np.int64)
+    cluster_load = [int(load[c].sum()) for c in clusters]
+    vehicles = sorted(range(problem.num_vehicles), key=lambda v: -int(problem.capacity[v]))
+
+    allocation = [[] for _ in clusters]
+    allocated_capacity = [0] * len(clusters)
+    by_load = sorted(range(len(clusters)), key=lambda k: -cluster_load[k])
+    for k, v in zip(by_load, vehicles):
+        allocation[k].append(v)
+        allocated_capacity[k] += int(problem.capacity[v])
+    for v in vehicles[len(clusters):]:
+        k = max(
+            range(len(clusters)),
+            key=lambda k: cluster_load[k] / max(allocated_capacity[k], 1),
+        )
+        allocation[k].append(v)
+        allocated_capacity[k] += int(problem.capacity[v])
+    return allocation
+
+
+def subproblem(problem: Problem, nodes: np.ndarray, vehicles: list[int]) -> Problem:
+    """Slice problem down to depot + nodes and the given vehicles (depot becomes node 0)."""
+    keep = np.concatenate([[problem.depot_index], nodes])
+    vehicles = sorted(vehicles)
+    new_vehicle = {v: i for i, v in enumerate(vehicles)}
+
+    allowed = []
+    for node in keep:
+        allowed_indices = problem.allowed_vehicles[node]
+        if allowed_indices is None:
+            allowed.append(None)
+        else:
+            allowed.append(tuple(new_vehicle[v] for v in allowed_indices if v in new_vehicle))
+
+    grid = np.ix_(keep, keep)
+    return dataclasses.replace(
+        problem,
+        depot_index=0,
+        location_ids=problem.location_ids[keep],
+        location_names=tuple(problem.location_names[i] for i in keep),
+        lat=problem.lat[keep],
+        lng=problem.lng[keep],
+        pickup=problem.pickup[keep],
+        delivery=problem.delivery[keep],
+        service_time=problem.service_time[keep],
+        time_window_start=problem.time_window_start[keep],
+        time_window_end=problem.time_window_end[keep],
+        unserved_penalty=problem.unserved_penalty[keep],
+        late_penalty=problem.late_penalty[keep],
+        allowed_vehicles=tuple(allowed),
+        vehicle_ids=problem.vehicle_ids[vehicles],
+        capacity=problem.capacity[vehicles],
+        fixed_cost=problem.fixed_cost[vehicles],
+        max_duration=problem.max_duration[vehicles],
+        distance=problem.distance[grid],
+        transit_time=problem.transit_time[grid],
+        forbidden_arcs=None if problem.forbidden_arcs is None else problem.forbidden_arcs[grid],
+        unreachable=frozenset(i for i, node in enumerate(keep.tolist()) if node in problem.unreachable),
+        portfolio_size=1,
+        initial_routes=None,
+        cluster_size=None,
+        break_symmetry=False,
+    )
+
+
+def routes_to_nodes(result: dict, problem: Problem) -> list[list[int]]:
+    """Map a parse_solution result back to node indices per vehicle index of problem."""
+    node_of = {loc_id: i for i, loc_id in enumerate(problem.location_ids.tolist())}
+    vehicle_of = {vid: v for v, vid in enumerate(problem.vehicle_ids.tolist())}
+    depot = problem.depot_index
+    routes = [[] for _ in range(problem.num_vehicles)]
+    for route in result["routes"]:
+        nodes = [node_of[stop["location_id"]] for stop in route["stops"]]
+        routes[vehicle_of[route["vehicle_id"]]] = [n for n in nodes if n != depot]
+    return routes
+
+
+def _solve_cluster(sub: Problem, budget: float, deadline: float) -> dict:
+    # budget：此群分到的秒數；deadline：所有子問題共用的 wall clock 上限
+    from vrp.solvers.ortools_v2.engine import make_search_params, run_search
+
+    try:
+        return run_search(sub, make_search_params(min(budget, deadline - time.time())))
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+
+def solve_decomposed(problem: Problem, deadline: float) -> dict:
+    """
+    Cluster-first, route-second for instances too large for one RoutingModel.
+
+    1. partition customers into ceil(customers / cluster_size) clusters
+       (never more clusters than vehicles) and split the fleet between them;
+    2. solve every cluster as an independent subproblem in worker processes;
+    3. stitch the cluster routes into one assignment on the full model, lock
+       them for the first-solution phase so LOCAL_CHEAPEST_INSERTION only
+       repairs stops a cluster failed to serve, and spend the remaining time
+       on a global GUIDED_LOCAL_SEARCH pass.
+
+    The result has the same shape as run_search, plus a "decomposition"
+    summary.
+    """
+    from vrp.solvers.ortools_v2.engine import build_model, make_search_params
+    from vrp.solvers.ortools_v2.result import parse_solution
+
+    start = time.time()
+    customers = problem.num_locations - 1
+    n_clusters = min(math.ceil(customers / problem.cluster_size), problem.num_vehicles)
+    clusters = partition_customers(problem, n_clusters)
+    allocation = allocate_vehicles(problem, clusters)
+    subproblems = [subproblem(problem, nodes, vehicles) for nodes, vehicles in zip(clusters, allocation)]
+
+    sub_deadline = start + (deadline - start) * SUBPROBLEM_TIME_SHARE
+    workers = max(1, min(len(subproblems), available_cpus()))
+    # 群數多於核心數時分輪執行，每一群分到一輪的時間
+    rounds = math.ceil(len(subproblems) / workers)
+    budget = (sub_deadline - time.time()) / rounds
+    if workers == 1:
+        sub_results = [_solve_cluster(sub, budget, sub_deadline) for sub in subproblems]
+    else:
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+            futures = [pool.submit(_solve_cluster, sub, budget, sub_deadline) for sub in subproblems]
+            sub_results = [future.result() for future in futures]
+
+    routes = [[] for _ in range(problem.num_vehicles)]
+    vehicle_of = {vid: v for v, vid in enumerate(problem.vehicle_ids.tolist())}
+    node_of = {loc_id: i for i, loc_id in enumerate(problem.location_ids.tolist())}
+    for sub, result in zip(subproblems, sub_results):
+        if result.get("status") != "success":
+            continue
+        for v_sub, nodes in enumerate(routes_to_nodes(result, sub)):
+            v = vehicle_of[int(sub.vehicle_ids[v_sub])]
+            routes[v] = [node_of[int(sub.location_ids[n])] for n in nodes]
+
+    # 同類車輛可互換：把有路線的車排在前面，才符合 add_symmetry_breaking
+    for vehicles in vehicle_classes(problem):
+        used = [routes[v] for v in vehicles if routes[v]]
+        for slot, v in enumerate(vehicles):
+            routes[v] = used[slot] if slot < len(used) else []
+
+    manager, routing, time_dimension = build_model(problem, problem.break_symmetry)
+    search_params = make_search_params(
+        deadline - time.time(),
+        routing_enums_pb2.FirstSolutionStrategy.LOCAL_CHEAPEST_INSERTION,
+        routing_enums_pb2.LocalSearchMetaheuristic.GUIDED_LOCAL_SEARCH,
+    )
+    time_limit_seconds = search_params.time_limit.ToMilliseconds() / 1000
+    monitor = PlateauMonitor.attach(routing, problem, time_limit_seconds)
+    routing.CloseModelWithParameters(search_params)
+    routing.ApplyLocksToAllVehicles(
+        [[manager.NodeToIndex(n) for n in route] for route in routes], False
+    )
+    cancel = CancelWatcher.watch(routing, problem.compute_id)
+    try:
+        solution = routing.SolveWithParameters(search_params)
+    finally:
+        cancel.stop()
+    if solution is None:
+        if cancel.cancelled:
+            raise ValueError("已取消，取消前尚未找到可行解")
+        raise ValueError("找不到可行解，請確認時間窗與容量限制是否過於嚴苛")
+
+    result = parse_solution(routing, manager, solution, time_dimension, problem)
+    summary = monitor.summary(time_limit_seconds)
+    if cancel.cancelled:
+        summary["stop_reason"] = STOP_CANCELLED
+    return {
+        "objective": solution.ObjectiveValue(),
+        **summary,
+        **result,
+        "decomposition": {
+            "clusters": [
+                {
+                    "locations": len(nodes),
+                    "vehicles": len(vehicles),
+                    "status": sub_result.get("status"),
+                    "objective": sub_result.get("objective"),
+                }
+                for nodes, vehicles, sub_result in zip(clusters, allocation, sub_results)
+            ],
+        },
+    }
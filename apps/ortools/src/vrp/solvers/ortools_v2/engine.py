@@ -1,9 +1,13 @@
 import time
-import httpx
+from dataclasses import asdict
+
 from ortools.constraint_solver import routing_enums_pb2
 from ortools.constraint_solver import pywrapcp
+from ortools.util import optional_boolean_pb2
 
+from vrp.models.problem import UNSET, Problem
 from vrp.models.schema_v2 import VRPRequestV2
+from vrp.preprocess import compile_problem
 from vrp.solvers.ortools_v2.constraints import (
     add_distance_cost,
     add_fixed_costs,
@@ -12,60 +16,258 @@ from vrp.solvers.ortools_v2.constraints import (
     add_optional_stops,
     add_max_duration,
     add_vehicle_constraints,
+    add_forbidden_arcs,
+    add_symmetry_breaking,
 )
+from vrp.solvers.ortools_v2.monitor import STOP_CANCELLED, PlateauMonitor
+from vrp.solvers.ortools_v2.progress import ProgressReporter
 from vrp.solvers.ortools_v2.result import parse_solution
+from vrp.solvers.tracking import CancelWatcher, JobTracker
+from vrp.timing import PhaseTimer
+from vrp.webhook import deliver_webhook
 
 
-def solve_vrp_v2_logic(compute_id: int, data: VRPRequestV2):
-    start_time = time.perf_counter()
-    try:
+def build_model(problem: Problem, break_symmetry: bool = False, timer: PhaseTimer | None = None):
+    """Build the routing model; timer, if given, records each add_* builder."""
+    timer = timer if timer is not None else PhaseTimer()
+    with timer.phase("build"):
         manager = pywrapcp.RoutingIndexManager(
-            len(data.locations), len(data.vehicles), data.depot_index
+            problem.num_locations, problem.num_vehicles, problem.depot_index
         )
-        routing = pywrapcp.RoutingModel(manager)
+        routing = timer.run(pywrapcp.RoutingModel, manager)
 
-        add_distance_cost(routing, manager, data)
-        add_fixed_costs(routing, data)
-        add_capacity_dimension(routing, manager, data)
-        time_dimension = add_time_dimension_v2(routing, manager, data)
+        timer.run(add_distance_cost, routing, manager, problem)
+        timer.run(add_fixed_costs, routing, problem)
+        timer.run(add_capacity_dimension, routing, manager, problem)
+        time_dimension = timer.run(add_time_dimension_v2, routing, manager, problem)
 
         # v2 features
-        add_optional_stops(routing, manager, data)
-        add_max_duration(routing, data, time_dimension)
-        add_vehicle_constraints(routing, manager, data)
+        timer.run(add_optional_stops, routing, manager, problem)
+        timer.run(add_max_duration, routing, problem, time_dimension)
+        timer.run(add_vehicle_constraints, routing, manager, problem)
+        timer.run(add_forbidden_arcs, routing, manager, problem)
+        if break_symmetry:
+            timer.run(add_symmetry_breaking, routing, problem)
 
-        search_params = pywrapcp.DefaultRoutingSearchParameters()
-        search_params.first_solution_strategy = (
-            routing_enums_pb2.FirstSolutionStrategy.PATH_CHEAPEST_ARC
-        )
-        search_params.local_search_metaheuristic = (
-            routing_enums_pb2.LocalSearchMetaheuristic.GUIDED_LOCAL_SEARCH
-        )
-        search_params.time_limit.seconds = data.time_limit_seconds
+    return manager, routing, time_dimension
+
+
+def make_search_params(
+    time_limit_seconds: float,
+    first_solution_strategy=routing_enums_pb2.FirstSolutionStrategy.PATH_CHEAPEST_ARC,
+    metaheuristic=routing_enums_pb2.LocalSearchMetaheuristic.GUIDED_LOCAL_SEARCH,
+):
+    search_params = pywrapcp.DefaultRoutingSearchParameters()
+    search_params.first_solution_strategy = first_solution_strategy
+    search_params.local_search_metaheuristic = metaheuristic
+    search_params.time_limit.FromMilliseconds(max(1, int(time_limit_seconds * 1000)))
+    return search_params
+
+
+def run_search(
+    problem: Problem,
+    search_params,
+    report_progress: bool = False,
+    timer: PhaseTimer | None = None,
+    tracker: JobTracker | None = None,
+) -> dict:
+    """
+    Build the model, search once and return the parse_solution result plus
+    objective and why the search stopped (see PlateauMonitor).
+
+    report_progress streams improving solutions to
+    problem.progress_webhook_url (see ProgressReporter); only the single
+    search enables it, so portfolio workers do not interleave their streams.
+    timer, if given, records build / first_solution / search / parse;
+    tracker, if given, reports the best objective to the job store. The
+    search stops early, keeping its best solution, when the job is
+    cancelled (see CancelWatcher).
+    """
+    timer = timer if timer is not None else PhaseTimer()
+    # 初始路線綁定特定車輛，不能再要求同類車輛依序使用；PATH_CHEAPEST_ARC 在此限制下常找不到初始解
+    break_symmetry = (
+        problem.break_symmetry
+        and problem.initial_routes is None
+        and search_params.first_solution_strategy != routing_enums_pb2.FirstSolutionStrategy.PATH_CHEAPEST_ARC
+    )
+    manager, routing, time_dimension = build_model(problem, break_symmetry, timer)
+
+    time_limit_seconds = search_params.time_limit.ToMilliseconds() / 1000
+    monitor = PlateauMonitor.attach(routing, problem, time_limit_seconds)
+    reporter = None
+    if report_progress:
+        reporter = ProgressReporter.attach(routing, manager, time_dimension, problem)
+    if tracker is not None:
+        tracker.watch(routing)
+    clock = timer.watch_search(routing)
+    with timer.phase("build"):
+        initial = read_initial_routes(routing, manager, problem, search_params)
+    cancel = CancelWatcher.watch(routing, problem.compute_id)
+    try:
+        with clock.solving():
+            if initial is not None:
+                solution = routing.SolveFromAssignmentWithParameters(initial, search_params)
+            else:
+                solution = routing.SolveWithParameters(search_params)
+    finally:
+        cancel.stop()
+        if reporter is not None:
+            reporter.close()
+
+    if solution is None:
+        if cancel.cancelled:
+            raise ValueError("已取消，取消前尚未找到可行解")
+        raise ValueError("找不到可行解，請確認時間窗與容量限制是否過於嚴苛")
 
-        solution = routing.SolveWithParameters(search_params)
+    with timer.phase("parse"):
+        result = parse_solution(routing, manager, solution, time_dimension, problem)
+    summary = monitor.summary(time_limit_seconds)
+    if cancel.cancelled:
+        summary["stop_reason"] = STOP_CANCELLED
+    return {
+        "objective": solution.ObjectiveValue(),
+        "warm_start": initial is not None,
+        **summary,
+        **({"progress_updates": reporter.sent} if reporter is not None else {}),
+        **result,
+    }
 
-        if solution is None:
-            raise ValueError("找不到可行解，請確認時間窗與容量限制是否過於嚴苛")
 
-        result = parse_solution(routing, manager, solution, time_dimension, data)
+def read_initial_routes(routing, manager, problem: Problem, search_params):
+    """
+    Turn problem.initial_routes into a start for the search.
+
+    Returns the assignment, or None when there are no initial routes or
+    OR-Tools rejects them (e.g. a route that breaks capacity or a hard time
+    window); the search then builds its first solution as usual.
+
+    Routes that miss required stops (e.g. orders added since they were
+    planned) are not a valid assignment on their own. They are locked, as
+    reoptimize does, and LOCAL_CHEAPEST_INSERTION inserts the rest in a
+    first-solution-only solve; the locks are then lifted so the search can
+    still rework the given routes.
+    """
+    if problem.initial_routes is None:
+        return None
+    routing.CloseModelWithParameters(search_params)
+    routes = [
+        [manager.NodeToIndex(node) for node in route]
+        for route in problem.initial_routes
+    ]
+    visited = {node for route in problem.initial_routes for node in route}
+    complete = all(
+        penalty != UNSET or node == problem.depot_index or node in visited
+        for node, penalty in enumerate(problem.unserved_penalty.tolist())
+    )
+    if not complete:
+        # close_routes=False：鎖定的路線仍可插入缺少的地點
+        if not routing.ApplyLocksToAllVehicles(routes, False):
+            return None
+        insert_params = pywrapcp.DefaultRoutingSearchParameters()
+        insert_params.CopyFrom(search_params)
+        insert_params.first_solution_strategy = routing_enums_pb2.FirstSolutionStrategy.LOCAL_CHEAPEST_INSERTION
+        insert_params.solution_limit = 1
+        inserted = routing.SolveWithParameters(insert_params)
+        # 鎖定會一直限制之後的搜尋，插入完就解除
+        routing.MutablePreAssignment().Clear()
+        if inserted is None:
+            return None
+        routes = []
+        for vehicle in range(problem.num_vehicles):
+            route = []
+            index = inserted.Value(routing.NextVar(routing.Start(vehicle)))
+            while not routing.IsEnd(index):
+                route.append(index)
+                index = inserted.Value(routing.NextVar(index))
+            routes.append(route)
+    # ignore_inactive_indices=True：可選地點若被設為不拜訪，忽略而非整組拒絕
+    return routing.ReadAssignmentFromRoutes(routes, True)
+
+
+def solve_vrp_v2_logic(compute_id: int, data: VRPRequestV2 | Problem, timings: dict | None = None):
+    """
+    timings: phases already spent before the worker (request decode and, for
+    v2, matrix preparation / compile in the API), continued here and
+    returned as payload["timings"] (see PhaseTimer).
+    """
+    start_time = time.perf_counter()
+    timer = PhaseTimer(timings)
+    tracker = JobTracker.start(compute_id)
+    webhook_url = data.webhook_url
+    preprocess_seconds = None
+    try:
+        if tracker.cancel_requested():
+            # 排隊中就被取消，不必編譯與搜尋
+            raise ValueError("已取消")
+        if isinstance(data, Problem):
+            problem = data
+        else:
+            problem = compile_problem(data, timer)
+        # 之後只使用 problem；放掉本 frame 對 pydantic request 的參照
+        data = None
+        preprocess_seconds = round(time.perf_counter() - start_time, 4)
+
+        time_limit_seconds = problem.time_limit_seconds
+        auto = None
+        if problem.auto_configure:
+            from vrp.solvers.ortools_v2.autoconfig import auto_config
+            with timer.phase("auto_config"):
+                auto = auto_config(problem)
+            time_limit_seconds = auto.time_limit_seconds
+
+        deadline = time.time() + time_limit_seconds
+        if problem.cluster_size is not None and problem.num_locations - 1 > problem.cluster_size:
+            from vrp.solvers.ortools_v2.decompose import solve_decomposed
+            # 子問題各自建模、搜尋，不再細分階段
+            with timer.phase("search"):
+                result = solve_decomposed(problem, deadline)
+        elif problem.portfolio_size > 1:
+            from vrp.solvers.ortools_v2.portfolio import solve_portfolio
+            with timer.phase("search"):
+                result = solve_portfolio(problem, deadline)
+        else:
+            search_params = make_search_params(time_limit_seconds)
+            if auto is not None:
+                search_params.first_solution_strategy = getattr(
+                    routing_enums_pb2.FirstSolutionStrategy, auto.first_solution_strategy
+                )
+                search_params.local_search_metaheuristic = getattr(
+                    routing_enums_pb2.LocalSearchMetaheuristic, auto.metaheuristic
+                )
+                for operator in auto.lns_operators:
+                    setattr(search_params.local_search_operators, operator, optional_boolean_pb2.BOOL_TRUE)
+            if problem.break_symmetry:
+                search_params.first_solution_strategy = routing_enums_pb2.FirstSolutionStrategy.SAVINGS
+            result = run_search(problem, search_params, report_progress=True, timer=timer, tracker=tracker)
+
         elapsed = round(time.perf_counter() - start_time, 3)
-        payload = {"compute_id": compute_id, "elapsed_seconds": elapsed, **result}
+        payload = {
+            "compute_id": compute_id,
+            "elapsed_seconds": elapsed,
+            "preprocess_seconds": preprocess_seconds,
+            "pruned_arcs": problem.pruned_arcs,
+            **result,
+            "timings": timer.as_dict(),
+        }
+        if auto is not None:
+            payload["auto_config"] = asdict(auto)
 
     except Exception as e:
         elapsed = round(time.perf_counter() - start_time, 3)
         payload = {
             "compute_id": compute_id,
             "elapsed_seconds": elapsed,
+            "preprocess_seconds": preprocess_seconds,
             "status": "error",
             "message": str(e),
+            "timings": timer.as_dict(),
         }
 
-    if data.webhook_url:
-        try:
-            with httpx.Client() as client:
-                client.post(data.webhook_url, json=payload, timeout=10)
-        except Exception as webhook_err:
-            print(f"[compute_id={compute_id}] Webhook 發送失敗: {webhook_err}")
+    tracker.finish(payload)
+    if webhook_url:
+        # 送出的 payload 不可能含自己的發送時間；webhook 只記在回傳值
+        with timer.phase("webhook"):
+            deliver_webhook(webhook_url, payload)
+        payload["timings"] = timer.as_dict()
 
     return payload
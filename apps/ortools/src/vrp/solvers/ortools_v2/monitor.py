@@ -0,0 +1,98 @@
+import time
+
+from vrp.models.problem import Problem
+
+# stop_reason 值
+STOP_TIME_LIMIT = "time_limit"
+STOP_PLATEAU_SECONDS = "plateau_seconds"
+STOP_PLATEAU_SOLUTIONS = "plateau_solutions"
+STOP_COMPLETED = "completed"          # 搜尋自行結束（例如 GREEDY_DESCENT 到達局部最佳）
+STOP_CANCELLED = "cancelled"          # job 被取消（見 vrp.solvers.tracking.CancelWatcher）
+
+# 距離 time limit 不到這麼多秒就結束，視為用完時間
+_TIME_LIMIT_SLACK = 0.05
+
+# plateau_seconds 未指定時：每個地點 0.05 秒，介於 1 秒與 time limit 的 1/3 之間。
+# GLS 在 100 站的實例上常停滯 3–9 秒後才再突破，固定的短秒數會犧牲太多品質。
+PLATEAU_SECONDS_PER_LOCATION = 0.05
+PLATEAU_MIN_SECONDS = 1.0
+PLATEAU_MAX_TIME_SHARE = 1 / 3
+
+
+def default_plateau_seconds(num_locations: int, time_limit_seconds: float) -> float:
+    return min(
+        max(PLATEAU_MIN_SECONDS, num_locations * PLATEAU_SECONDS_PER_LOCATION),
+        time_limit_seconds * PLATEAU_MAX_TIME_SHARE,
+    )
+
+
+class PlateauMonitor:
+    """
+    At-solution callback that ends the search once the objective plateaus.
+
+    An improvement counts only when the objective drops by at least
+    min_improvement (relative) below the last counted one. The search is
+    finished after `seconds` without such an improvement, or after
+    `solutions` consecutive solutions without one; either may be None.
+    The check runs only when a solution is found, so it adds no per-branch
+    Python overhead (GLS reports a solution every few milliseconds).
+    """
+
+    def __init__(self, routing, seconds: float | None, solutions: int | None, min_improvement: float):
+        self._routing = routing
+        self._seconds = seconds
+        self._solutions = solutions
+        self._min_improvement = min_improvement
+        self._start = time.perf_counter()
+        self._reference = None
+        self._last_improvement = None
+        self._since_improvement = 0
+        self.solutions = 0
+        self.stop_reason = None
+
+    @classmethod
+    def attach(cls, routing, problem: Problem, time_limit_seconds: float) -> "PlateauMonitor":
+        """
+        Register a monitor on routing. Without problem.early_stop it only
+        counts solutions, so stop_reason is still reported.
+        """
+        seconds = solutions = None
+        if problem.early_stop:
+            seconds = problem.plateau_seconds
+            if seconds is None:
+                seconds = default_plateau_seconds(problem.num_locations, time_limit_seconds)
+            solutions = problem.plateau_solutions
+        monitor = cls(routing, seconds, solutions, problem.plateau_min_improvement)
+        routing.AddAtSolutionCallback(monitor)
+        return monitor
+
+    def __call__(self):
+        objective = self._routing.CostVar().Value()
+        now = time.perf_counter()
+        self.solutions += 1
+        if self._reference is None or objective < self._reference * (1 - self._min_improvement):
+            self._reference = objective
+            self._last_improvement = now
+            self._since_improvement = 0
+            return
+
+        self._since_improvement += 1
+        if self._seconds is not None and now - self._last_improvement >= self._seconds:
+            self.stop_reason = STOP_PLATEAU_SECONDS
+        elif self._solutions is not None and self._since_improvement >= self._solutions:
+            self.stop_reason = STOP_PLATEAU_SOLUTIONS
+        else:
+            return
+        self._routing.solver().FinishCurrentSearch()
+
+    def summary(self, time_limit_seconds: float) -> dict:
+        """stop_reason plus search stats for the payload, once the search has returned."""
+        elapsed = time.perf_counter() - self._start
+        stop_reason = self.stop_reason
+        if stop_reason is None:
+            stop_reason = STOP_TIME_LIMIT if elapsed >= time_limit_seconds - _TIME_LIMIT_SLACK else STOP_COMPLETED
+        return {
+            "stop_reason": stop_reason,
+            "search_seconds": round(elapsed, 3),
+            "solutions": self.solutions,
+        }
@@ -0,0 +1,118 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+
+from ortools.constraint_solver import routing_enums_pb2
+from ortools.util import optional_boolean_pb2
+
+from vrp.models.problem import Problem
+
+_FSS = routing_enums_pb2.FirstSolutionStrategy
+_LSM = routing_enums_pb2.LocalSearchMetaheuristic
+
+
+@dataclass(frozen=True)
+class SearchConfig:
+    first_solution_strategy: str
+    metaheuristic: str
+    gls_lambda: float | None = None         # guided_local_search_lambda_coefficient，None = OR-Tools 預設 0.1
+    lns_operators: tuple[str, ...] = ()     # search_params.local_search_operators 中要開啟的欄位
+
+
+# 依序取前 portfolio_size 個；第一個即單一搜尋時的預設設定。
+# ReSeed 不影響這些搜尋（固定 solution_limit 下目標值完全相同），所以同一組策略
+# 只靠 GLS 懲罰強度或 path LNS 區分，每一個都會走出不同的搜尋路徑
+PORTFOLIO = [
+    SearchConfig("PATH_CHEAPEST_ARC", "GUIDED_LOCAL_SEARCH"),
+    SearchConfig("PARALLEL_CHEAPEST_INSERTION", "GUIDED_LOCAL_SEARCH"),
+    SearchConfig("SAVINGS", "GUIDED_LOCAL_SEARCH"),
+    SearchConfig("PATH_CHEAPEST_ARC", "SIMULATED_ANNEALING"),
+    SearchConfig("LOCAL_CHEAPEST_INSERTION", "TABU_SEARCH"),
+    SearchConfig("CHRISTOFIDES", "GUIDED_LOCAL_SEARCH"),
+    SearchConfig("PATH_CHEAPEST_ARC", "GUIDED_LOCAL_SEARCH", gls_lambda=0.3),
+    SearchConfig("PARALLEL_CHEAPEST_INSERTION", "SIMULATED_ANNEALING"),
+    SearchConfig("PATH_CHEAPEST_ARC", "GUIDED_LOCAL_SEARCH", gls_lambda=0.05),
+    SearchConfig("PATH_CHEAPEST_ARC", "GUIDED_LOCAL_SEARCH", lns_operators=("use_path_lns",)),
+    SearchConfig("PARALLEL_CHEAPEST_INSERTION", "GUIDED_LOCAL_SEARCH", gls_lambda=0.3),
+    SearchConfig("SAVINGS", "GUIDED_LOCAL_SEARCH", gls_lambda=0.05),
+    SearchConfig("CHRISTOFIDES", "GUIDED_LOCAL_SEARCH", gls_lambda=0.3),
+    SearchConfig("LOCAL_CHEAPEST_INSERTION", "TABU_SEARCH", lns_operators=("use_path_lns",)),
+    SearchConfig("PARALLEL_CHEAPEST_INSERTION", "SIMULATED_ANNEALING", lns_operators=("use_path_lns",)),
+    SearchConfig("SAVINGS", "GUIDED_LOCAL_SEARCH", lns_operators=("use_path_lns",)),
+]
+
+
+def portfolio_configs(size: int) -> list[SearchConfig]:
+    """The first size configs of PORTFOLIO; more runs than distinct configs would only repeat one."""
+    return PORTFOLIO[:size]
+
+
+def available_cpus() -> int:
+    """CPU count honoring the cgroup v2 quota (Modal's cpu= setting) when present."""
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            return max(1, int(int(quota) / int(period)))
+    except (OSError, ValueError):
+        pass
+    return len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+
+
+def _run_config(problem: Problem, config: SearchConfig, deadline: float) -> dict:
+    # 在 worker 行程內執行；剩餘時間以 wall clock deadline 計算，扣掉行程啟動的耗時
+    from vrp.solvers.ortools_v2.engine import make_search_params, run_search
+
+    search_params = make_search_params(
+        deadline - time.time(),
+        getattr(_FSS, config.first_solution_strategy),
+        getattr(_LSM, config.metaheuristic),
+    )
+    if config.gls_lambda is not None:
+        search_params.guided_local_search_lambda_coefficient = config.gls_lambda
+    for operator in config.lns_operators:
+        setattr(search_params.local_search_operators, operator, optional_boolean_pb2.BOOL_TRUE)
+    try:
+        return {"status": "success", **run_search(problem, search_params)}
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+
+def solve_portfolio(problem: Problem, deadline: float) -> dict:
+    """
+    Run differently configured searches in parallel worker processes and keep
+    the cheapest solution.
+
+    One RoutingModel search is single-threaded, so extra cores only help by
+    searching different parts of the space at the same time. The number of
+    runs is capped at available_cpus() and len(PORTFOLIO), so every run gets
+    the full time limit and no two runs repeat the same search;
+    the returned result carries a "portfolio" list with each run's
+    configuration and objective.
+    """
+    workers = max(1, min(problem.portfolio_size, available_cpus(), len(PORTFOLIO)))
+    configs = portfolio_configs(workers)
+
+    # spawn：呼叫端（local_dev 的 thread pool）可能是多執行緒行程，fork 不安全
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+        futures = [pool.submit(_run_config, problem, config, deadline) for config in configs]
+        runs = [future.result() for future in futures]
+
+    summary = [
+        {
+            **asdict(config),
+            "status": run["status"],
+            "objective": run.get("objective"),
+            **({"message": run["message"]} if "message" in run else {}),
+        }
+        for config, run in zip(configs, runs)
+    ]
+    successful = [run for run in runs if run["status"] == "success"]
+    if not successful:
+        raise ValueError("找不到可行解，請確認時間窗與容量限制是否過於嚴苛")
+
+    best = min(successful, key=lambda run: run["objective"])
+    return {**best, "portfolio": summary}
@@ -0,0 +1,103 @@
+import queue
+import threading
+import time
+
+from vrp.models.problem import Problem
+from vrp.solvers.ortools_v2.result import parse_solution
+from vrp.webhook import get_client
+
+
+class _CurrentAssignment:
+    """Lets parse_solution read the solution the search is sitting on inside a callback."""
+
+    @staticmethod
+    def Value(var):
+        return var.Value()
+
+    @staticmethod
+    def Min(var):
+        return var.Min()
+
+
+class ProgressReporter:
+    """
+    At-solution callback that streams improving solutions to
+    problem.progress_webhook_url while the search continues.
+
+    At most one post per progress_interval_seconds: an improvement that
+    arrives sooner is skipped, and the next improvement after the interval
+    is sent with the full route list. Posts go through a background thread
+    holding only the latest payload, so a slow receiver never blocks the
+    search; a payload not yet sent when a newer one arrives is dropped.
+    """
+
+    def __init__(self, routing, manager, time_dimension, problem: Problem):
+        self._routing = routing
+        self._manager = manager
+        self._time_dimension = time_dimension
+        self._problem = problem
+        self._interval = problem.progress_interval_seconds
+        self._start = time.perf_counter()
+        self._best = None
+        self._last_sent = None
+        self._outbox: queue.Queue = queue.Queue(maxsize=1)
+        self._sender = threading.Thread(target=self._send_loop, daemon=True)
+        self._sender.start()
+        self.sent = 0
+
+    @classmethod
+    def attach(cls, routing, manager, time_dimension, problem: Problem) -> "ProgressReporter | None":
+        if not problem.progress_webhook_url:
+            return None
+        reporter = cls(routing, manager, time_dimension, problem)
+        routing.AddAtSolutionCallback(reporter)
+        return reporter
+
+    def __call__(self):
+        objective = self._routing.CostVar().Value()
+        if self._best is not None and objective >= self._best:
+            return
+        self._best = objective
+        now = time.perf_counter()
+        if self._last_sent is not None and now - self._last_sent < self._interval:
+            return
+        self._last_sent = now
+
+        result = parse_solution(
+            self._routing, self._manager, _CurrentAssignment, self._time_dimension, self._problem
+        )
+        payload = {
+            "compute_id": self._problem.compute_id,
+            **result,
+            "status": "running",
+            "elapsed_seconds": round(now - self._start, 3),
+            "objective": objective,
+        }
+        # 只保留最新的一筆：還沒送出的舊進度直接丟掉
+        try:
+            self._outbox.get_nowait()
+        except queue.Empty:
+            pass
+        self._outbox.put_nowait(payload)
+
+    def _send_loop(self):
+        # 與結果 webhook 共用連線池；進度不重送、不進 outbox，下一筆進度會蓋過
+        client = get_client()
+        while True:
+            payload = self._outbox.get()
+            if payload is None:
+                return
+            try:
+                client.post(self._problem.progress_webhook_url, json=payload, timeout=5)
+                self.sent += 1
+            except Exception as e:
+                print(f"[compute_id={self._problem.compute_id}] 進度 webhook 發送失敗: {e}")
+
+    def close(self):
+        """Stop the sender; pending progress is dropped since the final result follows."""
+        try:
+            self._outbox.get_nowait()
+        except queue.Empty:
+            pass
+        self._outbox.put(None)
+        self._sender.join(timeout=5)
@@ -0,0 +1,139 @@
+import time
+
+import numpy as np
+from ortools.constraint_solver import routing_enums_pb2
+
+from vrp.models.schema_v2 import LocationV2, ReoptimizeRequest, VRPRequestV2
+from vrp.preprocess import compile_problem
+from vrp.preprocess.compile import resolve_matrices
+from vrp.preprocess.geo import estimate_distance_matrix, estimate_time_matrix
+from vrp.solvers.ortools_v2.engine import build_model, make_search_params
+from vrp.solvers.ortools_v2.result import parse_solution
+from vrp.timing import PhaseTimer
+
+
+def apply_delta(data: ReoptimizeRequest) -> VRPRequestV2:
+    """
+    Build the post-edit VRPRequestV2: drop removed locations/vehicles, append
+    added ones, and extend both matrices with the added rows/columns.
+
+    Cells the caller did not supply for an added location are estimated from
+    lat/lng with base.matrix_model. previous_routes become initial_routes;
+    compile_problem drops the removed ids from them.
+    """
+    base = data.base
+    removed = set(data.removed_location_ids)
+    keep = [i for i, loc in enumerate(base.locations) if loc.id not in removed]
+    kept_locations = [base.locations[i] for i in keep]
+    added = data.added_locations
+    locations = kept_locations + [
+        LocationV2(**loc.model_dump(include=set(LocationV2.model_fields))) for loc in added
+    ]
+
+    base_distance, base_time = resolve_matrices(base)
+    n_kept, n = len(kept_locations), len(locations)
+
+    model = base.matrix_model
+    lat = [loc.lat for loc in locations]
+    lng = [loc.lng for loc in locations]
+    distance = estimate_distance_matrix(lat, lng, model.metric, model.detour_factor)
+    travel_time = estimate_time_matrix(distance, model.speed_kmh)
+    distance[:n_kept, :n_kept] = base_distance[np.ix_(keep, keep)]
+    travel_time[:n_kept, :n_kept] = base_time[np.ix_(keep, keep)]
+
+    index_of = {loc.id: idx for idx, loc in enumerate(locations)}
+    for k, loc in enumerate(added, start=n_kept):
+        for other_id, value in loc.distance_to.items():
+            if other_id in index_of:
+                distance[k, index_of[other_id]] = value
+        for other_id, value in loc.distance_from.items():
+            if other_id in index_of:
+                distance[index_of[other_id], k] = value
+        for other_id, value in loc.time_to.items():
+            if other_id in index_of:
+                travel_time[k, index_of[other_id]] = value
+        for other_id, value in loc.time_from.items():
+            if other_id in index_of:
+                travel_time[index_of[other_id], k] = value
+    np.fill_diagonal(distance, 0)
+    np.fill_diagonal(travel_time, 0)
+
+    removed_vehicles = set(data.removed_vehicle_ids)
+    vehicles = [v for v in base.vehicles if v.id not in removed_vehicles] + list(data.added_vehicles)
+    if not vehicles:
+        raise ValueError("至少需要 1 輛車")
+
+    depot_id = base.locations[base.depot_index].id
+    return VRPRequestV2(
+        compute_id=base.compute_id,
+        webhook_url=base.webhook_url,
+        depot_index=index_of[depot_id],
+        locations=locations,
+        vehicles=vehicles,
+        distance_matrix=distance,
+        time_matrix=travel_time,
+        time_limit_seconds=base.time_limit_seconds,
+        initial_routes=data.previous_routes,
+    )
+
+
+def reoptimize_vrp_v2_logic(compute_id: int, data: ReoptimizeRequest, timings: dict | None = None):
+    """
+    Insert added stops into the previous plan, then run a short local search.
+
+    The previous routes are applied as locks for the first-solution phase
+    only, so LOCAL_CHEAPEST_INSERTION keeps them and just inserts what is
+    unassigned. GREEDY_DESCENT then improves until a local optimum or
+    time_limit_ms. The result is returned directly (no webhook); it has the
+    same shape as solve_vrp_v2_logic's payload, including timings.
+    """
+    start_time = time.perf_counter()
+    timer = PhaseTimer(timings)
+    try:
+        with timer.phase("compile"):
+            request = apply_delta(data)
+        problem = compile_problem(request, timer)
+        time_limit_seconds = data.time_limit_ms / 1000
+        data = request = None
+
+        manager, routing, time_dimension = build_model(problem, timer=timer)
+        search_params = make_search_params(
+            time_limit_seconds,
+            routing_enums_pb2.FirstSolutionStrategy.LOCAL_CHEAPEST_INSERTION,
+            routing_enums_pb2.LocalSearchMetaheuristic.GREEDY_DESCENT,
+        )
+        with timer.phase("build"):
+            routing.CloseModelWithParameters(search_params)
+            locked = False
+            if problem.initial_routes is not None:
+                locks = [
+                    [manager.NodeToIndex(node) for node in route]
+                    for route in problem.initial_routes
+                ]
+                # close_routes=False：鎖定的路線仍可插入新地點
+                locked = routing.ApplyLocksToAllVehicles(locks, False)
+
+        with timer.watch_search(routing).solving():
+            solution = routing.SolveWithParameters(search_params)
+        if solution is None:
+            raise ValueError("找不到可行解，請確認異動後的時間窗與容量限制")
+
+        with timer.phase("parse"):
+            result = parse_solution(routing, manager, solution, time_dimension, problem)
+        payload = {
+            "compute_id": compute_id,
+            "elapsed_seconds": round(time.perf_counter() - start_time, 3),
+            "objective": solution.ObjectiveValue(),
+            "warm_start": locked,
+            **result,
+            "timings": timer.as_dict(),
+        }
+    except Exception as e:
+        payload = {
+            "compute_id": compute_id,
+            "elapsed_seconds": round(time.perf_counter() - start_time, 3),
+            "status": "error",
+            "message": str(e),
+            "timings": timer.as_dict(),
+        }
+    return payload
@@ -0,0 +1,164 @@
+import queue
+import threading
+import time
+
+from vrp.store.job_store import JobStore, default_job_store
+
+# 搜尋中最多每幾秒把目前最佳目標值寫回 job store
+OBJECTIVE_INTERVAL_SECONDS = 1.0
+# 搜尋中每隔幾秒檢查一次取消請求
+CANCEL_POLL_SECONDS = 0.1
+
+
+class JobTracker:
+    """
+    Reports one solve to the job store: running on start, the best
+    objective while searching, and the final payload when done.
+
+    A no-op when no job store is configured. Objective updates go through a
+    background thread holding only the latest value, so a slow store (a
+    modal.Dict round trip) never blocks the search.
+    """
+
+    def __init__(self, compute_id: int, store: JobStore | None):
+        self.compute_id = compute_id
+        self.store = store
+        self._best = None
+        self._solutions = 0
+        self._last_sent = None
+        self._pending: queue.Queue = queue.Queue(maxsize=1)
+        self._writer = None
+
+    @classmethod
+    def start(cls, compute_id: int, store: JobStore | None = None) -> "JobTracker":
+        tracker = cls(compute_id, store if store is not None else default_job_store())
+        if tracker.store is not None:
+            tracker._safely(tracker.store.start, compute_id)
+        return tracker
+
+    def _safely(self, fn, *args):
+        # 狀態回報失敗不應影響求解
+        try:
+            return fn(*args)
+        except Exception as e:
+            print(f"[compute_id={self.compute_id}] job store 更新失敗: {e}")
+
+    def watch(self, routing):
+        if self.store is None:
+            return
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+
+        def on_solution():
+            self._solutions += 1
+            objective = routing.CostVar().Value()
+            if self._best is not None and objective >= self._best:
+                return
+            self._best = objective
+            now = time.perf_counter()
+            if self._last_sent is not None and now - self._last_sent < OBJECTIVE_INTERVAL_SECONDS:
+                return
+            self._last_sent = now
+            try:
+                self._pending.get_nowait()
+            except queue.Empty:
+                pass
+            self._pending.put_nowait((objective, self._solutions))
+
+        routing.AddAtSolutionCallback(on_solution)
+
+    def _write_loop(self):
+        while True:
+            update = self._pending.get()
+            if update is None:
+                return
+            objective, solutions = update
+            self._safely(lambda: self.store.update(self.compute_id, objective=objective, solutions=solutions))
+
+    def _stop_writer(self):
+        if self._writer is None:
+            return
+        try:
+            self._pending.get_nowait()
+        except queue.Empty:
+            pass
+        self._pending.put(None)
+        self._writer.join(timeout=5)
+        self._writer = None
+
+    def cancel_requested(self) -> bool:
+        return self.store is not None and bool(self._safely(self.store.cancel_requested, self.compute_id))
+
+    def finish(self, payload: dict):
+        """
+        Store the final payload (before the webhook, so a dropped webhook can
+        be polled). If the job was cancelled the payload is marked status
+        "cancelled" in place, keeping the routes found before the search
+        stopped, if any.
+        """
+        self._stop_writer()
+        if self.store is None:
+            return
+        if self.cancel_requested():
+            if "routes" in payload:
+                payload["stop_reason"] = "cancelled"
+                payload.pop("message", None)
+            else:
+                payload["message"] = "已取消，取消前尚未找到可行解"
+            payload["status"] = "cancelled"
+        self._safely(self.store.finish, self.compute_id, payload, self._best, self._solutions or None)
+
+
+class CancelWatcher:
+    """
+    Stops a search once its job is cancelled (see JobStore.cancel).
+
+    A background thread polls the job store every CANCEL_POLL_SECONDS and
+    calls routing.CancelSearch(), which OR-Tools checks between moves; the
+    search then returns the best solution found so far. Solution callbacks
+    alone are not enough, late in a GLS search accepted solutions can be
+    seconds apart. Also works in worker processes (portfolio, decompose),
+    which reach the same store through default_job_store(). A no-op when no
+    job store is configured.
+    """
+
+    def __init__(self, compute_id: int, store: JobStore | None):
+        self.compute_id = compute_id
+        self.store = store
+        self.cancelled = False
+        self._stopped = threading.Event()
+        self._thread = None
+
+    @classmethod
+    def watch(cls, routing, compute_id: int, store: JobStore | None = None) -> "CancelWatcher":
+        """Start watching before the solve; a cancel that arrives earlier still applies."""
+        watcher = cls(compute_id, store if store is not None else default_job_store())
+        if watcher.store is not None:
+            watcher._thread = threading.Thread(target=watcher._poll, args=(routing,), daemon=True)
+            watcher._thread.start()
+        return watcher
+
+    def _poll(self, routing):
+        failing = False
+        while True:
+            try:
+                if self.store.cancel_requested(self.compute_id):
+                    self.cancelled = True
+                    routing.CancelSearch()
+                    return
+                failing = False
+            except Exception as e:
+                # 只記第一次，store 暫時連不上時不要每 0.1 秒刷一行
+                if not failing:
+                    print(f"[compute_id={self.compute_id}] 無法檢查取消請求: {e}")
+                failing = True
+            if self._stopped.wait(CANCEL_POLL_SECONDS):
+                return
+
+    def stop(self):
+        """Stop polling; call once the solve has returned, before routing goes away."""
+        if self._thread is None:
+            return
+        self._stopped.set()
+        self._thread.join(timeout=5)
+        self._thread = None
@@ -0,0 +1,37 @@
+from vrp.store.job_store import (
+    CANCELLED,
+    DONE,
+    QUEUED,
+    RUNNING,
+    DiskJobBackend,
+    JobRecord,
+    JobStore,
+    MemoryJobBackend,
+    default_job_store,
+)
+from vrp.store.matrix_store import (
+    MATRIX_ID_PATTERN,
+    DiskBackend,
+    MatrixStore,
+    MemoryBackend,
+    StoredMatrices,
+    compute_matrix_id,
+)
+
+__all__ = [
+    "CANCELLED",
+    "DONE",
+    "MATRIX_ID_PATTERN",
+    "QUEUED",
+    "RUNNING",
+    "DiskBackend",
+    "DiskJobBackend",
+    "JobRecord",
+    "JobStore",
+    "MatrixStore",
+    "MemoryBackend",
+    "MemoryJobBackend",
+    "StoredMatrices",
+    "compute_matrix_id",
+    "default_job_store",
+]
@@ -0,0 +1,265 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import zlib
+from dataclasses import asdict, dataclass
+from typing import Protocol
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+CANCELLED = "cancelled"
+
+# 結束後保留多久（秒），逾時的紀錄與結果由 evict_expired 清掉
+RESULT_TTL_SECONDS = 24 * 3600
+
+# 設定其一時 worker 會回報狀態（見 default_job_store）
+JOB_STORE_DIR_ENV = "VRP_JOB_STORE_DIR"
+JOB_STORE_DICT_ENV = "VRP_JOB_STORE_DICT"
+
+
+@dataclass
+class JobRecord:
+    compute_id: int
+    state: str = QUEUED
+    created_at: float | None = None
+    started_at: float | None = None
+    finished_at: float | None = None
+    queued_seconds: float | None = None     # created_at → started_at
+    objective: int | None = None            # 目前最佳解的目標值（搜尋中即更新）
+    solutions: int = 0
+    status: str | None = None               # 結束後為結果的 status（success / error / cancelled）
+    cancel_requested_at: float | None = None
+    timings: dict | None = None
+    expires_at: float | None = None
+    version: int = 0                        # 每次寫入 +1，作為 ETag
+
+
+class Backend(Protocol):
+    def get(self, key: str) -> bytes | None: ...
+    def put(self, key: str, value: bytes) -> None: ...
+    def pop(self, key: str) -> bytes | None: ...
+    def keys(self): ...
+
+
+class MemoryJobBackend:
+    """In-process dict; only visible to solves running in the same process."""
+
+    def __init__(self):
+        self._entries: dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> bytes | None:
+        return self._entries.get(key)
+
+    def put(self, key: str, value: bytes) -> None:
+        with self._lock:
+            self._entries[key] = value
+
+    def pop(self, key: str) -> bytes | None:
+        with self._lock:
+            return self._entries.pop(key, None)
+
+    def keys(self):
+        return list(self._entries)
+
+
+class DiskJobBackend:
+    """
+    One file per key under directory, shared by the API and local worker
+    processes. Writes go through a temp file + os.replace.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    def get(self, key: str) -> bytes | None:
+        try:
+            with open(self._path(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def put(self, key: str, value: bytes) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(value)
+        os.replace(tmp_path, self._path(key))
+
+    def pop(self, key: str) -> bytes | None:
+        value = self.get(key)
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+        return value
+
+    def keys(self):
+        return [name for name in os.listdir(self.directory) if not name.endswith(".tmp")]
+
+
+class JobStore:
+    """
+    Job registry and result store keyed by compute_id.
+
+    The record (state, timings, last objective) and the final payload are
+    kept under separate keys, so polling a running job never reads the
+    routes; a cancel request is a third key, cheap for a running solve to
+    poll. Payloads are stored as zlib-compressed JSON. The backend is any
+    object with get / put / pop / keys; on Modal a modal.Dict shared by the
+    API and solver containers fits as is.
+    """
+
+    def __init__(self, backend: Backend | None = None, ttl_seconds: float = RESULT_TTL_SECONDS):
+        self.backend = backend if backend is not None else MemoryJobBackend()
+        self.ttl_seconds = ttl_seconds
+
+    @staticmethod
+    def _record_key(compute_id: int) -> str:
+        return f"job-{int(compute_id)}"
+
+    @staticmethod
+    def _result_key(compute_id: int) -> str:
+        return f"result-{int(compute_id)}"
+
+    @staticmethod
+    def _cancel_key(compute_id: int) -> str:
+        return f"cancel-{int(compute_id)}"
+
+    def get(self, compute_id: int) -> JobRecord | None:
+        raw = self.backend.get(self._record_key(compute_id))
+        if raw is None:
+            return None
+        record = JobRecord(**json.loads(raw))
+        if record.expires_at is not None and record.expires_at < time.time():
+            self.delete(compute_id)
+            return None
+        return record
+
+    def _write(self, record: JobRecord) -> JobRecord:
+        record.version += 1
+        self.backend.put(self._record_key(record.compute_id), json.dumps(asdict(record)).encode())
+        return record
+
+    def _pop(self, key: str) -> None:
+        try:
+            self.backend.pop(key)
+        except KeyError:
+            # modal.Dict.pop 對不存在的 key 會丟 KeyError
+            pass
+
+    def create(self, compute_id: int) -> JobRecord:
+        """Start a fresh queued record; a resubmitted compute_id drops its old result."""
+        self._pop(self._result_key(compute_id))
+        self._pop(self._cancel_key(compute_id))
+        old = self.get(compute_id)
+        record = JobRecord(compute_id, created_at=time.time(), version=old.version if old else 0)
+        return self._write(record)
+
+    def update(self, compute_id: int, **fields) -> JobRecord:
+        record = self.get(compute_id) or JobRecord(compute_id)
+        for name, value in fields.items():
+            setattr(record, name, value)
+        return self._write(record)
+
+    def start(self, compute_id: int) -> JobRecord:
+        record = self.get(compute_id) or JobRecord(compute_id)
+        if record.state == CANCELLED:
+            # 排隊中就被取消；worker 看到 cancel_requested 後直接結束
+            return record
+        record.state = RUNNING
+        record.started_at = time.time()
+        if record.created_at is not None:
+            record.queued_seconds = round(record.started_at - record.created_at, 3)
+        return self._write(record)
+
+    def finish(
+        self, compute_id: int, payload: dict, objective: int | None = None, solutions: int | None = None
+    ) -> JobRecord:
+        self.backend.put(self._result_key(compute_id), zlib.compress(json.dumps(payload).encode()))
+        record = self.get(compute_id) or JobRecord(compute_id)
+        record.status = payload.get("status")
+        record.state = DONE
+        if record.status == "cancelled":
+            record.state = CANCELLED
+            requested_at = self.backend.get(self._cancel_key(compute_id))
+            if requested_at is not None:
+                record.cancel_requested_at = float(requested_at)
+        record.finished_at = time.time()
+        record.expires_at = record.finished_at + self.ttl_seconds
+        record.timings = payload.get("timings", record.timings)
+        # v1 的 payload 沒有 objective，改用搜尋中記錄的最佳值
+        objective = payload.get("objective", objective)
+        if objective is not None:
+            record.objective = objective
+        if solutions is not None:
+            record.solutions = solutions
+        return self._write(record)
+
+    def cancel(self, compute_id: int) -> JobRecord | None:
+        """
+        Ask the solve to stop; None if the job is unknown. A queued job is
+        marked cancelled at once, a running one by its worker once it has
+        stopped and stored the best solution found so far. Finished jobs are
+        returned unchanged.
+        """
+        record = self.get(compute_id)
+        if record is None or record.state in (DONE, CANCELLED):
+            return record
+        now = time.time()
+        # 先寫旗標：worker 之後的 start / finish 一定看得到
+        self.backend.put(self._cancel_key(compute_id), str(now).encode())
+        if record.state != QUEUED:
+            # running 的紀錄只由 worker 寫，避免與 finish 互相覆蓋
+            return record
+        record.state = CANCELLED
+        record.status = "cancelled"
+        record.cancel_requested_at = record.finished_at = now
+        record.expires_at = now + self.ttl_seconds
+        return self._write(record)
+
+    def cancel_requested(self, compute_id: int) -> bool:
+        return self.backend.get(self._cancel_key(compute_id)) is not None
+
+    def result(self, compute_id: int) -> dict | None:
+        raw = self.backend.get(self._result_key(compute_id))
+        return json.loads(zlib.decompress(raw)) if raw is not None else None
+
+    def delete(self, compute_id: int) -> None:
+        self._pop(self._record_key(compute_id))
+        self._pop(self._result_key(compute_id))
+        self._pop(self._cancel_key(compute_id))
+
+    def evict_expired(self) -> int:
+        evicted = 0
+        for key in list(self.backend.keys()):
+            if key.startswith("job-") and self.get(int(key[len("job-"):])) is None:
+                evicted += 1
+        return evicted
+
+
+_default: JobStore | None = None
+
+
+def default_job_store() -> JobStore | None:
+    """
+    The job store workers report to: a modal.Dict named by
+    VRP_JOB_STORE_DICT, a directory from VRP_JOB_STORE_DIR, or None (no
+    tracking, e.g. benchmarks).
+    """
+    global _default
+    if _default is None:
+        dict_name = os.environ.get(JOB_STORE_DICT_ENV)
+        directory = os.environ.get(JOB_STORE_DIR_ENV)
+        if dict_name:
+            import modal
+            _default = JobStore(modal.Dict.from_name(dict_name, create_if_missing=True))
+        elif directory:
+            _default = JobStore(DiskJobBackend(directory))
+    return _default
@@ -0,0 +1,169 @@
+import hashlib
+import os
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Protocol
+
+import numpy as np
+
+MATRIX_ID_PATTERN = r"^[0-9a-f]{64}$"
+
+
+@dataclass(frozen=True)
+class StoredMatrices:
+    location_ids: np.ndarray    # int64，矩陣列/欄對應的 Location.id 順序
+    distance: np.ndarray        # int32 N x N
+    time: np.ndarray            # int32 N x N
+
+    @property
+    def nbytes(self) -> int:
+        return self.location_ids.nbytes + self.distance.nbytes + self.time.nbytes
+
+
+def compute_matrix_id(location_ids, distance, time) -> str:
+    """Content hash over the location id order and both matrices."""
+    h = hashlib.sha256()
+    for arr, dtype in ((location_ids, np.int64), (distance, np.int32), (time, np.int32)):
+        arr = np.ascontiguousarray(arr, dtype=np.dtype(dtype).newbyteorder("<"))
+        h.update(str(arr.shape).encode())
+        h.update(arr.tobytes())
+    return h.hexdigest()
+
+
+class Backend(Protocol):
+    def get(self, matrix_id: str) -> StoredMatrices | None: ...
+    def put(self, matrix_id: str, entry: StoredMatrices) -> None: ...
+
+
+class MemoryBackend:
+    """In-process LRU bounded by total array bytes."""
+
+    def __init__(self, max_bytes: int = 512 * 2**20):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, StoredMatrices] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, matrix_id: str) -> StoredMatrices | None:
+        with self._lock:
+            entry = self._entries.get(matrix_id)
+            if entry is not None:
+                self._entries.move_to_end(matrix_id)
+            return entry
+
+    def put(self, matrix_id: str, entry: StoredMatrices) -> None:
+        if entry.nbytes > self.max_bytes:
+            return
+        with self._lock:
+            if matrix_id in self._entries:
+                self._entries.move_to_end(matrix_id)
+                return
+            self._entries[matrix_id] = entry
+            self._bytes += entry.nbytes
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.nbytes
+
+
+class DiskBackend:
+    """
+    One .npz file per matrix_id under directory, bounded by total file size.
+
+    Reads bump the file mtime, so eviction drops the least recently used
+    entries first. Writes go through a temp file + os.replace so a reader
+    never sees a partial file.
+
+    reload, if given, is called on a miss before giving up, e.g. a Modal
+    Volume's reload(): another container may have stored the matrix since
+    this one mounted the volume.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 4 * 2**30, reload=None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.reload = reload
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, matrix_id: str) -> str:
+        return os.path.join(self.directory, f"{matrix_id}.npz")
+
+    def get(self, matrix_id: str) -> StoredMatrices | None:
+        entry = self._read(matrix_id)
+        if entry is None and self.reload is not None:
+            try:
+                self.reload()
+            except Exception as e:
+                print(f"[matrix_store] reload 失敗: {e}")
+                return None
+            entry = self._read(matrix_id)
+        return entry
+
+    def _read(self, matrix_id: str) -> StoredMatrices | None:
+        path = self._path(matrix_id)
+        try:
+            with np.load(path) as f:
+                entry = StoredMatrices(f["location_ids"], f["distance"], f["time"])
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return entry
+
+    def put(self, matrix_id: str, entry: StoredMatrices) -> None:
+        path = self._path(matrix_id)
+        if os.path.exists(path):
+            os.utime(path)
+            return
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, location_ids=entry.location_ids, distance=entry.distance, time=entry.time)
+        os.replace(tmp_path, path)
+        self._evict(keep=path)
+
+    def _evict(self, keep: str):
+        with self._lock:
+            files = []
+            for item in os.scandir(self.directory):
+                if item.name.endswith(".npz") and item.path != keep:
+                    stat = item.stat()
+                    files.append((stat.st_mtime, stat.st_size, item.path))
+            total = os.path.getsize(keep) + sum(size for _, size, _ in files)
+            for _, size, path in sorted(files):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+
+
+class MatrixStore:
+    """
+    Content-addressed store for distance/time matrices.
+
+    Clients upload matrices once and then reference them with matrix_id on
+    later solves that reuse the same destination set.
+    """
+
+    def __init__(self, backend: Backend | None = None):
+        self.backend = backend or MemoryBackend()
+
+    def put(self, location_ids, distance, time) -> str:
+        entry = StoredMatrices(
+            location_ids=np.asarray(location_ids, dtype=np.int64),
+            distance=np.asarray(distance, dtype=np.int32),
+            time=np.asarray(time, dtype=np.int32),
+        )
+        matrix_id = compute_matrix_id(entry.location_ids, entry.distance, entry.time)
+        self.backend.put(matrix_id, entry)
+        return matrix_id
+
+    def get(self, matrix_id: str) -> StoredMatrices | None:
+        # matrix_id 來自 client，DiskBackend 會拿來組路徑，先確認是 sha256 hex
+        if not re.match(MATRIX_ID_PATTERN, matrix_id):
+            return None
+        return self.backend.get(matrix_id)
@@ -0,0 +1,74 @@
+import time
+from contextlib import contextmanager
+
+
+class PhaseTimer:
+    """
+    Wall-clock seconds per named phase, reported as payload["timings"].
+
+    Phases measured before the worker (request decode, compile in the API)
+    are passed in as `timings` so one dict covers the whole request. Each
+    add_* builder of the routing model is recorded separately under
+    "builders"; a phase entered twice accumulates.
+    """
+
+    def __init__(self, timings: dict | None = None):
+        self.timings = {k: v for k, v in (timings or {}).items() if k != "builders"}
+        self.builders = dict((timings or {}).get("builders", {}))
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name: str, seconds: float):
+        self.timings[name] = round(self.timings.get(name, 0.0) + seconds, 4)
+
+    def run(self, builder, *args):
+        """Call builder(*args), timing it under builders[builder.__name__]."""
+        start = time.perf_counter()
+        try:
+            return builder(*args)
+        finally:
+            name = builder.__name__
+            self.builders[name] = round(self.builders.get(name, 0.0) + time.perf_counter() - start, 4)
+
+    def watch_search(self, routing) -> "SearchClock":
+        return SearchClock(routing, self)
+
+    def as_dict(self) -> dict:
+        if not self.builders:
+            return dict(self.timings)
+        return {**self.timings, "builders": dict(self.builders)}
+
+
+class SearchClock:
+    """
+    Splits one Solve* call into "first_solution" (start → first solution)
+    and "search" (the rest) using an at-solution callback.
+    """
+
+    def __init__(self, routing, timer: PhaseTimer):
+        self._timer = timer
+        self._first = None
+        routing.AddAtSolutionCallback(self._on_solution)
+
+    def _on_solution(self):
+        if self._first is None:
+            self._first = time.perf_counter()
+
+    @contextmanager
+    def solving(self):
+        # 之前的 Solve*（例如插入缺少地點的初始解）不算在這次
+        self._first = None
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            first = self._first if self._first is not None else end
+            self._timer.add("first_solution", first - start)
+            self._timer.add("search", end - first)
@@ -0,0 +1,18 @@
+from vrp.webhook.delivery import (
+    OutboxWorker,
+    default_outbox,
+    deliver_webhook,
+    drain,
+    get_client,
+)
+from vrp.webhook.outbox import Outbox, OutboxMessage
+
+__all__ = [
+    "Outbox",
+    "OutboxMessage",
+    "OutboxWorker",
+    "default_outbox",
+    "deliver_webhook",
+    "drain",
+    "get_client",
+]
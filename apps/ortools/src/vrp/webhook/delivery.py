@@ -0,0 +1,182 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+
+import httpx
+
+from vrp.webhook.outbox import Outbox, OutboxMessage, backoff_seconds
+
+# 設定時先寫入 outbox 再送，失敗的結果由 drain / OutboxWorker 重送
+OUTBOX_DIR_ENV = "VRP_WEBHOOK_OUTBOX_DIR"
+# 對應 apps/api 的 ORTOOLS_WEBHOOK_SECRET，以 X-Webhook-Secret header 送出
+SECRET_ENV = "VRP_WEBHOOK_SECRET"
+TIMEOUT = httpx.Timeout(10, connect=3)
+# 一次發送最久可能花的時間（連線 + 讀取逾時再留餘裕）；outbox 的第一次重送排在這之後
+ATTEMPT_SECONDS = 15
+# 沒有 outbox 時，在本行程內最多試幾次（間隔 0.5s、1s）
+INLINE_ATTEMPTS = 3
+# 2xx 以外仍值得重送的狀態碼；其餘 4xx 視為 payload 本身有問題
+RETRYABLE_STATUS = {408, 425, 429}
+
+_client: httpx.Client | None = None
+_client_lock = threading.Lock()
+_outbox: Outbox | None = None
+
+
+def get_client() -> httpx.Client:
+    """Process-wide client, so consecutive posts reuse pooled keep-alive connections."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = httpx.Client(timeout=TIMEOUT, limits=httpx.Limits(max_keepalive_connections=8))
+        return _client
+
+
+def default_outbox() -> Outbox | None:
+    global _outbox
+    directory = os.environ.get(OUTBOX_DIR_ENV)
+    if not directory:
+        return None
+    if _outbox is None or _outbox.directory != directory:
+        _outbox = Outbox(directory)
+    return _outbox
+
+
+def idempotency_key(url: str, body: bytes) -> str:
+    """Same url + payload → same key, so the receiver can drop a retried duplicate."""
+    return hashlib.sha256(url.encode() + b"\0" + body).hexdigest()[:32]
+
+
+@dataclass(frozen=True)
+class Attempt:
+    delivered: bool
+    retryable: bool = True
+    error: str | None = None
+    retry_after: float | None = None
+
+
+def post_message(message: OutboxMessage) -> Attempt:
+    headers = {
+        "Content-Type": "application/json",
+        "Idempotency-Key": message.key,
+        "X-Webhook-Attempt": str(message.attempts + 1),
+    }
+    secret = os.environ.get(SECRET_ENV)
+    if secret:
+        headers["X-Webhook-Secret"] = secret
+    try:
+        response = get_client().post(message.url, content=json.dumps(message.payload), headers=headers)
+    except httpx.HTTPError as e:
+        return Attempt(False, error=f"{type(e).__name__}: {e}")
+    if response.is_success:
+        return Attempt(True)
+
+    status = response.status_code
+    retry_after = response.headers.get("Retry-After")
+    return Attempt(
+        False,
+        retryable=status >= 500 or status in RETRYABLE_STATUS,
+        error=f"HTTP {status}",
+        retry_after=float(retry_after) if retry_after and retry_after.isdigit() else None,
+    )
+
+
+def deliver_webhook(url: str, payload: dict, outbox: Outbox | None = None) -> bool:
+    """
+    Deliver a result payload, returning whether the receiver accepted it.
+
+    With an outbox (argument or VRP_WEBHOOK_OUTBOX_DIR), the message is
+    persisted first and posted once; on failure it stays in the outbox for
+    drain() to retry with backoff, so the solver worker never waits on a
+    down receiver. Without one, a few quick retries happen in-process and
+    the result is logged as lost if they all fail.
+    """
+    body = json.dumps(payload).encode()
+    message = OutboxMessage(
+        key=idempotency_key(url, body), url=url, payload=payload, created_at=time.time()
+    )
+    compute_id = payload.get("compute_id")
+    outbox = outbox if outbox is not None else default_outbox()
+
+    if outbox is not None:
+        # 先把下一次重送排在這次嘗試必定結束之後再寫入，drain 才不會重送還在途中的訊息
+        message.next_attempt_at = message.created_at + ATTEMPT_SECONDS + backoff_seconds(1)
+        try:
+            outbox.put(message)
+        except OSError as e:
+            print(f"[compute_id={compute_id}] 無法寫入 webhook outbox，改為直接發送: {e}")
+            outbox = None
+
+    if outbox is None:
+        for n in range(INLINE_ATTEMPTS):
+            attempt = post_message(message)
+            if attempt.delivered:
+                return True
+            message.attempts += 1
+            if not attempt.retryable or n == INLINE_ATTEMPTS - 1:
+                break
+            time.sleep(0.5 * 2 ** n)
+        print(f"[compute_id={compute_id}] Webhook 發送失敗: {attempt.error}")
+        return False
+
+    attempt = post_message(message)
+    if attempt.delivered:
+        outbox.delete(message.key)
+        return True
+    if attempt.retryable:
+        outbox.reschedule(message, attempt.error, attempt.retry_after)
+        print(f"[compute_id={compute_id}] Webhook 發送失敗，已留在 outbox 待重送: {attempt.error}")
+    else:
+        message.last_error = attempt.error
+        outbox.bury(message)
+        print(f"[compute_id={compute_id}] Webhook 被拒（{attempt.error}），移至 outbox/dead")
+    return False
+
+
+def drain(outbox: Outbox, now: float | None = None) -> dict:
+    """Retry every due message once; returns counts per outcome."""
+    counts = {"delivered": 0, "retrying": 0, "dead": 0}
+    for message in outbox.due(now):
+        attempt = post_message(message)
+        if attempt.delivered:
+            outbox.delete(message.key)
+            counts["delivered"] += 1
+        elif attempt.retryable and outbox.reschedule(message, attempt.error, attempt.retry_after):
+            counts["retrying"] += 1
+        else:
+            if not attempt.retryable:
+                message.last_error = attempt.error
+                outbox.bury(message)
+            counts["dead"] += 1
+    return counts
+
+
+class OutboxWorker:
+    """Background thread draining an outbox every interval_seconds (local_dev)."""
+
+    def __init__(self, outbox: Outbox, interval_seconds: float = 5):
+        self.outbox = outbox
+        self.interval_seconds = interval_seconds
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+
+    def start(self) -> "OutboxWorker":
+        self._thread.start()
+        return self
+
+    def _loop(self):
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                counts = drain(self.outbox)
+            except Exception as e:
+                print(f"[outbox] 重送失敗: {e}")
+                continue
+            if any(counts.values()):
+                print(f"[outbox] {counts}")
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join(timeout=self.interval_seconds + 1)
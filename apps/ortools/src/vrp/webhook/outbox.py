@@ -0,0 +1,105 @@
+import json
+import os
+import random
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+
+# 第 n 次失敗後等 BASE * 2^(n-1) 秒（上限 MAX，乘上 0.5~1 的 jitter）再重送
+BASE_DELAY_SECONDS = 5
+MAX_DELAY_SECONDS = 15 * 60
+# 超過此次數移到 dead/，不再重送（約 2 小時）
+MAX_ATTEMPTS = 12
+
+
+def backoff_seconds(attempts: int) -> float:
+    delay = min(BASE_DELAY_SECONDS * 2 ** max(attempts - 1, 0), MAX_DELAY_SECONDS)
+    return delay * random.uniform(0.5, 1.0)
+
+
+@dataclass
+class OutboxMessage:
+    key: str                    # idempotency key，重送時不變
+    url: str
+    payload: dict
+    attempts: int = 0
+    next_attempt_at: float = 0.0
+    created_at: float = 0.0
+    last_error: str | None = None
+
+
+class Outbox:
+    """
+    Durable webhook outbox: one JSON file per undelivered message.
+
+    A message is written before the first attempt, so a result survives a
+    crash or an unreachable receiver, and is deleted once delivered.
+    Messages that exhaust MAX_ATTEMPTS or get a permanent 4xx move to
+    dead/ for inspection. Writes go through a temp file + os.replace so a
+    drainer never reads a partial file.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.dead_directory = os.path.join(directory, "dead")
+        os.makedirs(self.dead_directory, exist_ok=True)
+
+    def _path(self, key: str, directory: str | None = None) -> str:
+        return os.path.join(directory or self.directory, f"{key}.json")
+
+    def put(self, message: OutboxMessage) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(asdict(message), f)
+        os.replace(tmp_path, self._path(message.key))
+
+    def get(self, key: str) -> OutboxMessage | None:
+        try:
+            with open(self._path(key)) as f:
+                return OutboxMessage(**json.load(f))
+        except FileNotFoundError:
+            return None
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def due(self, now: float | None = None) -> list[OutboxMessage]:
+        """Messages whose next attempt is due, oldest first."""
+        now = time.time() if now is None else now
+        messages = []
+        for item in os.scandir(self.directory):
+            if not item.name.endswith(".json"):
+                continue
+            try:
+                with open(item.path) as f:
+                    message = OutboxMessage(**json.load(f))
+            except (FileNotFoundError, json.JSONDecodeError):
+                # 剛被送達刪除，或另一個行程正在 os.replace
+                continue
+            if message.next_attempt_at <= now:
+                messages.append(message)
+        return sorted(messages, key=lambda m: m.created_at)
+
+    def reschedule(self, message: OutboxMessage, error: str, retry_after: float | None = None) -> bool:
+        """Record a failed attempt; returns False when the message went to dead/."""
+        message.attempts += 1
+        message.last_error = error
+        if message.attempts >= MAX_ATTEMPTS:
+            self.bury(message)
+            return False
+        delay = backoff_seconds(message.attempts)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        message.next_attempt_at = time.time() + delay
+        self.put(message)
+        return True
+
+    def bury(self, message: OutboxMessage) -> None:
+        self.put(message)
+        os.replace(self._path(message.key), self._path(message.key, self.dead_directory))
+
+    def __len__(self) -> int:
+        return sum(1 for item in os.scandir(self.directory) if item.name.endswith(".json"))
@@ -0,0 +1,12 @@
+from vrp.workers.pool import QueueFull, WorkerPool, preload
+from vrp.workers.scheduler import BATCH, INTERACTIVE, FairQueue, job_lane
+
+__all__ = [
+    "BATCH",
+    "INTERACTIVE",
+    "FairQueue",
+    "QueueFull",
+    "WorkerPool",
+    "job_lane",
+    "preload",
+]
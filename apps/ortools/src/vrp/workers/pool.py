@@ -0,0 +1,262 @@
+import collections
+import importlib
+import math
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+
+from vrp.solvers.ortools_v2.portfolio import available_cpus
+from vrp.workers.scheduler import BATCH, INTERACTIVE, LANES, FairQueue
+
+# 未指定 max_queue 時，每個 worker 最多排幾個 job
+QUEUE_PER_WORKER = 8
+# 單一帳號最多佔佇列的比例，一個帳號的突發流量不會把別人擋在外面
+TENANT_QUEUE_SHARE = 0.5
+# 只給互動式 job 用的額外行程數：大 job 佔滿所有 worker 時，小 job 仍可立即開始
+INTERACTIVE_SLOTS = 1
+# 還沒有任何 job 完成、無從估計時的 Retry-After
+DEFAULT_RETRY_AFTER_SECONDS = 5
+MAX_RETRY_AFTER_SECONDS = 300
+# 平均執行秒數的 EWMA 權重，與 p50 / p95 取樣的筆數
+RUN_SECONDS_ALPHA = 0.2
+WAIT_SAMPLES = 1000
+
+
+class QueueFull(Exception):
+    """Raised by WorkerPool.submit when the queue, or the account's share of it, is full."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"solver 佇列已滿，請 {retry_after} 秒後重試")
+        self.retry_after = retry_after
+
+
+def preload(*modules: str):
+    """Pool initializer: import the solver modules once per worker, not on its first job."""
+    for module in modules:
+        importlib.import_module(module)
+
+
+@dataclass
+class _Job:
+    fn: object
+    args: tuple
+    future: Future
+    lane: str = BATCH
+    tenant: object = None
+    admitted: bool = True           # 計入佇列上限（批次的 item 不計）
+    submitted_at: float = field(default_factory=time.monotonic)
+
+
+def _percentiles(samples) -> dict:
+    waits = sorted(samples)
+    return {
+        "p50": round(waits[len(waits) // 2], 3) if waits else None,
+        "p95": round(waits[int(len(waits) * 0.95)], 3) if waits else None,
+        "max": round(waits[-1], 3) if waits else None,
+    }
+
+
+class WorkerPool:
+    """
+    Fixed-size process pool with a bounded, prioritized queue in front of it.
+
+    At most `workers` solves run at once, each in its own process (compile,
+    model building, parse and the at-solution callbacks all need the GIL,
+    so solver threads would also stall the API's event loop). Up to
+    max_queue more wait here; beyond that submit raises QueueFull with a
+    Retry-After estimate, so a burst is turned away up front instead of
+    piling up. Jobs are handed to the executor only when a worker is free,
+    which makes the queue depth and each job's wait observable (see stats).
+
+    Every job has a lane (interactive / batch, see scheduler.job_lane) and
+    a tenant (account). The queue is a FairQueue: interactive jobs first,
+    then the account with the fewest running jobs. Each lane has its own
+    max_queue, so a backlog of long jobs never turns interactive ones away,
+    and within a lane one account may hold at most TENANT_QUEUE_SHARE of
+    it (jobs without an account only count toward the lane). A batch is admitted as one job;
+    its items then wait in the batch lane without counting against either
+    bound, so a large batch neither is refused outright nor locks its
+    account out of interactive solves. interactive_slots extra processes
+    run only interactive jobs, so a short re-plan starts at once even while
+    long jobs occupy every worker (briefly oversubscribing the CPU).
+
+    A worker that dies (e.g. OOM) breaks a ProcessPoolExecutor for good;
+    the pool then starts a fresh executor and keeps going, failing only the
+    jobs that were running.
+    """
+
+    def __init__(
+        self,
+        workers: int | None = None,
+        max_queue: int | None = None,
+        initializer=None,
+        initargs: tuple = (),
+        interactive_slots: int = INTERACTIVE_SLOTS,
+    ):
+        self.workers = workers or available_cpus()
+        self.max_queue = max_queue if max_queue is not None else QUEUE_PER_WORKER * self.workers
+        self.tenant_max_queue = max(1, math.ceil(self.max_queue * TENANT_QUEUE_SHARE))
+        self.interactive_slots = interactive_slots
+        self._initializer = initializer
+        self._initargs = initargs
+        self._executor = self._new_executor()
+        # RLock：job 在 add_done_callback 前就完成時，_done 會在 _dispatch_locked 內同步執行
+        self._lock = threading.RLock()
+        self._pending = FairQueue()
+        self._admitted: collections.Counter = collections.Counter()  # (lane, tenant) → 排隊中且計入上限的 job 數
+        self._running = 0
+        self._submitted = 0
+        self._rejected = 0
+        self._completed = 0
+        self._failed = 0
+        self._run_seconds = None
+        self._waits = {lane: collections.deque(maxlen=WAIT_SAMPLES) for lane in LANES}
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        # spawn：呼叫端是多執行緒的 API 行程，fork 不安全
+        return ProcessPoolExecutor(
+            max_workers=self.workers + self.interactive_slots,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=self._initializer,
+            initargs=self._initargs,
+        )
+
+    def retry_after(self, lane: str = BATCH) -> int:
+        """Seconds until a queue slot is likely free: queued jobs ahead / workers × mean run time."""
+        with self._lock:
+            return self._retry_after_locked(lane)
+
+    def _queued_locked(self, lane: str) -> int:
+        return sum(count for (job_lane, _), count in self._admitted.items() if job_lane == lane)
+
+    def _retry_after_locked(self, lane: str = BATCH) -> int:
+        if self._run_seconds is None:
+            return DEFAULT_RETRY_AFTER_SECONDS
+        ahead = self._queued_locked(lane) + 1
+        seconds = math.ceil(self._run_seconds * ahead / self.workers)
+        return max(1, min(seconds, MAX_RETRY_AFTER_SECONDS))
+
+    def check_capacity(self, jobs: int = 1, lane: str = BATCH, tenant=None):
+        """Raise QueueFull unless `jobs` more from tenant would fit in lane right now."""
+        with self._lock:
+            self._admit_locked(jobs, lane, tenant)
+
+    def _admit_locked(self, jobs: int, lane: str, tenant):
+        # 能立即開始的 job 不算排隊；互動式也可以用 interactive_slots
+        slots = self.workers + (self.interactive_slots if lane == INTERACTIVE else 0)
+        idle = max(0, slots - self._running)
+        free = idle + self.max_queue - self._queued_locked(lane)
+        if tenant is not None:
+            # 沒帶 account_id 的請求不是同一個帳號，只受整條 lane 的上限
+            free = min(free, idle + self.tenant_max_queue - self._admitted[lane, tenant])
+        if jobs > free:
+            self._rejected += jobs
+            raise QueueFull(self._retry_after_locked(lane))
+
+    def submit(self, fn, *args, lane: str = BATCH, tenant=None, admit: bool = True) -> Future:
+        """
+        Queue fn(*args) for a worker process; fn and args must be picklable.
+        admit=False neither checks nor counts toward the queue bounds, for
+        a batch's items once the batch passed check_capacity.
+        """
+        job = _Job(fn, args, Future(), lane, tenant, admit)
+        with self._lock:
+            if admit:
+                self._admit_locked(1, lane, tenant)
+                self._admitted[lane, tenant] += 1
+            self._submitted += 1
+            self._pending.push(job)
+            self._dispatch_locked()
+        return job.future
+
+    def map(self, fn, calls: list[tuple], lane: str = BATCH, tenant=None) -> list:
+        """fn(*call) for every call, in order; a failed call yields its exception."""
+        futures = [self.submit(fn, *call, lane=lane, tenant=tenant, admit=False) for call in calls]
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def _dispatch_locked(self):
+        while True:
+            if self._running < self.workers:
+                job = self._pending.pop()
+            elif self._running < self.workers + self.interactive_slots:
+                job = self._pending.pop((INTERACTIVE,))
+            else:
+                return
+            if job is None:
+                return
+            if job.admitted:
+                self._admitted[job.lane, job.tenant] -= 1
+                if not self._admitted[job.lane, job.tenant]:
+                    del self._admitted[job.lane, job.tenant]
+            if not job.future.set_running_or_notify_cancel():
+                self._pending.done(job.tenant)
+                continue
+            self._waits[job.lane].append(time.monotonic() - job.submitted_at)
+            self._running += 1
+            started_at = time.monotonic()
+            try:
+                inner = self._executor.submit(job.fn, *job.args)
+            except BrokenProcessPool:
+                self._executor = self._new_executor()
+                inner = self._executor.submit(job.fn, *job.args)
+            executor = self._executor
+            inner.add_done_callback(lambda inner, job=job: self._done(job, inner, executor, started_at))
+
+    def _done(self, job: _Job, inner: Future, executor: ProcessPoolExecutor, started_at: float):
+        error = inner.exception()
+        with self._lock:
+            self._running -= 1
+            self._pending.done(job.tenant)
+            run_seconds = time.monotonic() - started_at
+            if self._run_seconds is None:
+                self._run_seconds = run_seconds
+            else:
+                self._run_seconds += RUN_SECONDS_ALPHA * (run_seconds - self._run_seconds)
+            if error is None:
+                self._completed += 1
+            else:
+                self._failed += 1
+                if isinstance(error, BrokenProcessPool) and executor is self._executor:
+                    self._executor = self._new_executor()
+                    executor.shutdown(wait=False)
+            self._dispatch_locked()
+        if error is None:
+            job.future.set_result(inner.result())
+        else:
+            job.future.set_exception(error)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "interactive_slots": self.interactive_slots,
+                "running": self._running,
+                "queued": len(self._pending),
+                "queued_by_lane": self._pending.depth(),
+                "max_queue": self.max_queue,
+                "tenant_max_queue": self.tenant_max_queue,
+                "submitted": self._submitted,
+                "rejected": self._rejected,
+                "completed": self._completed,
+                "failed": self._failed,
+                "wait_seconds": {lane: _percentiles(waits) for lane, waits in self._waits.items()},
+                "mean_run_seconds": round(self._run_seconds, 3) if self._run_seconds is not None else None,
+                "retry_after": self._retry_after_locked(),
+            }
+
+    def shutdown(self, wait: bool = True):
+        """Stop taking jobs from the queue and shut the worker processes down."""
+        with self._lock:
+            for job in self._pending.clear():
+                job.future.cancel()
+            self._admitted.clear()
+        self._executor.shutdown(wait=wait)
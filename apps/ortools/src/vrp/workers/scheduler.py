@@ -0,0 +1,73 @@
+import collections
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+# 依序取：互動式永遠排在批次前面
+LANES = (INTERACTIVE, BATCH)
+
+# 地點數 × time_limit_seconds 不超過此值視為互動式（例如 100 站 × 30 秒）
+INTERACTIVE_MAX_COST = 3000
+
+
+def job_lane(num_locations: int, time_limit_seconds: float, priority: str | None = None) -> str:
+    """The request's priority if given, else interactive for small N × time limit jobs."""
+    if priority is not None:
+        return priority
+    return INTERACTIVE if num_locations * time_limit_seconds <= INTERACTIVE_MAX_COST else BATCH
+
+
+class FairQueue:
+    """
+    Pending jobs by lane, then by tenant (account).
+
+    pop() serves the interactive lane before the batch lane. Within a lane
+    the tenant with the fewest running jobs goes first, ties going to the
+    one served least recently, and each tenant's own jobs stay FIFO. So an
+    account that submits a burst gets one worker at a time alongside the
+    others instead of all of them in arrival order. Jobs are any objects
+    with `lane` and `tenant` attributes; done(tenant) must be called when a
+    popped job stops running.
+    """
+
+    def __init__(self):
+        self._lanes: dict[str, dict] = {lane: {} for lane in LANES}
+        self._running: collections.Counter = collections.Counter()
+        self._last_served: dict = {}
+        self._served = 0
+
+    def __len__(self) -> int:
+        return sum(self.depth().values())
+
+    def push(self, job):
+        self._lanes[job.lane].setdefault(job.tenant, collections.deque()).append(job)
+
+    def pop(self, lanes: tuple[str, ...] = LANES):
+        """Next job from the first non-empty lane in lanes, or None."""
+        for lane in lanes:
+            tenants = self._lanes[lane]
+            if not tenants:
+                continue
+            tenant = min(tenants, key=lambda t: (self._running[t], self._last_served.get(t, 0)))
+            jobs = tenants[tenant]
+            job = jobs.popleft()
+            if not jobs:
+                del tenants[tenant]
+            self._running[tenant] += 1
+            self._served += 1
+            self._last_served[tenant] = self._served
+            return job
+        return None
+
+    def done(self, tenant):
+        self._running[tenant] -= 1
+        if not self._running[tenant]:
+            del self._running[tenant]
+
+    def depth(self) -> dict[str, int]:
+        return {lane: sum(len(jobs) for jobs in self._lanes[lane].values()) for lane in LANES}
+
+    def clear(self) -> list:
+        jobs = [job for lane in LANES for tenant_jobs in self._lanes[lane].values() for job in tenant_jobs]
+        for lane in LANES:
+            self._lanes[lane].clear()
+        return jobs